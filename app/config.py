@@ -2,10 +2,28 @@
 Configuration de l'application Flask
 """
 import os
-from dotenv import load_dotenv
+from collections.abc import Mapping
 
-# Charger les variables d'environnement depuis .env
-load_dotenv()
+
+def _find_dotenv():
+    """Fichier .env le plus proche en remontant depuis ce répertoire (None si absent)"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Charger les variables d'environnement depuis .env (python-dotenv n'est
+# importé que si le fichier existe, jamais dans l'image de production)
+_dotenv_path = _find_dotenv()
+if _dotenv_path is not None:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 
 class Config:
@@ -14,12 +32,123 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 
+    # Source du contenu : 'blob' (Azure), 'local' (LOCAL_DATA_PATH), 'memory'
+    # ou 'http' (origine CONTENT_ORIGIN_URL, ex. CDN). Vide = 'local' si
+    # USE_LOCAL_FILES, sinon 'blob'
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', '').lower()
+    CONTENT_ORIGIN_URL = os.getenv('CONTENT_ORIGIN_URL', '')
+
     # Azure Blob Storage
     AZURE_STORAGE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING', '')
     BLOB_CONTAINER_NAME = os.getenv('BLOB_CONTAINER_NAME', 'content')
+    # Client HTTP Azure : délais (en secondes), retries et taille du pool de
+    # connexions partagé par les lectures parallèles
+    AZURE_CONNECTION_TIMEOUT = int(os.getenv('AZURE_CONNECTION_TIMEOUT', '5'))
+    AZURE_READ_TIMEOUT = int(os.getenv('AZURE_READ_TIMEOUT', '15'))
+    AZURE_RETRY_TOTAL = int(os.getenv('AZURE_RETRY_TOTAL', '3'))
+    AZURE_POOL_SIZE = int(os.getenv('AZURE_POOL_SIZE', '10'))
+    # Taille (octets) de la première requête d'un téléchargement et des
+    # suivantes : bornent la mémoire d'un morceau lu en flux (le SDK lit
+    # sinon jusqu'à 32 Mio d'un coup)
+    AZURE_MAX_SINGLE_GET_SIZE = int(os.getenv('AZURE_MAX_SINGLE_GET_SIZE', str(4 * 1024 * 1024)))
+    AZURE_MAX_CHUNK_GET_SIZE = int(os.getenv('AZURE_MAX_CHUNK_GET_SIZE', str(4 * 1024 * 1024)))
+    # Résilience des lectures de la source distante : délai maximal d'une
+    # lecture, retries du SDK compris (en secondes, 0 = aucun) ; disjoncteur
+    # ouvert après BREAKER_FAILURE_THRESHOLD échecs consécutifs (0 = jamais)
+    # pendant BREAKER_RESET_TIMEOUT secondes, le cache servant alors la
+    # dernière copie valide ; seconde lecture lancée si la première n'a pas
+    # répondu après STORAGE_HEDGE_DELAY secondes (0 = désactivé)
+    STORAGE_DEADLINE = float(os.getenv('STORAGE_DEADLINE', '10'))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+    BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+    STORAGE_HEDGE_DELAY = float(os.getenv('STORAGE_HEDGE_DELAY', '0'))
+    # Intervalle minimal entre deux tests de connectivité Azure (en secondes)
+    # lancés en arrière-plan pour la readiness probe
+    READINESS_CHECK_INTERVAL = int(os.getenv('READINESS_CHECK_INTERVAL', '30'))
+    # Threads de chargement parallèle des fichiers de contenu
+    CONTENT_FETCH_WORKERS = int(os.getenv('CONTENT_FETCH_WORKERS', '4'))
+
+    # Logging asynchrone : niveau, taille de la file (records abandonnés
+    # au-delà), taille des lots écrits, échantillonnage (1 sur N) et débit
+    # maximal par message (par seconde) des logs DEBUG, log d'accès
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '100'))
+    LOG_DEBUG_SAMPLE_RATE = int(os.getenv('LOG_DEBUG_SAMPLE_RATE', '100'))
+    LOG_DEBUG_RATE_LIMIT = int(os.getenv('LOG_DEBUG_RATE_LIMIT', '10'))
+    ACCESS_LOG = os.getenv('ACCESS_LOG', 'True').lower() == 'true'
 
     # Cache TTL (en secondes)
     CACHE_TTL = int(os.getenv('CACHE_TTL', '60'))
+    # Fenêtre après le TTL pendant laquelle le contenu périmé est servi
+    # pendant sa revalidation en arrière-plan (en secondes)
+    CACHE_STALE_WHILE_REVALIDATE = int(os.getenv('CACHE_STALE_WHILE_REVALIDATE', '30'))
+    # Fenêtre après le TTL pendant laquelle la dernière copie valide est
+    # servie si Azure est indisponible (en secondes)
+    CACHE_STALE_IF_ERROR = int(os.getenv('CACHE_STALE_IF_ERROR', '3600'))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '100'))
+    # Budget mémoire du cache (octets, 0 = illimité) : empreinte estimée des
+    # corps, variantes compressées, données parsées et index (comptés dès le
+    # chargement, même calculés à la première utilisation). Les entrées les moins récemment utilisées sont évincées au-delà
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    # Taille estimée au-delà de laquelle un fichier n'est pas gardé en cache
+    # (servi puis relu depuis la source, 0 = pas de limite)
+    CACHE_MAX_ENTRY_BYTES = int(os.getenv('CACHE_MAX_ENTRY_BYTES', str(32 * 1024 * 1024)))
+    # Durée pendant laquelle un fichier trop volumineux reste servi depuis la
+    # mémoire (hors budget) ; au-delà, seul son corps est conservé, comme base
+    # de la revalidation conditionnelle suivante (en secondes)
+    CACHE_REFUSED_TTL = float(os.getenv('CACHE_REFUSED_TTL', '5'))
+    # Rafraîchissement en arrière-plan des fichiers de contenu (en secondes,
+    # 0 = désactivé : chargement à la demande)
+    CONTENT_REFRESH_INTERVAL = int(os.getenv('CONTENT_REFRESH_INTERVAL', '0'))
+    # Instantanés partagés entre les workers gunicorn (vide = désactivé) : un
+    # seul worker charge le contenu et l'écrit dans ce répertoire, les autres
+    # le lisent par mmap, en vérifiant les nouvelles générations au plus une
+    # fois par SHARED_SNAPSHOT_POLL_INTERVAL secondes
+    SHARED_SNAPSHOT_DIR = os.getenv('SHARED_SNAPSHOT_DIR', '')
+    SHARED_SNAPSHOT_POLL_INTERVAL = float(os.getenv('SHARED_SNAPSHOT_POLL_INTERVAL', '1'))
+
+    # Invalidation par webhook (POST /api/invalidate, vide = désactivé) : jeton
+    # attendu dans l'en-tête Authorization: Bearer ou le paramètre ?token=
+    INVALIDATION_TOKEN = os.getenv('INVALIDATION_TOKEN', '')
+    # Répertoire des marqueurs propageant les invalidations aux autres
+    # workers du pod (par défaut <SHARED_SNAPSHOT_DIR>/invalidations), vérifiés
+    # au plus une fois par INVALIDATION_POLL_INTERVAL secondes. Les autres
+    # réplicas ne sont pas prévenus : CACHE_TTL borne leur délai de propagation
+    INVALIDATION_DIR = os.getenv('INVALIDATION_DIR', '')
+    INVALIDATION_POLL_INTERVAL = float(os.getenv('INVALIDATION_POLL_INTERVAL', '1'))
+
+    # Cache disque des derniers instantanés valides (vide = désactivé) : relu
+    # au démarrage pour servir immédiatement, puis revalidé en arrière-plan
+    WARM_CACHE_DIR = os.getenv('WARM_CACHE_DIR', '')
+    # Cache disque des fichiers YAML parsés, indexé par hash du contenu (vide =
+    # désactivé) : conservé entre redémarrages. Répertoire privé au pod
+    # (emptyDir), jamais partagé entre pods : les artefacts sont relus avec
+    # marshal, après vérification de leur HMAC (SECRET_KEY)
+    YAML_CACHE_DIR = os.getenv('YAML_CACHE_DIR', '')
+
+    # Nombre de versions dont les changements sont conservés pour
+    # /api/<collection>/changes (au-delà : collection complète)
+    CHANGES_HISTORY_SIZE = int(os.getenv('CHANGES_HISTORY_SIZE', '100'))
+
+    # Flux /api/updates (Server-Sent Events) : heartbeat et durée maximale
+    # d'une connexion (le client se reconnecte avec Last-Event-ID), en
+    # secondes, et intervalle de détection des nouveaux instantanés
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', '15'))
+    SSE_MAX_DURATION = float(os.getenv('SSE_MAX_DURATION', '1800'))
+    SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', '1'))
+    # Flux simultanés par worker (0 = illimité), au-delà : 503 avec
+    # Retry-After (secondes). Un worker gthread consacre un thread à chaque
+    # flux : par défaut la moitié de ses threads, l'autre moitié restant aux
+    # requêtes et aux sondes ; illimité avec gevent (une greenlet par flux)
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS') or (
+        0 if os.getenv('GUNICORN_WORKER_CLASS') == 'gevent'
+        else max(1, int(os.getenv('GUNICORN_THREADS', '4')) // 2)
+    ))
+    SSE_RETRY_AFTER = int(os.getenv('SSE_RETRY_AFTER', '10'))
+
+    # Taille minimale (octets) d'une réponse pour la pré-compresser (gzip/brotli)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '256'))
 
     # Fichiers de contenu dans le Blob
     EVENTS_FILE = os.getenv('EVENTS_FILE', 'events.json')
@@ -62,3 +191,13 @@ def get_config():
     """Retourne la configuration selon FLASK_ENV"""
     env = os.getenv('FLASK_ENV', 'development')
     return config_by_name.get(env, DevelopmentConfig)
+
+
+def get_setting(config, name, default=None):
+    """
+    Lit un paramètre depuis une classe de configuration ou un mapping
+    (app.config de Flask est un dict, getattr n'y voit pas les clés).
+    """
+    if isinstance(config, Mapping):
+        return config.get(name, default)
+    return getattr(config, name, default)
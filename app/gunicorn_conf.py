@@ -0,0 +1,112 @@
+"""
+Configuration gunicorn pour la production
+
+    gunicorn --config app/gunicorn_conf.py app.main:app
+
+- Nombre de workers et de threads calculé depuis la limite CPU du conteneur
+  (cgroup), surchargeable par GUNICORN_WORKERS / GUNICORN_THREADS
+- preload_app : l'application et le contenu parsé sont construits une fois
+  dans le master avant le fork, puis partagés en copy-on-write
+- Recyclage des workers (max_requests + jitter) et arrêt gracieux
+- GUNICORN_WORKER_CLASS=gevent pour servir des milliers de connexions
+  /api/updates (Server-Sent Events) inactives : une greenlet par connexion
+  au lieu d'un thread (avec gthread, SSE_MAX_STREAMS borne les flux par
+  worker, voir app/config.py)
+"""
+import math
+import os
+
+
+def cpu_limit() -> float:
+    """
+    Nombre de CPU alloués au conteneur : quota cgroup v2 (cpu.max) ou v1
+    (cfs_quota_us / cfs_period_us), à défaut le nombre de CPU de la machine.
+    """
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return float(os.cpu_count() or 1)
+
+
+CPUS = cpu_limit()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Les réponses sont servies depuis le cache (CPU) : un worker par CPU alloué
+# (au moins 2 pour les redémarrages sans coupure), et des threads pour
+# absorber les attentes réseau (clients lents, revalidations Azure)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('GUNICORN_WORKERS', max(2, math.ceil(CPUS))))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+# Connexions simultanées par worker gevent (flux SSE compris)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '5000'))
+
+if worker_class == 'gevent':
+    # Avant l'import de l'application (preload_app) : threads, verrous,
+    # sockets et attentes deviennent coopératifs dans le master et les workers
+    from gevent import monkey
+    monkey.patch_all()
+
+preload_app = True
+
+# Recyclage des workers (limite les fuites mémoire), avec jitter pour ne pas
+# les redémarrer tous en même temps
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '20000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '2000'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Heartbeat des workers en mémoire (évite les blocages sur l'overlay Docker)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Le log d'accès est produit par l'application (JSON, voir app/logging_config.py)
+accesslog = None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+# Métriques multi-processus (voir app/services/metrics.py) : le répertoire doit
+# exister avant l'import de l'application (preload_app)
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def when_ready(server):
+    # Master : charger le contenu avant de forker les workers (partagé en
+    # copy-on-write). Le rafraîchissement tourne dans les workers, pas ici.
+    from app.main import content_service
+    content_service.stop_refresher()
+    if set(content_service.restored_files) >= set(content_service.content_files()):
+        # Contenu relu depuis le cache disque : pas d'attente sur la source,
+        # la revalidation se fait dans les workers
+        server.log.info("Content restored from warm cache: %s", content_service.restored_files)
+        return
+    loaded = content_service.warm_up()
+    server.log.info("Content preloaded: %s", loaded)
+
+
+def post_fork(server, worker):
+    from app.main import app, content_service
+    # En mode partagé, le rafraîchissement élit le worker qui charge le contenu
+    if app.config.get('CONTENT_REFRESH_INTERVAL') or app.config.get('SHARED_SNAPSHOT_DIR'):
+        content_service.start_refresher()
+
+
+def child_exit(server, worker):
+    from app.services.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,247 @@
+"""
+Logging structuré JSON (Azure Monitor) non bloquant
+
+Les handlers de l'application se contentent de placer les records dans une
+file bornée ; un thread dédié les formate et les écrit par lots. Si la file
+est pleine, le record est abandonné (et compté) plutôt que de bloquer la
+requête. Les messages DEBUG volumineux (ex. "Cache hit") sont échantillonnés
+et limités en débit.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Dict, Optional, Tuple
+
+from app.services import metrics
+
+# Champs propres à la requête ajoutés aux records (voir RequestContextFilter)
+REQUEST_FIELDS = ('request_id', 'route', 'method', 'status', 'duration_ms', 'cache')
+
+_STOP = object()
+
+
+class JSONFormatter(logging.Formatter):
+    """Formatte un record en une ligne JSON"""
+
+    def format(self, record):
+        log_record = {
+            # Date de création du record (et non de son écriture, différée)
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+            "logger": record.name
+        }
+        for field in REQUEST_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_record[field] = value
+        if record.exc_info:
+            log_record["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_record)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute aux records émis pendant une requête Flask ses champs (request_id, route...)"""
+
+    def filter(self, record):
+        # Import local : le logging est configuré avant la création de l'app
+        from flask import g, has_request_context, request
+        if has_request_context():
+            if getattr(record, 'request_id', None) is None:
+                record.request_id = g.get('request_id')
+            if getattr(record, 'route', None) is None and request.url_rule is not None:
+                record.route = request.url_rule.rule
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Échantillonne et limite en débit les records de niveau <= `level` :
+    un record sur `sample_rate` est conservé, et au plus `rate_limit` par
+    seconde pour un même message (logger + format).
+    """
+
+    def __init__(self, level: int = logging.DEBUG, sample_rate: int = 1,
+                 rate_limit: int = 0, clock=time.monotonic):
+        super().__init__()
+        self.level = level
+        self.sample_rate = max(1, sample_rate)
+        self.rate_limit = rate_limit
+        self._clock = clock
+        self._counters: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        key = (record.name, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            if len(self._counters) > 10000:
+                self._counters.clear()
+            # [compteur d'échantillonnage, début de la fenêtre, émis dans la fenêtre]
+            counter = self._counters.setdefault(key, [0, now, 0])
+            counter[0] += 1
+            if (counter[0] - 1) % self.sample_rate:
+                return False
+            if self.rate_limit:
+                if now - counter[1] >= 1:
+                    counter[1], counter[2] = now, 0
+                if counter[2] >= self.rate_limit:
+                    return False
+                counter[2] += 1
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui n'attend jamais : record abandonné si la file est pleine"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Pas de formatage sur le thread appelant : le listener s'en charge
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.LOG_RECORDS_DROPPED.inc()
+
+
+class BatchingListener:
+    """Thread qui vide la file et écrit les records formatés par lots"""
+
+    def __init__(self, log_queue: queue.Queue, handler: logging.Handler, batch_size: int = 100):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Écrit les records en attente puis arrête le thread"""
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is _STOP for record in batch)
+            self._write([record for record in batch if record is not _STOP])
+            if stop:
+                return
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            if record.levelno < self.handler.level:
+                continue
+            try:
+                lines.append(self.handler.format(record))
+            except Exception:
+                self.handler.handleError(record)
+        if not lines:
+            return
+        stream = self.handler.stream
+        try:
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+        except Exception:
+            pass
+
+
+class AsyncLogging:
+    """Pipeline de logging : file bornée + listener, relancé après fork()"""
+
+    def __init__(self, stream=None, queue_size: int = 10000, batch_size: int = 100):
+        self.stream = stream or sys.stderr
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.output = logging.StreamHandler(self.stream)
+        self.output.setFormatter(JSONFormatter())
+        self.handler: Optional[DroppingQueueHandler] = None
+        self.listener: Optional[BatchingListener] = None
+
+    def start(self) -> DroppingQueueHandler:
+        log_queue = queue.Queue(maxsize=self.queue_size)
+        if self.handler is None:
+            self.handler = DroppingQueueHandler(log_queue)
+        else:
+            self.handler.queue = log_queue
+        self.listener = BatchingListener(log_queue, self.output, self.batch_size)
+        self.listener.start()
+        return self.handler
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+
+    def after_fork(self):
+        # Le thread du parent n'existe pas dans le worker : nouvelle file et
+        # nouveau listener (les records en attente du parent sont abandonnés)
+        self.start()
+
+
+_pipeline: Optional[AsyncLogging] = None
+
+
+def configure_logging(level: str = 'INFO', queue_size: int = 10000, batch_size: int = 100,
+                      debug_sample_rate: int = 1, debug_rate_limit: int = 0,
+                      stream=None) -> AsyncLogging:
+    """
+    Installe le pipeline de logging asynchrone sur le logger racine
+    (remplace les handlers existants). Idempotent.
+
+    Args:
+        level: Niveau minimal des logs
+        queue_size: Taille de la file (records abandonnés au-delà)
+        batch_size: Nombre maximal de records écrits par lot
+        debug_sample_rate: Un record DEBUG sur N est conservé
+        debug_rate_limit: Records DEBUG max par seconde et par message (0 = illimité)
+        stream: Flux de sortie (stderr par défaut)
+
+    Returns:
+        Le pipeline installé
+    """
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+    else:
+        os.register_at_fork(after_in_child=lambda: _pipeline and _pipeline.after_fork())
+        atexit.register(lambda: _pipeline and _pipeline.stop())
+
+    _pipeline = AsyncLogging(stream, queue_size, batch_size)
+    handler = _pipeline.start()
+    handler.addFilter(SamplingFilter(logging.DEBUG, debug_sample_rate, debug_rate_limit))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    return _pipeline
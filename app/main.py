@@ -1,66 +1,170 @@
 """
 Application Flask principale - Plateforme de diffusion de contenu statique
+
+L'application est construite par create_app() ; `app.main:app` (gunicorn,
+flask --app) désigne l'application par défaut, créée au premier accès à
+l'attribut `app` du module et non à son import.
 """
-import os
-import json
+import time
+import uuid
+import hashlib
+import hmac
 import logging
-from datetime import datetime
-from flask import Flask, jsonify, render_template_string
-from app.config import Config
+import threading
+from collections.abc import Mapping
+from typing import Optional
+from flask import Blueprint, Flask, Response, current_app, g, jsonify, request
+from jinja2 import Environment
+from app.config import get_config
+from app.logging_config import configure_logging
+from app.services import metrics
 from app.services.content_service import ContentService
+from app.services.invalidation import InvalidPayloadError, parse_invalidation
+from app.services.query import InvalidQueryError, ItemQuery
+from app.services.snapshot import IDENTITY, body_chunks, encode_json
+from app.services.updates import parse_event_id
 
-# Configuration du logging structuré pour Azure Monitor (US-08)
-class JSONFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "module": record.module,
-            "logger": record.name
-        }
-        if record.exc_info:
-            log_record["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_record)
-
-handler = logging.StreamHandler()
-handler.setFormatter(JSONFormatter())
-logging.root.addHandler(handler)
-logging.root.setLevel(logging.INFO)
-# Supprimer le handler par défaut s'il existe pour éviter les doublons
-logging.getLogger().handlers = [handler]
 logger = logging.getLogger(__name__)
 
-# Instance Flask
-app = Flask(__name__)
-app.config.from_object(Config)
+# Routes de l'application (enregistrées par create_app)
+bp = Blueprint('content', __name__)
+
+
+def create_app(config=None, content_service: Optional[ContentService] = None) -> Flask:
+    """
+    Crée l'application Flask.
+
+    Args:
+        config: Classe, objet ou mapping de configuration (par défaut selon
+            FLASK_ENV)
+        content_service: Service de contenu à utiliser (par défaut construit
+            depuis la configuration, rafraîchissement en arrière-plan compris)
+
+    Returns:
+        Application Flask
+    """
+    flask_app = Flask(__name__)
+    config = config or get_config()
+    if isinstance(config, Mapping):
+        flask_app.config.update(config)
+    else:
+        flask_app.config.from_object(config)
+
+    # Logging structuré JSON pour Azure Monitor (US-08), écrit par un thread
+    # dédié pour ne pas ralentir les requêtes
+    configure_logging(
+        level=flask_app.config.get('LOG_LEVEL', 'INFO'),
+        queue_size=flask_app.config.get('LOG_QUEUE_SIZE', 10000),
+        batch_size=flask_app.config.get('LOG_BATCH_SIZE', 100),
+        debug_sample_rate=flask_app.config.get('LOG_DEBUG_SAMPLE_RATE', 100),
+        debug_rate_limit=flask_app.config.get('LOG_DEBUG_RATE_LIMIT', 10)
+    )
+
+    if content_service is None:
+        # Initialisation du service de contenu (Azure + Cache)
+        content_service = ContentService(flask_app.config)
+        # Préchargement et rafraîchissement en arrière-plan (optionnel) : les
+        # requêtes ne bloquent alors plus sur Azure. Relancé automatiquement
+        # dans chaque worker forké par gunicorn.
+        if flask_app.config.get('CONTENT_REFRESH_INTERVAL') or flask_app.config.get('SHARED_SNAPSHOT_DIR'):
+            content_service.start_refresher()
+    flask_app.extensions['content_service'] = content_service
+
+    flask_app.register_blueprint(bp)
+    return flask_app
+
+
+def current_service() -> ContentService:
+    """Service de contenu de l'application courante"""
+    return current_app.extensions['content_service']
+
+
+# Application par défaut (`app.main:app`), créée au premier accès
+_default_app: Optional[Flask] = None
+_default_app_lock = threading.Lock()
+
+
+def get_app() -> Flask:
+    """Application par défaut, configurée selon FLASK_ENV"""
+    global _default_app
+    with _default_app_lock:
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+
 
-# Initialisation du service de contenu (Azure + Cache)
-content_service = ContentService(app.config)
+def __getattr__(name):
+    # `from app.main import app, content_service` (gunicorn, tests)
+    if name == 'app':
+        return get_app()
+    if name == 'content_service':
+        return get_app().extensions['content_service']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# =============================================================================
+# INSTRUMENTATION (métriques Prometheus, log d'accès)
+# =============================================================================
+
+@bp.before_app_request
+def start_request():
+    g.request_start = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+
+@bp.after_app_request
+def finish_request(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    duration = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.HTTP_REQUEST_DURATION.labels(route).observe(duration)
+    metrics.HTTP_REQUESTS.labels(route, request.method, response.status_code).inc()
+
+    response.headers['X-Request-ID'] = g.request_id
+    if current_app.config.get('ACCESS_LOG'):
+        logger.info("%s %s %s", request.method, request.path, response.status_code, extra={
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "cache": g.get('cache_status'),
+        })
+    return response
+
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Métriques au format Prometheus (agrégées sur tous les workers)"""
+    body, content_type = metrics.render_metrics()
+    return Response(body, content_type=content_type)
 
 
 # =============================================================================
 # ENDPOINTS DE SANTÉ (Health Checks)
 # =============================================================================
 
-@app.route('/healthz', methods=['GET'])
+@bp.route('/healthz', methods=['GET'])
 def healthz():
     """Liveness probe"""
     return jsonify({"status": "healthy"}), 200
 
 
-@app.route('/readyz', methods=['GET'])
+@bp.route('/readyz', methods=['GET'])
 def readyz():
-    """Readiness probe"""
-    is_ready = content_service.is_blob_available() if not app.config.get('USE_LOCAL_FILES') else True
+    """
+    Readiness probe : calculée depuis l'état du cache et des chargements
+    (aucun appel à Azure pendant la requête)
+    """
+    content_service = current_service()
+    readiness = content_service.readiness()
+    is_ready = readiness.pop("ready")
     status = 200 if is_ready else 503
-    return jsonify({
-        "status": "ready" if is_ready else "not_ready",
-        "azure_connection": "connected" if is_ready else "failed"
-    }), status
+    return jsonify({"status": "ready" if is_ready else "not_ready", **readiness}), status
 
 
-@app.route('/health', methods=['GET'])
+@bp.route('/health', methods=['GET'])
 def health():
     """Alias pour compatibilité"""
     return jsonify({"status": "healthy"}), 200
@@ -70,25 +174,227 @@ def health():
 # ENDPOINTS API REST
 # =============================================================================
 
-@app.route('/api/events', methods=['GET'])
+def content_response(collection):
+    """
+    Sert le JSON pré-encodé (et pré-compressé selon Accept-Encoding) d'une
+    collection avec ETag et Last-Modified.
+    Répond 304 Not Modified si le client possède déjà cette version.
+    """
+    content_service = current_service()
+    filename = content_service.filename_for(collection)
+    snapshot, g.cache_status = content_service.lookup(filename)
+    if snapshot is None:
+        return jsonify({"items": [], "error": f"Unable to load {filename}"}), 200
+    if ItemQuery.requested(request.args):
+        return query_response(snapshot)
+
+    encoding = request.accept_encodings.best_match(snapshot.encodings, default=IDENTITY)
+    body, etag = snapshot.representation(encoding)
+
+    if isinstance(body, memoryview):
+        # Instantané partagé : vue sur le fichier projeté, envoyée par
+        # morceaux plutôt que copiée en entier à chaque requête
+        response = Response(body_chunks(body), mimetype='application/json')
+        response.content_length = len(body)
+    else:
+        response = Response(body, mimetype='application/json')
+    if encoding != IDENTITY:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.last_modified = snapshot.last_modified
+    # Le client peut stocker la réponse mais doit la revalider (If-None-Match)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def query_response(snapshot):
+    """
+    Répond à une requête paginée / filtrée / projetée
+    (?limit=&cursor=&sort=&fields=&date_from=&date_to=&location=)
+    à partir des index précalculés de l'instantané.
+    """
+    try:
+        query = ItemQuery.from_args(request.args)
+    except InvalidQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    if snapshot.index is None:
+        return jsonify({"error": f"{snapshot.filename} has no items to query"}), 400
+
+    response = Response(encode_json(snapshot.index.select(query)), mimetype='application/json')
+    # Même version de contenu + mêmes paramètres = même réponse
+    query_hash = hashlib.blake2b(request.query_string, digest_size=8).hexdigest()
+    response.set_etag(f"{snapshot.etag}-q{query_hash}")
+    response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@bp.route('/api/events', methods=['GET'])
 def get_events():
-    return jsonify(content_service.get_events()), 200
+    return content_response('events')
 
 
-@app.route('/api/news', methods=['GET'])
+@bp.route('/api/news', methods=['GET'])
 def get_news():
-    return jsonify(content_service.get_news()), 200
+    return content_response('news')
 
 
-@app.route('/api/faq', methods=['GET'])
+@bp.route('/api/faq', methods=['GET'])
 def get_faq():
-    return jsonify(content_service.get_faq()), 200
+    return content_response('faq')
+
+
+@bp.route('/api/<collection>/changes', methods=['GET'])
+def get_changes(collection):
+    """
+    Flux incrémental : /api/events/changes?since=<version> renvoie les éléments
+    ajoutés, modifiés et supprimés depuis cette version (collection complète
+    sans `since` ou si la version n'est plus dans l'historique)
+    """
+    content_service = current_service()
+    if collection not in ContentService.COLLECTIONS:
+        return jsonify({"error": f"Unknown collection: {collection}"}), 404
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since must be an integer version"}), 400
+
+    result = content_service.changes(collection, since)
+    if result is None:
+        filename = content_service.filename_for(collection)
+        return jsonify({"error": f"Unable to load {filename}"}), 503
+    snapshot, changes = result
+
+    response = Response(encode_json(changes), mimetype='application/json')
+    # Même version de contenu + même `since` = même réponse
+    response.set_etag(f"{snapshot.etag}-since-{'all' if since is None else since}")
+    response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@bp.route('/api/updates', methods=['GET'])
+def updates():
+    """
+    Notifications de mise à jour en Server-Sent Events : un événement par
+    collection modifiée, avec le delta depuis la version précédente. Reprise
+    après coupure via Last-Event-ID (ou ?last_event_id=). Au-delà de
+    SSE_MAX_STREAMS flux dans le worker : 503 avec Retry-After.
+    """
+    content_service = current_service()
+    slots = content_service.update_slots
+    if not slots.acquire():
+        metrics.SSE_REJECTED.inc()
+        response = jsonify({"error": "Too many update streams, retry later"})
+        response.headers['Retry-After'] = str(current_app.config.get('SSE_RETRY_AFTER', 10))
+        return response, 503
+
+    known = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    stream = content_service.update_stream(
+        known,
+        heartbeat=current_app.config.get('SSE_HEARTBEAT_INTERVAL', 15),
+        max_duration=current_app.config.get('SSE_MAX_DURATION', 0)
+    )
+    response = Response(stream, mimetype='text/event-stream')
+    # Libéré à la fermeture de la réponse par le serveur WSGI, même si le
+    # flux n'a jamais été itéré (client parti avant le premier octet)
+    response.call_on_close(slots.release)
+    response.cache_control.no_cache = True
+    # Pas de mise en tampon par un proxy nginx (ingress)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/api/search', methods=['GET'])
+def search():
+    """Recherche plein texte : /api/search?q=...&collection=events,news&limit=20"""
+    content_service = current_service()
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing query parameter: q"}), 400
+
+    collections = None
+    if request.args.get('collection'):
+        collections = [name.strip() for name in request.args['collection'].split(',') if name.strip()]
+        unknown = [name for name in collections if name not in ContentService.COLLECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown collection(s): {', '.join(unknown)}"}), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= 100:
+        return jsonify({"error": "limit must be between 1 and 100"}), 400
+
+    result = content_service.search(query, collections, limit)
+    return Response(encode_json({"query": query, **result}), mimetype='application/json')
+
+
+def is_authorized(token):
+    """
+    Vérifie le jeton d'une requête d'administration : en-tête
+    Authorization: Bearer, ou paramètre ?token= (URL d'abonnement Event Grid).
+    Comparaison en temps constant.
+    """
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        credentials = request.args.get('token', '')
+    return hmac.compare_digest(credentials.strip().encode('utf-8'), token.encode('utf-8'))
+
+
+@bp.route('/api/invalidate', methods=['POST', 'OPTIONS'])
+def invalidate():
+    """
+    Invalidation par webhook : notifications Azure Event Grid (BlobCreated /
+    BlobDeleted, validation de l'abonnement comprise, schéma Event Grid ou
+    CloudEvents) ou {"files": [...]}. Les fichiers modifiés sont rechargés en
+    arrière-plan, les fichiers supprimés évincés, dans tous les workers du pod.
+    """
+    token = current_app.config.get('INVALIDATION_TOKEN')
+    if not token:
+        return jsonify({"error": "Invalidation is disabled"}), 404
+    if not is_authorized(token):
+        response = jsonify({"error": "Unauthorized"})
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response, 401
+
+    if request.method == 'OPTIONS':
+        # Poignée de main CloudEvents (protection contre l'abus de webhook) :
+        # l'origine annoncée est autorisée à livrer ses événements
+        origin = request.headers.get('WebHook-Request-Origin')
+        if not origin:
+            return jsonify({"error": "Missing WebHook-Request-Origin header"}), 400
+        response = Response(status=200)
+        response.headers['WebHook-Allowed-Origin'] = origin
+        response.headers['Allow'] = 'POST, OPTIONS'
+        return response
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({"error": "Expected a JSON body"}), 400
+    try:
+        notification = parse_invalidation(payload, current_app.config.get('BLOB_CONTAINER_NAME'))
+    except InvalidPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if notification.validation_code is not None:
+        # Poignée de main de l'abonnement Event Grid
+        return jsonify({"validationResponse": notification.validation_code}), 200
+
+    invalidated = current_service().invalidate(notification.filenames, notification.deleted)
+    ignored = [name for name in notification.filenames if name not in invalidated]
+    return jsonify({"invalidated": invalidated, "ignored": ignored}), 202
 
 
 # =============================================================================
 # INTERFACE WEB MINIMALE
 # =============================================================================
-# ... (le template HTML reste identique, je le réutilise pour la concision) ...
+# Rendue côté serveur depuis l'instantané des news (aucun appel du navigateur
+# à l'API), puis mise en cache jusqu'au prochain changement des news
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="fr">
@@ -107,32 +413,61 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 <body>
     <div class="container">
         <h1>🚀 Plateforme Cloud (Azure V2)</h1>
-        <div id="status">Chargement...</div>
+        <div id="status">
+            {%- if connected %}<span class="success">✅ Connecté à Azure Blob Storage</span>
+            {%- else %}❌ Erreur Connexion{% endif -%}
+        </div>
         <hr>
         <h2>Dernières News</h2>
-        <div id="news"></div>
+        <div id="news">
+        {%- for item in items %}
+            <div class="item"><h3>{{ item.title }}</h3><p>{{ item.content }}</p></div>
+        {%- else %}
+            Aucune news
+        {%- endfor %}
+        </div>
     </div>
-    <script>
-        fetch('/readyz')
-            .then(r => r.json())
-            .then(d => document.getElementById('status').innerHTML = 
-                d.status === 'ready' ? '<span class="success">✅ Connecté à Azure Blob Storage</span>' : '❌ Erreur Connexion')
-            .catch(() => document.getElementById('status').innerText = '❌ API Inaccessible');
-
-        fetch('/api/news')
-            .then(r => r.json())
-            .then(d => {
-                const html = d.items ? d.items.map(i => `<div class="item"><h3>${i.title}</h3><p>${i.content}</p></div>`).join('') : 'Aucune news';
-                document.getElementById('news').innerHTML = html;
-            });
-    </script>
 </body>
 </html>"""
 
-@app.route('/', methods=['GET'])
+# Template compilé une seule fois (échappement HTML automatique)
+INDEX_TEMPLATE = Environment(autoescape=True).from_string(HTML_TEMPLATE)
+
+def render_index(snapshot, connected):
+    """
+    Page d'accueil pour une version des news, rendue seulement si cette
+    version (ou l'état de connexion) a changé depuis le dernier rendu de
+    l'application courante (mémorisé dans ses extensions : (version des
+    news, état de connexion), HTML, ETag).
+
+    Returns:
+        (HTML encodé, ETag)
+    """
+    key = (snapshot.etag if snapshot is not None else None, connected)
+    page = current_app.extensions.get('index_page')
+    if page is None or page[0] != key:
+        data = snapshot.data if snapshot is not None else None
+        items = data.get('items', []) if isinstance(data, dict) else []
+        html = INDEX_TEMPLATE.render(items=items, connected=connected).encode('utf-8')
+        page = (key, html, hashlib.blake2b(html, digest_size=8).hexdigest())
+        current_app.extensions['index_page'] = page
+    return page[1], page[2]
+
+
+@bp.route('/', methods=['GET'])
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    content_service = current_service()
+    snapshot, g.cache_status = content_service.lookup(content_service.filename_for('news'))
+    connected = content_service.is_connected()
+    html, etag = render_index(snapshot, connected)
+
+    response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    if snapshot is not None:
+        response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    create_app().run(host='0.0.0.0', port=5000)
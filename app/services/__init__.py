@@ -1,6 +1,18 @@
 """
 Services de l'application
+
+ContentService et ContentSnapshot sont importés à la première utilisation :
+importer un module de app.services (metrics, par exemple) ne charge pas tout
+le service de contenu.
 """
-from .content_service import ContentService
+__all__ = ['ContentService', 'ContentSnapshot']
+
 
-__all__ = ['ContentService']
+def __getattr__(name):
+    if name == 'ContentService':
+        from .content_service import ContentService
+        return ContentService
+    if name == 'ContentSnapshot':
+        from .snapshot import ContentSnapshot
+        return ContentSnapshot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,430 @@
+"""
+Cache mémoire des contenus.
+
+Ajoute au simple TTL :
+- un verrou par clé (single-flight) : un seul chargement à la fois par fichier
+- stale-while-revalidate : la copie périmée est servie pendant qu'un
+  rechargement tourne en arrière-plan
+- stale-if-error : la dernière copie valide est servie si le rechargement échoue
+- un budget mémoire : éviction LRU selon la taille estimée des entrées
+  (réévaluée à la lecture, une valeur pouvant grossir une fois en cache), et
+  refus des entrées trop volumineuses (servies, puis conservées seulement
+  `refused_ttl` secondes hors budget, et sous forme compacte au-delà pour
+  les revalidations conditionnelles)
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from cachetools import Cache, LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Statuts renvoyés par ContentCache.get
+HIT = 'hit'
+MISS = 'miss'
+STALE = 'stale'              # périmé, revalidation lancée en arrière-plan
+STALE_ERROR = 'stale_error'  # périmé, servi car le rechargement a échoué
+ERROR = 'error'              # aucune copie servable
+
+
+@dataclass
+class CacheEntry:
+    """Valeur en cache, date (horloge monotone) de son chargement et taille estimée"""
+    value: Any
+    stored_at: float
+    size: int = 0
+
+
+class _EvictingLRUCache(LRUCache):
+    """
+    LRUCache borné en taille totale des entrées (octets) et en nombre
+    d'entrées, qui signale les évictions (dépassement de capacité)
+    """
+
+    def __init__(self, max_entries, max_bytes=0, on_evict=None):
+        super().__init__(maxsize=max_bytes or math.inf, getsizeof=lambda entry: entry.size)
+        self.max_entries = max_entries
+        self._on_evict = on_evict
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            while len(self) >= self.max_entries:
+                self.popitem()
+        super().__setitem__(key, value)
+
+    def popitem(self):
+        key, value = super().popitem()
+        if self._on_evict is not None:
+            self._on_evict(key)
+        return key, value
+
+    def sizes(self) -> Dict[str, int]:
+        """Taille de chaque entrée, sans modifier l'ordre LRU"""
+        return {key: Cache.__getitem__(self, key).size for key in self}
+
+
+class CacheResult(NamedTuple):
+    """Résultat d'une lecture du cache"""
+    value: Any
+    status: str
+
+
+class ContentCache:
+    """
+    Cache LRU thread-safe avec TTL, single-flight, stale-while-revalidate
+    et stale-if-error.
+
+    Le loader reçoit la clé et la valeur actuellement en cache (ou None),
+    ce qui permet une revalidation conditionnelle ; il retourne la nouvelle
+    valeur (éventuellement la précédente si rien n'a changé), ou None en
+    cas d'échec (la valeur précédente est alors conservée).
+    """
+
+    def __init__(self, ttl: float, stale_while_revalidate: float = 0,
+                 stale_if_error: float = 0, maxsize: int = 100,
+                 max_bytes: int = 0, max_entry_bytes: int = 0, refused_ttl: float = 0,
+                 getsizeof: Optional[Callable[[Any], int]] = None,
+                 shrink: Optional[Callable[[Any], Any]] = None,
+                 max_workers: int = 2, clock: Callable[[], float] = time.monotonic,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 on_refuse: Optional[Callable[[str, int], None]] = None,
+                 on_resize: Optional[Callable[[int], None]] = None):
+        """
+        Args:
+            ttl: Durée de fraîcheur d'une entrée (secondes)
+            stale_while_revalidate: Fenêtre après le TTL pendant laquelle
+                l'entrée est servie et revalidée en arrière-plan
+            stale_if_error: Fenêtre après le TTL pendant laquelle l'entrée
+                est servie si le rechargement échoue
+            maxsize: Nombre maximal d'entrées
+            max_bytes: Taille totale maximale des entrées (0 = illimitée)
+            max_entry_bytes: Taille au-delà de laquelle une valeur n'est pas
+                conservée (0 = pas de limite autre que max_bytes)
+            refused_ttl: Durée pendant laquelle une valeur refusée reste servie
+                et sert de base aux revalidations conditionnelles (secondes,
+                0 = seulement transmise aux requêtes en attente de son chargement)
+            getsizeof: Taille estimée d'une valeur en octets (0 si absent)
+            shrink: Forme compacte d'une valeur refusée, conservée après
+                refused_ttl comme base des revalidations conditionnelles et
+                servable pendant un rechargement (absent : valeur libérée)
+            max_workers: Threads dédiés aux revalidations en arrière-plan
+            clock: Horloge monotone (injectable pour les tests)
+            on_evict: Appelé avec la clé de chaque entrée évincée
+            on_refuse: Appelé avec la clé et la taille de chaque valeur refusée
+            on_resize: Appelé avec la taille totale après chaque modification
+        """
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.max_workers = max_workers
+        self._clock = clock
+
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.refused_ttl = refused_ttl
+        self._getsizeof = getsizeof
+        self._shrink = shrink
+        self._on_refuse = on_refuse
+        self._on_resize = on_resize
+
+        self._entries = _EvictingLRUCache(maxsize, max_bytes, on_evict)
+        # Dernière valeur refusée (trop volumineuse) par clé, hors budget ;
+        # la valeur est réduite (shrink) ou libérée après refused_ttl, la date
+        # et la taille restent
+        self._refused: Dict[str, CacheEntry] = {}
+        self._shrunk = set()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        # Compteur de tentatives de chargement par clé : permet aux threads
+        # en attente sur le verrou de réutiliser le résultat du précédent
+        self._attempts: Dict[str, int] = {}
+        self._refreshing = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get(self, key: str, loader: Callable[[str, Any], Any]) -> CacheResult:
+        """
+        Retourne la valeur associée à la clé, en la chargeant si nécessaire.
+
+        Args:
+            key: Clé (nom de fichier)
+            loader: Fonction de chargement appelée au plus une fois à la fois
+
+        Returns:
+            CacheResult (valeur ou None, statut)
+        """
+        entry = self._touch(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age < self.ttl:
+                return CacheResult(entry.value, HIT)
+            if age < self.ttl + self.stale_while_revalidate:
+                self._schedule_refresh(key, loader)
+                return CacheResult(entry.value, STALE)
+        else:
+            refused = self._refused_entry(key, self.refused_ttl)
+            if refused is not None:
+                return CacheResult(refused.value, HIT)
+
+        return self._load(key, loader)
+
+    def refresh(self, key: str, loader: Callable[[str, Any], Any]) -> bool:
+        """
+        Recharge une clé immédiatement (single-flight), quel que soit son âge.
+
+        Returns:
+            True si une valeur valide est en cache après le rechargement
+        """
+        with self._key_lock(key):
+            return self._call_loader(key, loader) is not None
+
+    def is_fresh(self, key: str) -> bool:
+        """Indique si la clé est en cache et encore dans son TTL"""
+        entry = self.peek(key)
+        return entry is not None and self._clock() - entry.stored_at < self.ttl
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Retourne l'entrée en cache sans la charger ni vérifier son âge"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def servable(self, key: str) -> Optional[CacheEntry]:
+        """
+        Retourne l'entrée en cache si elle peut encore être servie sans
+        rechargement : dans son TTL ou dans la fenêtre stale-while-revalidate
+        / stale-if-error qui le suit (None au-delà). Une valeur refusée, même
+        réduite à sa forme compacte, est servable dans la même fenêtre.
+        """
+        entry = self._touch(key)
+        if entry is None:
+            return self._refused_entry(key, self._servable_window())
+        if self._clock() - entry.stored_at >= self._servable_window():
+            return None
+        return entry
+
+    def is_refused(self, key: str) -> bool:
+        """
+        Indique si la dernière valeur chargée pour la clé a été refusée (trop
+        volumineuse) dans la fenêtre où une entrée conservée serait encore
+        servable : la clé est alors servie, mais relue depuis la source
+        """
+        with self._lock:
+            refused = self._refused.get(key)
+        return refused is not None and self._clock() - refused.stored_at < self._servable_window()
+
+    def set(self, key: str, value: Any, stale: bool = False) -> bool:
+        """
+        Stocke une valeur fraîche, ou périmée (`stale`) : elle est alors servie
+        dans les fenêtres stale-while-revalidate / stale-if-error et revalidée
+        à la première lecture. Les entrées les moins récemment utilisées sont
+        évincées pour respecter le budget mémoire.
+
+        Returns:
+            False si la valeur est trop volumineuse pour être conservée
+            (l'entrée précédente, obsolète, est alors supprimée)
+        """
+        return self._store(key, value, self._clock() - (self.ttl if stale else 0))
+
+    def _store(self, key: str, value: Any, stored_at: float,
+               replaces: Optional[CacheEntry] = None) -> bool:
+        """
+        Stocke une valeur datée de `stored_at`, ou la refuse si elle est trop
+        volumineuse. Avec `replaces`, seulement si la clé contient encore
+        cette entrée (réévaluation de taille concurrente d'un rechargement).
+        """
+        size = self._getsizeof(value) if self._getsizeof is not None else 0
+        limit = min(filter(None, (self.max_entry_bytes, self.max_bytes)), default=0)
+        refused = bool(limit) and size > limit
+        with self._lock:
+            if replaces is not None and Cache.get(self._entries, key) is not replaces:
+                return True
+            self._shrunk.discard(key)
+            if refused:
+                self._entries.pop(key, None)
+                self._refused[key] = CacheEntry(value, stored_at, size)
+            else:
+                self._refused.pop(key, None)
+                self._entries[key] = CacheEntry(value, stored_at, size)
+            total = self._entries.currsize
+
+        if self._on_resize is not None:
+            self._on_resize(total)
+        if refused:
+            logger.warning("Not caching %s: estimated size %d bytes exceeds the %d bytes limit",
+                           key, size, limit)
+            if self._on_refuse is not None:
+                self._on_refuse(key, size)
+            return False
+        return True
+
+    def invalidate(self, key: str):
+        """Supprime une entrée"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._refused.pop(key, None)
+            self._shrunk.discard(key)
+            total = self._entries.currsize
+        if self._on_resize is not None:
+            self._on_resize(total)
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+            self._refused.clear()
+            self._shrunk.clear()
+        if self._on_resize is not None:
+            self._on_resize(0)
+
+    def describe(self) -> dict:
+        """Occupation du cache et taille estimée de chaque entrée (diagnostic)"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._entries.max_entries,
+                "bytes": self._entries.currsize,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "sizes": self._entries.sizes(),
+                "refused": {key: entry.size for key, entry in self._refused.items()},
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def reset_after_fork(self):
+        """
+        Réinitialise verrous et threads dans un processus enfant après fork()
+        (un verrou tenu par un thread du parent ne serait jamais relâché).
+        """
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+        self._executor = None
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _servable_window(self) -> float:
+        return self.ttl + max(self.stale_while_revalidate, self.stale_if_error)
+
+    def _touch(self, key: str) -> Optional[CacheEntry]:
+        """
+        Comme peek, en réévaluant la taille de l'entrée : une valeur peut
+        grossir une fois en cache (ex. données calculées à la première
+        utilisation), le budget mémoire en tient compte dès la lecture suivante
+        """
+        entry = self.peek(key)
+        if entry is not None and self._getsizeof is not None \
+                and self._getsizeof(entry.value) != entry.size:
+            self._store(key, entry.value, entry.stored_at, replaces=entry)
+            entry = self.peek(key)
+        return entry
+
+    def _refused_entry(self, key: str, max_age: float) -> Optional[CacheEntry]:
+        """
+        Dernière valeur refusée si elle a moins de `max_age` secondes. Au-delà
+        de refused_ttl, la valeur est d'abord réduite à sa forme compacte
+        (shrink) ou libérée.
+        """
+        with self._lock:
+            refused = self._refused.get(key)
+            if refused is None or refused.value is None:
+                return None
+            age = self._clock() - refused.stored_at
+            if age >= self.refused_ttl and key not in self._shrunk:
+                value = self._shrink(refused.value) if self._shrink is not None else None
+                refused = self._refused[key] = CacheEntry(value, refused.stored_at, refused.size)
+                self._shrunk.add(key)
+            if refused.value is None or age >= max_age:
+                return None
+            return refused
+
+    def _load(self, key: str, loader: Callable[[str, Any], Any]) -> CacheResult:
+        """Chargement synchrone, un seul thread à la fois par clé"""
+        with self._lock:
+            seen = self._attempts.get(key, 0)
+            waiting_since = self._clock()
+
+        with self._key_lock(key):
+            with self._lock:
+                attempted = self._attempts.get(key, 0) != seen
+                refused = self._refused.get(key)
+
+            if attempted:
+                # Un autre thread a chargé la clé pendant notre attente :
+                # on réutilise son résultat au lieu de refaire l'appel, y
+                # compris une valeur refusée (trop volumineuse) chargée depuis
+                entry = self.peek(key)
+                if entry is not None and self._clock() - entry.stored_at < self.ttl:
+                    return CacheResult(entry.value, HIT)
+                if refused is not None and refused.value is not None \
+                        and refused.stored_at >= waiting_since:
+                    return CacheResult(refused.value, HIT)
+                return self._serve_after_failure(key)
+
+            value = self._call_loader(key, loader)
+            if value is not None:
+                return CacheResult(value, MISS)
+            return self._serve_after_failure(key)
+
+    def _serve_after_failure(self, key: str) -> CacheResult:
+        """Sert la dernière copie valide si elle est dans la fenêtre stale-if-error"""
+        entry = self.peek(key)
+        if entry is not None and self._clock() - entry.stored_at < self.ttl + self.stale_if_error:
+            logger.warning("Serving stale content for %s after a failed reload", key)
+            return CacheResult(entry.value, STALE_ERROR)
+        return CacheResult(None, ERROR)
+
+    def _call_loader(self, key: str, loader: Callable[[str, Any], Any]) -> Any:
+        """Appelle le loader (verrou de la clé tenu) et stocke le résultat"""
+        # Une valeur refusée, même réduite à sa forme compacte, permet aussi
+        # une revalidation conditionnelle
+        previous = self.peek(key) or self._refused_entry(key, math.inf)
+        try:
+            value = loader(key, previous.value if previous is not None else None)
+        except Exception:
+            logger.exception("Unexpected error while loading %s", key)
+            value = None
+        finally:
+            with self._lock:
+                self._attempts[key] = self._attempts.get(key, 0) + 1
+
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, loader: Callable[[str, Any], Any]):
+        """Lance une revalidation en arrière-plan si aucune n'est en cours"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='content-refresh'
+                )
+            executor = self._executor
+        executor.submit(self._refresh, key, loader)
+
+    def _refresh(self, key: str, loader: Callable[[str, Any], Any]):
+        try:
+            with self._key_lock(key):
+                self._call_loader(key, loader)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
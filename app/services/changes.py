@@ -0,0 +1,189 @@
+"""
+Flux de changements incrémental d'une collection
+
+Chaque nouvel instantané est comparé au précédent, élément par élément
+(identifiés par leur champ `id`) : les identifiants ajoutés, modifiés et
+supprimés sont conservés dans un historique borné, par version. Un client
+qui connaît la version `since` ne reçoit que les éléments qui ont changé
+depuis ; si cette version n'est plus dans l'historique, ou n'a jamais été vue
+par ce worker (version publiée par un autre pod, qui a pu voir des états
+intermédiaires différents), il reçoit la collection complète.
+
+La version d'un instantané ne dépend que de lui (date de modification de la
+source en secondes, suivie de six chiffres tirés de son ETag) : elle est
+identique dans tous les workers et tous les pods, y compris pour deux
+contenus modifiés dans la même seconde.
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, List, NamedTuple, Optional
+
+from app.services.snapshot import ContentSnapshot, encode_json
+
+ADDED = 'added'
+UPDATED = 'updated'
+REMOVED = 'removed'
+
+
+class Change(NamedTuple):
+    """Identifiants des éléments modifiés entre une version et la précédente"""
+    version: int
+    added: FrozenSet[Any]
+    updated: FrozenSet[Any]
+    removed: FrozenSet[Any]
+
+
+# Chiffres de la version réservés à l'empreinte du contenu
+VERSION_HASH_RANGE = 10 ** 6
+
+
+def snapshot_version(snapshot: ContentSnapshot) -> int:
+    """
+    Version d'un instantané : date de modification en secondes, suivie de
+    l'empreinte de son ETag (deux contenus de même date ont des versions
+    distinctes, mais sans ordre entre elles)
+    """
+    seconds = int(snapshot.last_modified.timestamp())
+    return seconds * VERSION_HASH_RANGE + int(snapshot.etag, 16) % VERSION_HASH_RANGE
+
+
+def _items(snapshot: ContentSnapshot) -> list:
+    data = snapshot.data
+    items = data.get('items') if isinstance(data, dict) else None
+    return items if isinstance(items, list) else []
+
+
+def _positions(items: list) -> Optional[Dict[Any, int]]:
+    """Position de chaque élément par `id` (None si un id manque ou est dupliqué)"""
+    positions = {}
+    for position, item in enumerate(items):
+        item_id = item.get('id') if isinstance(item, dict) else None
+        if item_id is None or isinstance(item_id, (dict, list)) or item_id in positions:
+            return None
+        positions[item_id] = position
+    return positions
+
+
+class ChangeFeed:
+    """Historique borné des changements d'une collection. Thread-safe."""
+
+    def __init__(self, max_versions: int = 100):
+        """
+        Args:
+            max_versions: Nombre de versions dont les changements sont conservés
+        """
+        self._lock = threading.Lock()
+        self._history: Deque[Change] = deque(maxlen=max_versions)
+        # Instantané courant : ETag, version, position et empreinte des éléments
+        self.etag: Optional[str] = None
+        self.version: Optional[int] = None
+        self._modified: Optional[int] = None
+        self._positions: Optional[Dict[Any, int]] = None
+        self._fingerprints: Dict[Any, int] = {}
+        # Plus ancienne version à partir de laquelle un delta peut être calculé
+        self._base: Optional[int] = None
+
+    def update(self, snapshot: ContentSnapshot):
+        """Enregistre les changements de `snapshot` par rapport à l'instantané précédent"""
+        with self._lock:
+            self._record(snapshot)
+
+    def _record(self, snapshot: ContentSnapshot):
+        # Comparaison par version et non par ETag : un contenu revenu à un
+        # état antérieur (même ETag, nouvelle date) prend une nouvelle version,
+        # comme dans les pods qui ont vu l'état intermédiaire
+        version = snapshot_version(snapshot)
+        if version == self.version:
+            return
+        modified = version // VERSION_HASH_RANGE
+        if self._modified is not None and modified < self._modified:
+            # Instantané plus ancien que le courant (lu avant un rechargement)
+            return
+
+        items = _items(snapshot)
+        positions = _positions(items)
+        fingerprints = {} if positions is None else {
+            item_id: hash(encode_json(items[position])) for item_id, position in positions.items()
+        }
+        if self._positions is None or positions is None or modified == self._modified:
+            # Premier instantané, éléments sans identifiant unique, ou même
+            # date que le précédent (versions non ordonnées) : aucun delta
+            # possible vers les versions précédentes
+            self._history.clear()
+            self._base = version
+        else:
+            previous = self._fingerprints
+            if len(self._history) == self._history.maxlen:
+                self._base = self._history[0].version
+            self._history.append(Change(
+                version,
+                frozenset(fingerprints.keys() - previous.keys()),
+                frozenset(item_id for item_id, fingerprint in fingerprints.items()
+                          if item_id in previous and previous[item_id] != fingerprint),
+                frozenset(previous.keys() - fingerprints.keys()),
+            ))
+
+        self.etag = snapshot.etag
+        self.version = version
+        self._modified = modified
+        self._positions = positions
+        self._fingerprints = fingerprints
+
+    def changes_since(self, snapshot: ContentSnapshot, since: Optional[int] = None) -> dict:
+        """
+        Changements de la collection depuis la version `since`.
+
+        Args:
+            snapshot: Instantané courant de la collection (enregistré s'il est nouveau)
+            since: Version connue du client (None : collection complète)
+
+        Returns:
+            Delta {"version", "since", "full": False, "added", "updated", "removed"}
+            (éléments ajoutés et modifiés complets, identifiants des supprimés),
+            ou collection complète {"version", "full": True, "items"}
+        """
+        with self._lock:
+            self._record(snapshot)
+            version = snapshot_version(snapshot)
+            if version != self.version:
+                # Instantané dépassé pendant la requête : servi en entier
+                return {"version": version, "full": True, "items": _items(snapshot)}
+            if since is None or self._positions is None or not self._is_recorded(since):
+                return {"version": self.version, "full": True, "items": _items(snapshot)}
+
+            # Effet net de chaque élément entre `since` et la version courante
+            first: Dict[Any, str] = {}
+            last: Dict[Any, str] = {}
+            for change in self._history:
+                if change.version <= since:
+                    continue
+                for kind in (ADDED, UPDATED, REMOVED):
+                    for item_id in getattr(change, kind):
+                        first.setdefault(item_id, kind)
+                        last[item_id] = kind
+
+            items = _items(snapshot)
+            delta: Dict[str, List[Any]] = {ADDED: [], UPDATED: [], REMOVED: []}
+            for item_id, kind in last.items():
+                existed = first[item_id] != ADDED
+                if kind == REMOVED:
+                    if existed:
+                        delta[REMOVED].append(item_id)
+                else:
+                    delta[UPDATED if existed else ADDED].append(items[self._positions[item_id]])
+            return {"version": self.version, "since": since, "full": False, **delta}
+
+    def _is_recorded(self, version: int) -> bool:
+        """
+        Indique si un delta peut être calculé depuis `version` : version de
+        base ou version enregistrée dans l'historique de ce worker
+        """
+        return version == self._base or any(change.version == version for change in self._history)
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "oldest_version": self._base,
+                "versions": len(self._history),
+            }
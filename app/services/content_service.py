@@ -1,186 +1,1072 @@
 """
-Service de lecture des données depuis Azure Blob Storage ou fichiers locaux
-Implémente un cache mémoire avec TTL de 60 secondes
+Service de lecture des données depuis Azure Blob Storage, fichiers locaux,
+mémoire ou origine HTTP (voir app/services/storage.py)
+Implémente un cache mémoire avec TTL (60 secondes par défaut), single-flight,
+stale-while-revalidate et stale-if-error
+
+Le SDK Azure, requests et PyYAML ne sont importés qu'à la construction d'une
+source qui les utilise ou au premier fichier YAML.
 """
 import os
 import json
-import yaml
 import logging
-from typing import Any, Optional
-from cachetools import TTLCache
-from azure.storage.blob import BlobServiceClient
-from azure.core.exceptions import AzureError
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+from app.config import get_setting
+from app.services.cache import HIT, CacheResult, ContentCache
+from app.services.changes import ChangeFeed
+from app.services import metrics
+from app.services.health import HealthTracker
+from app.services.ingest import IngestError, ingest_json
+from app.services.invalidation import InvalidationBroadcaster
+from app.services.resilience import CLOSED, STATE_VALUES, CircuitBreaker, StorageGuard
+from app.services.warm_cache import WarmCache
+from app.services.yaml_content import ParsedArtifactCache, load_yaml
+from app.services.search import SearchIndex
+from app.services.shared_snapshot import SharedSnapshotStore
+from app.services.snapshot import ContentSnapshot, encode_json
+from app.services.storage import (
+    NOT_FOUND,
+    NOT_MODIFIED,
+    BlobStorage,
+    HTTPStorage,
+    LocalStorage,
+    MemoryStorage,
+    StorageBackend,
+    StorageError,
+)
+from app.services.updates import (
+    HEARTBEAT, RETRY, StreamSlots, UpdateBroadcaster, event_id, format_event, hello_event
+)
+
+if TYPE_CHECKING:
+    import requests
+    from azure.core.pipeline.transport import RequestsTransport
 
 logger = logging.getLogger(__name__)
 
 
+def is_yaml(filename: str) -> bool:
+    """Indique si un fichier de contenu est au format YAML (sinon JSON)"""
+    return filename.endswith('.yaml') or filename.endswith('.yml')
+
+
 class ContentService:
     """
-    Service pour lire le contenu depuis Azure Blob Storage ou fichiers locaux.
-    Utilise un cache mémoire avec TTL pour optimiser les performances.
+    Service pour lire le contenu depuis une source (Azure Blob Storage,
+    fichiers locaux...). Utilise un cache mémoire avec TTL pour optimiser les
+    performances.
     """
 
-    def __init__(self, config):
+    # Collection exposée par l'API -> (paramètre de configuration, fichier par défaut)
+    COLLECTIONS = {
+        'events': ('EVENTS_FILE', 'events.json'),
+        'news': ('NEWS_FILE', 'news.json'),
+        'faq': ('FAQ_FILE', 'faq.json'),
+    }
+
+    def __init__(self, config, storage: Optional[StorageBackend] = None):
         """
         Initialise le service avec la configuration donnée.
 
         Args:
             config: Objet de configuration contenant les paramètres Azure et cache
+            storage: Source du contenu (par défaut construite depuis
+                STORAGE_BACKEND, voir _build_storage)
         """
         self.config = config
-        self.cache_ttl = getattr(config, 'CACHE_TTL', 60)
+        self.cache_ttl = self._setting('CACHE_TTL', 60)
+
+        # Cache mémoire avec TTL : un seul chargement par fichier à la fois,
+        # copie périmée servie pendant la revalidation ou si Azure échoue,
+        # borné par l'empreinte mémoire estimée des instantanés
+        self._cache = ContentCache(
+            ttl=self.cache_ttl,
+            stale_while_revalidate=self._setting('CACHE_STALE_WHILE_REVALIDATE', 30),
+            stale_if_error=self._setting('CACHE_STALE_IF_ERROR', 3600),
+            maxsize=self._setting('CACHE_MAX_ENTRIES', 100),
+            max_bytes=self._setting('CACHE_MAX_BYTES', 0),
+            max_entry_bytes=self._setting('CACHE_MAX_ENTRY_BYTES', 0),
+            refused_ttl=self._setting('CACHE_REFUSED_TTL', 5),
+            getsizeof=ContentSnapshot.memory_size,
+            shrink=ContentSnapshot.compact,
+            on_evict=lambda key: metrics.CACHE_EVICTIONS.inc(),
+            on_refuse=lambda key, size: metrics.CACHE_REFUSED.labels(key).inc(),
+            on_resize=metrics.CACHE_BYTES.set
+        )
+
+        # État des chargements et de la connectivité (readiness probe)
+        self.health = HealthTracker()
+        self._connectivity_check_pending = False
+
+        # Index de recherche plein texte, mis à jour à chaque nouveau contenu
+        self.search_index = SearchIndex()
+
+        # Historique des changements par collection (flux incrémental)
+        self.change_feeds = {
+            collection: ChangeFeed(self._setting('CHANGES_HISTORY_SIZE', 100))
+            for collection in self.COLLECTIONS
+        }
+
+        # Mode partagé (SHARED_SNAPSHOT_DIR) : un seul worker charge le contenu
+        # et le publie dans un fichier projeté en mémoire par tous les autres
+        self.shared: Optional[SharedSnapshotStore] = None
+        self._published_etags: Dict[str, str] = {}
+        shared_dir = self._setting('SHARED_SNAPSHOT_DIR', '')
+        if shared_dir:
+            self.shared = SharedSnapshotStore(
+                shared_dir, poll_interval=self._setting('SHARED_SNAPSHOT_POLL_INTERVAL', 1)
+            )
+
+        # Invalidations reçues par webhook, propagées aux autres workers par
+        # des fichiers marqueurs (répertoire partagé)
+        self.invalidations: Optional[InvalidationBroadcaster] = None
+        invalidation_dir = self._setting('INVALIDATION_DIR', '') or (
+            os.path.join(shared_dir, 'invalidations') if shared_dir else ''
+        )
+        if invalidation_dir:
+            self.invalidations = InvalidationBroadcaster(
+                invalidation_dir, poll_interval=self._setting('INVALIDATION_POLL_INTERVAL', 1)
+            )
+
+        # Résultats de parsing YAML mémorisés sur disque (optionnel)
+        self._parsed_cache: Optional[ParsedArtifactCache] = None
+        if self._setting('YAML_CACHE_DIR', ''):
+            self._parsed_cache = ParsedArtifactCache(
+                self._setting('YAML_CACHE_DIR'),
+                secret=self._setting('SECRET_KEY', '').encode('utf-8')
+            )
+
+        # Pool borné pour les chargements parallèles (get_many / warm_up)
+        self._fetch_pool: Optional[ThreadPoolExecutor] = None
+        self._fetch_pool_lock = threading.Lock()
+
+        # Rafraîchissement en arrière-plan (optionnel, voir start_refresher)
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_stop = threading.Event()
+        self._refresher_interval = 0
 
-        # Cache mémoire avec TTL (max 100 entrées, expire après CACHE_TTL secondes)
-        self._cache = TTLCache(maxsize=100, ttl=self.cache_ttl)
+        # Diffusion des mises à jour (SSE) : créée à la première connexion,
+        # dans le worker (après le monkey-patching gevent éventuel)
+        self._broadcaster: Optional[UpdateBroadcaster] = None
+        self._update_watcher: Optional[threading.Thread] = None
+        self._update_payloads: Dict[tuple, bytes] = {}
+        self.update_slots = StreamSlots(self._setting('SSE_MAX_STREAMS', 0))
+        self._register_fork_handler()
 
-        # Client Azure Blob (initialisé si connection string disponible)
+        # Source du contenu
         self._blob_service_client = None
-        self._container_client = None
-        self._init_blob_client()
+        self.storage = storage if storage is not None else self._build_storage()
+
+        # Source distante : lectures bornées par une deadline, disjoncteur
+        # (échec immédiat, le cache sert la dernière copie valide) et
+        # lectures couvertes optionnelles
+        self.guard: Optional[StorageGuard] = None
+        if self.storage.remote:
+            self.guard = StorageGuard(
+                CircuitBreaker(
+                    failure_threshold=self._setting('BREAKER_FAILURE_THRESHOLD', 5),
+                    reset_timeout=self._setting('BREAKER_RESET_TIMEOUT', 30),
+                    on_change=lambda state: metrics.STORAGE_BREAKER_STATE.set(STATE_VALUES[state])
+                ),
+                deadline=self._setting('STORAGE_DEADLINE', 10),
+                hedge_delay=self._setting('STORAGE_HEDGE_DELAY', 0),
+                max_workers=self._setting('AZURE_POOL_SIZE', 10)
+            )
+
+        # Derniers instantanés valides sur disque : servis dès le démarrage
+        self._warm_cache: Optional[WarmCache] = None
+        self._warm_cache_writer: Optional[ThreadPoolExecutor] = None
+        self.restored_files: list = []
+        if self._setting('WARM_CACHE_DIR', ''):
+            self._warm_cache = WarmCache(self._setting('WARM_CACHE_DIR'))
+            self._restore_warm_cache()
+
+    def _setting(self, name: str, default: Any = None) -> Any:
+        """Lit un paramètre de configuration (objet ou app.config)"""
+        return get_setting(self.config, name, default)
+
+    def _register_fork_handler(self):
+        """Relance le rafraîchissement dans chaque worker forké (gunicorn)"""
+        ref = weakref.WeakMethod(self._after_fork)
+
+        def after_in_child():
+            handler = ref()
+            if handler is not None:
+                handler()
+
+        os.register_at_fork(after_in_child=after_in_child)
+
+    def _after_fork(self):
+        # Les threads du parent n'existent pas dans l'enfant
+        self._cache.reset_after_fork()
+        self._fetch_pool = None
+        self._warm_cache_writer = None
+        self._fetch_pool_lock = threading.Lock()
+        self._connectivity_check_pending = False
+        self._broadcaster = None
+        self._update_watcher = None
+        self.update_slots = StreamSlots(self.update_slots.limit)
+        if self.guard is not None:
+            self.guard.reset_after_fork()
+        if self.shared is not None:
+            self.shared.reset_after_fork()
+            self._published_etags = {}
+        was_running = self._refresher is not None
+        self._refresher = None
+        self._refresher_stop = threading.Event()
+        if was_running:
+            self.start_refresher(self._refresher_interval)
+
+    def _restore_warm_cache(self):
+        """
+        Charge les instantanés du cache disque comme entrées périmées : ils
+        sont servis immédiatement (stale-while-revalidate) et revalidés par
+        une requête conditionnelle à la première lecture ou au premier
+        rafraîchissement.
+        """
+        content_files = set(self.content_files())
+        for filename, snapshot in self._warm_cache.load().items():
+            if filename in content_files:
+                self._cache.set(filename, snapshot, stale=True)
+                self.restored_files.append(filename)
+
+    def _save_warm_cache(self, filename: str, snapshot: Optional[ContentSnapshot]):
+        """
+        Enregistre les instantanés courants, dont le nouvel instantané de
+        `filename` (retiré si None : fichier supprimé de la source)
+        """
+        snapshots = {}
+        for name in self.content_files():
+            entry = self._cache.peek(name)
+            if entry is not None:
+                snapshots[name] = entry.value
+        if snapshot is None:
+            snapshots.pop(filename, None)
+        else:
+            snapshots[filename] = snapshot
+        self._warm_cache.save(snapshots)
+
+    def _build_storage(self) -> StorageBackend:
+        """
+        Construit la source configurée par STORAGE_BACKEND ('blob', 'local',
+        'memory' ou 'http'). À défaut, 'local' si USE_LOCAL_FILES, sinon 'blob'.
+        """
+        backend = self._setting('STORAGE_BACKEND', '') or (
+            'local' if self._setting('USE_LOCAL_FILES', False) else 'blob'
+        )
+        if backend == 'local':
+            return LocalStorage(self._setting('LOCAL_DATA_PATH', 'data'))
+        if backend == 'memory':
+            return MemoryStorage()
+        if backend == 'http':
+            return HTTPStorage(
+                self._setting('CONTENT_ORIGIN_URL', ''),
+                session=self._build_session(),
+                timeout=(self._setting('AZURE_CONNECTION_TIMEOUT', 5),
+                         self._setting('AZURE_READ_TIMEOUT', 15))
+            )
+        if backend == 'blob':
+            return BlobStorage(self._init_blob_client(), timeout=self._setting('AZURE_READ_TIMEOUT', 15))
+        raise ValueError(f"Unknown storage backend: {backend}")
 
     def _init_blob_client(self):
-        """Initialise le client Azure Blob Storage si configuré"""
-        connection_string = getattr(self.config, 'AZURE_STORAGE_CONNECTION_STRING', '')
+        """
+        Initialise le client Azure Blob Storage si configuré.
+
+        Returns:
+            ContainerClient, ou None si la connection string est absente ou invalide
+        """
+        connection_string = self._setting('AZURE_STORAGE_CONNECTION_STRING', '')
 
-        if connection_string and not getattr(self.config, 'USE_LOCAL_FILES', False):
+        if connection_string:
+            from azure.core.exceptions import AzureError
+            from azure.storage.blob import BlobServiceClient
             try:
+                # Délais appliqués par le transport lui-même : le SDK ignore
+                # connection_timeout / read_timeout quand un transport est fourni
                 self._blob_service_client = BlobServiceClient.from_connection_string(
-                    connection_string
+                    connection_string,
+                    transport=self._build_transport(),
+                    retry_total=self._setting('AZURE_RETRY_TOTAL', 3),
+                    # Morceaux bornés dès la première requête (ingestion en flux)
+                    max_single_get_size=self._setting('AZURE_MAX_SINGLE_GET_SIZE', 4 * 1024 * 1024),
+                    max_chunk_get_size=self._setting('AZURE_MAX_CHUNK_GET_SIZE', 4 * 1024 * 1024)
                 )
-                container_name = getattr(self.config, 'BLOB_CONTAINER_NAME', 'content')
-                self._container_client = self._blob_service_client.get_container_client(
+                container_name = self._setting('BLOB_CONTAINER_NAME', 'content')
+                container_client = self._blob_service_client.get_container_client(
                     container_name
                 )
                 logger.info(f"Azure Blob Storage client initialized for container: {container_name}")
+                return container_client
             except AzureError as e:
                 logger.error(f"Failed to initialize Azure Blob client: {e}")
                 self._blob_service_client = None
+        return None
 
-    def _read_from_blob(self, filename: str) -> Optional[dict]:
+    def _build_session(self) -> 'requests.Session':
         """
-        Lit un fichier depuis Azure Blob Storage.
+        Session HTTP avec un pool de connexions dimensionné pour les lectures
+        parallèles (un seul pool partagé par tous les fichiers).
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        pool_size = self._setting('AZURE_POOL_SIZE', 10)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _build_transport(self) -> 'RequestsTransport':
+        """Transport HTTP Azure utilisant la session partagée et les délais configurés"""
+        from azure.core.pipeline.transport import RequestsTransport
+        return RequestsTransport(
+            session=self._build_session(), session_owner=False,
+            connection_timeout=self._setting('AZURE_CONNECTION_TIMEOUT', 5),
+            read_timeout=self._setting('AZURE_READ_TIMEOUT', 15)
+        )
+
+    def _parse_content(self, content: str, filename: str) -> Optional[dict]:
+        """
+        Parse le contenu selon l'extension du fichier (JSON ou YAML).
 
         Args:
-            filename: Nom du fichier à lire
+            content: Contenu brut du fichier
+            filename: Nom du fichier pour déterminer le format
 
         Returns:
-            Contenu du fichier parsé en dict, ou None si erreur
+            Contenu parsé en dict
         """
-        if not self._container_client:
-            logger.warning("Azure Blob client not available")
+        yaml_content = is_yaml(filename)
+        if yaml_content:
+            from yaml import YAMLError as ParseError
+        else:
+            ParseError = json.JSONDecodeError
+        start = time.perf_counter()
+        try:
+            if yaml_content:
+                return load_yaml(content)
+            else:
+                return json.loads(content)
+        except ParseError as e:
+            logger.error(f"Error parsing {filename}: {e}")
             return None
+        finally:
+            metrics.PARSE_DURATION.labels('yaml' if yaml_content else 'json').observe(
+                time.perf_counter() - start
+            )
 
-        try:
-            blob_client = self._container_client.get_blob_client(filename)
-            content = blob_client.download_blob().readall().decode('utf-8')
-            return self._parse_content(content, filename)
-        except AzureError as e:
-            logger.error(f"Error reading blob {filename}: {e}")
+    def get_content(self, filename: str) -> dict:
+        """
+        Récupère le contenu d'un fichier avec mise en cache.
+
+        Args:
+            filename: Nom du fichier à récupérer
+
+        Returns:
+            Contenu du fichier ou dict vide avec erreur
+        """
+        snapshot = self.get_snapshot(filename)
+        if snapshot is None:
+            return {"items": [], "error": f"Unable to load {filename}"}
+        return snapshot.data
+
+    def get_snapshot(self, filename: str) -> Optional[ContentSnapshot]:
+        """
+        Récupère l'instantané (données + réponse JSON pré-encodée) d'un fichier.
+
+        Args:
+            filename: Nom du fichier à récupérer
+
+        Returns:
+            ContentSnapshot, ou None si le fichier n'a jamais pu être chargé
+        """
+        return self.lookup(filename).value
+
+    def lookup(self, filename: str) -> CacheResult:
+        """
+        Comme get_snapshot, en indiquant aussi le résultat de la lecture du
+        cache (hit, miss, stale, stale_error, error).
+
+        Args:
+            filename: Nom du fichier à récupérer
+
+        Returns:
+            CacheResult (instantané ou None, statut)
+        """
+        self.check_invalidations()
+        snapshot = self._shared_snapshot(filename)
+        if snapshot is not None:
+            metrics.CACHE_LOOKUPS.labels(filename, HIT).inc()
+            return CacheResult(snapshot, HIT)
+
+        if self.refresher_running:
+            # Le rafraîchissement en arrière-plan maintient le cache à jour :
+            # la requête ne bloque jamais sur Azure si un instantané servable
+            # existe, y compris pour un fichier trop volumineux pour le cache
+            # (conservé hors budget, voir ContentCache). Au-delà de la fenêtre stale-if-error (rafraîchissement
+            # en échec depuis trop longtemps), lecture synchrone comme sans lui
+            entry = self._cache.servable(filename)
+            if entry is not None:
+                metrics.CACHE_LOOKUPS.labels(filename, HIT).inc()
+                return CacheResult(entry.value, HIT)
+
+        result = self._cache.get(filename, self._fetch)
+        metrics.CACHE_LOOKUPS.labels(filename, result.status).inc()
+        logger.debug("Cache %s for %s", result.status, filename)
+        return result
+
+    def _shared_snapshot(self, filename: str) -> Optional[ContentSnapshot]:
+        """
+        Instantané publié par le writer, pour un worker lecteur en mode partagé
+        (None pour le writer, qui sert son propre cache, ou si rien n'est encore
+        publié : le cache local prend alors le relais).
+        """
+        if self.shared is None or self.shared.is_writer:
             return None
+        return self.shared.get(filename)
 
-    def _read_from_local(self, filename: str) -> Optional[dict]:
+    def _peek(self, filename: str) -> Optional[ContentSnapshot]:
         """
-        Lit un fichier depuis le système de fichiers local.
+        Instantané servable sans chargement (partagé, ou en cache et pas
+        encore expiré au-delà de la fenêtre stale-if-error)
+        """
+        snapshot = self._shared_snapshot(filename)
+        if snapshot is None:
+            entry = self._cache.servable(filename)
+            snapshot = entry.value if entry is not None else None
+        return snapshot
+
+    def refresh(self, filename: str) -> bool:
+        """
+        Recharge un fichier immédiatement (requête conditionnelle si déjà en cache).
+
+        Returns:
+            True si un instantané valide est disponible
+        """
+        return self._cache.refresh(filename, self._fetch)
+
+    def invalidate(self, filenames: Iterable[str], deleted: Iterable[str] = ()) -> list:
+        """
+        Recharge en arrière-plan les fichiers modifiés dans la source, dans ce
+        worker et dans les autres (marqueurs d'invalidation). Les fichiers
+        supprimés sont évincés immédiatement au lieu d'être rechargés (un
+        rechargement en échec laisserait servir l'ancienne copie pendant la
+        fenêtre stale-if-error). Les fichiers inconnus (ni collection exposée,
+        ni en cache) sont ignorés.
 
         Args:
-            filename: Nom du fichier à lire
+            filenames: Fichiers modifiés ou supprimés
+            deleted: Fichiers supprimés (sous-ensemble de `filenames`)
 
         Returns:
-            Contenu du fichier parsé en dict, ou None si erreur
+            Liste des fichiers effectivement invalidés
         """
-        local_path = getattr(self.config, 'LOCAL_DATA_PATH', 'data')
-        filepath = os.path.join(local_path, filename)
+        known = set(self.content_files())
+        targets = [
+            filename for filename in dict.fromkeys(filenames)
+            if filename in known or self._cache.peek(filename) is not None
+        ]
+        if not targets:
+            return targets
+        deleted = set(deleted)
+        deleted = [filename for filename in targets if filename in deleted]
+        for filename in targets:
+            metrics.INVALIDATIONS.labels(filename, 'webhook').inc()
+        for filename in deleted:
+            self._evict(filename)
+        if self.invalidations is not None:
+            self.invalidations.publish(targets, deleted)
+        self._pool().submit(self._apply_invalidation, targets, deleted)
+        logger.info("Invalidated %s", ', '.join(targets))
+        return targets
+
+    def check_invalidations(self):
+        """Prend en compte les invalidations reçues par les autres workers"""
+        if self.invalidations is None:
+            return
+        changed = self.invalidations.poll()
+        if changed:
+            deleted = [filename for filename in changed if self.invalidations.is_deleted(filename)]
+            for filename in changed:
+                metrics.INVALIDATIONS.labels(filename, 'broadcast').inc()
+            for filename in deleted:
+                self._evict(filename)
+            logger.info("Invalidated by another worker: %s", ', '.join(changed))
+            self._pool().submit(self._apply_invalidation, changed, deleted)
 
+    def _evict(self, filename: str):
+        """Oublie un fichier supprimé de la source (cache, index de recherche, cache disque)"""
+        self._cache.invalidate(filename)
+        collection = self.collection_for(filename)
+        if collection is not None:
+            self.search_index.remove(collection)
+        self._schedule_warm_cache_save(filename, None)
+
+    def _apply_invalidation(self, filenames: list, deleted: Iterable[str] = ()):
+        """
+        Recharge les fichiers invalidés (requête conditionnelle), sauf les
+        fichiers supprimés, déjà évincés. En mode partagé, seul le writer
+        recharge puis publie une nouvelle génération (sans les fichiers
+        supprimés), que les lecteurs projettent à leur prochaine vérification.
+        """
+        if self.shared is not None and not self.shared.is_writer:
+            return
+        deleted = set(deleted)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return self._parse_content(content, filename)
-        except FileNotFoundError:
-            logger.error(f"Local file not found: {filepath}")
-            return None
-        except IOError as e:
-            logger.error(f"Error reading local file {filepath}: {e}")
-            return None
+            for filename in filenames:
+                if filename not in deleted:
+                    self.refresh(filename)
+            if self.shared is not None:
+                self.publish_shared()
+        except Exception:
+            logger.exception("Invalidation refresh failed")
 
-    def _parse_content(self, content: str, filename: str) -> Optional[dict]:
+    def content_files(self) -> list:
+        """Fichiers de toutes les collections exposées par l'API"""
+        return [self.filename_for(collection) for collection in self.COLLECTIONS]
+
+    def get_many(self, filenames: Iterable[str]) -> Dict[str, Optional[ContentSnapshot]]:
         """
-        Parse le contenu selon l'extension du fichier (JSON ou YAML).
+        Récupère plusieurs fichiers ; ceux absents du cache sont chargés en
+        parallèle (pool borné à CONTENT_FETCH_WORKERS threads).
 
         Args:
-            content: Contenu brut du fichier
-            filename: Nom du fichier pour déterminer le format
+            filenames: Noms des fichiers à récupérer
 
         Returns:
-            Contenu parsé en dict
+            Dict {fichier: instantané ou None}
         """
+        filenames = list(dict.fromkeys(filenames))
+        misses = [
+            filename for filename in filenames
+            if not self._cache.is_fresh(filename) and self._shared_snapshot(filename) is None
+        ]
+        if len(misses) <= 1:
+            return {filename: self.get_snapshot(filename) for filename in filenames}
+
+        futures = {filename: self._pool().submit(self.get_snapshot, filename) for filename in misses}
+        return {
+            filename: futures[filename].result() if filename in futures else self.get_snapshot(filename)
+            for filename in filenames
+        }
+
+    def warm_up(self, filenames: Optional[Iterable[str]] = None) -> dict:
+        """
+        Charge (ou revalide) en parallèle des fichiers de contenu.
+
+        Args:
+            filenames: Fichiers à charger (par défaut toutes les collections)
+
+        Returns:
+            Dict {fichier: succès du chargement}
+        """
+        filenames = list(dict.fromkeys(filenames or self.content_files()))
+        futures = {filename: self._pool().submit(self.refresh, filename) for filename in filenames}
+        return {filename: future.result() for filename, future in futures.items()}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._fetch_pool_lock:
+            if self._fetch_pool is None:
+                self._fetch_pool = ThreadPoolExecutor(
+                    max_workers=self._setting('CONTENT_FETCH_WORKERS', 4),
+                    thread_name_prefix='content-fetch'
+                )
+            return self._fetch_pool
+
+    @property
+    def refresher_running(self) -> bool:
+        """Indique si le rafraîchissement en arrière-plan tourne dans ce processus"""
+        return self._refresher is not None and self._refresher.is_alive()
+
+    def start_refresher(self, interval: Optional[float] = None):
+        """
+        Démarre le rafraîchissement en arrière-plan : préchargement immédiat des
+        fichiers de contenu, puis revalidation toutes les `interval` secondes.
+        Sans effet s'il tourne déjà.
+
+        Args:
+            interval: Période en secondes (CONTENT_REFRESH_INTERVAL par défaut,
+                à défaut CACHE_TTL)
+        """
+        if self.refresher_running:
+            return
+        if not interval:
+            interval = self._setting('CONTENT_REFRESH_INTERVAL', 0) or self.cache_ttl
+        self._refresher_interval = interval
+        self._refresher_stop = threading.Event()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, args=(self._refresher_stop, interval),
+            name='content-refresher', daemon=True
+        )
+        self._refresher.start()
+        logger.info("Content refresher started (interval: %ss)", interval)
+
+    def stop_refresher(self, timeout: float = 5.0):
+        """Arrête le rafraîchissement en arrière-plan"""
+        refresher = self._refresher
+        self._refresher_stop.set()
+        self._refresher = None
+        if refresher is not None and refresher is not threading.current_thread():
+            refresher.join(timeout)
+            logger.info("Content refresher stopped")
+        if self.shared is not None:
+            # Sans rafraîchissement, ce processus ne peut plus être le writer
+            self.shared.release_writer()
+            self._published_etags = {}
+
+    def _refresh_loop(self, stop: threading.Event, interval: float):
+        while not stop.is_set():
+            try:
+                self.refresh_cycle()
+            except Exception:
+                logger.exception("Content refresh failed")
+            if self.invalidations is None:
+                stop.wait(interval)
+                continue
+            # Entre deux tours, invalidations des autres workers prises en
+            # compte même sans trafic (le writer doit les voir pour publier)
+            next_cycle = time.monotonic() + interval
+            while not stop.is_set():
+                remaining = next_cycle - time.monotonic()
+                if remaining <= 0:
+                    break
+                stop.wait(min(remaining, max(self.invalidations.poll_interval, 0.1)))
+                try:
+                    self.check_invalidations()
+                except Exception:
+                    logger.exception("Invalidation check failed")
+
+    def refresh_cycle(self):
+        """
+        Un tour de rafraîchissement. En mode partagé, seul le writer élu
+        interroge la source et publie les instantanés ; les autres workers
+        lisent le fichier partagé et tentent seulement de prendre le relais.
+        """
+        if self.shared is not None and not self.shared.try_acquire_writer():
+            return
+        self.warm_up()
+        if self.shared is not None:
+            self.publish_shared()
+        self.request_connectivity_check()
+
+    def publish_shared(self) -> bool:
+        """
+        Publie les instantanés en cache pour les autres workers s'ils ont
+        changé depuis la dernière publication.
+
+        Returns:
+            True si une nouvelle génération a été publiée
+        """
+        snapshots = {}
+        for filename in self.content_files():
+            entry = self._cache.peek(filename)
+            if entry is not None:
+                snapshots[filename] = entry.value
+        etags = {filename: snapshot.etag for filename, snapshot in snapshots.items()}
+        if not snapshots or etags == self._published_etags:
+            return False
+        self.shared.publish(snapshots)
+        self._published_etags = etags
+        return True
+
+    def _fetch(self, filename: str,
+               previous: Optional[ContentSnapshot] = None) -> Optional[ContentSnapshot]:
+        """
+        Lit et parse un fichier depuis la source (appelé par le cache).
+
+        Si une version est déjà en cache, la lecture est conditionnelle : quand
+        la source n'a pas changé, l'instantané précédent (données parsées et
+        corps encodés) est réutilisé tel quel.
+        """
+        etag = previous.source_etag if previous is not None else None
+        if is_yaml(filename):
+            snapshot = self._load_yaml(filename, etag)
+        else:
+            snapshot = self._load_json(filename, etag)
+        if snapshot is NOT_MODIFIED:
+            self.health.record_success(filename)
+            return previous
+        if snapshot is None:
+            self.health.record_failure(filename)
+            return None
+        self.health.record_success(filename)
+        self._on_new_snapshot(filename, snapshot)
+        return snapshot
+
+    def _load_json(self, filename: str, etag: Optional[str]):
+        """
+        Lecture en flux d'un fichier JSON : le corps est construit item par
+        item sans charger le fichier ni l'arbre complet en mémoire (voir
+        app/services/ingest.py).
+
+        Returns:
+            ContentSnapshot, NOT_MODIFIED ou None si erreur
+        """
+        streamed = self._read_source(filename, self.storage.stream, etag)
+        if streamed is None or streamed is NOT_MODIFIED:
+            return streamed
+        # Durée de parsing incluant le téléchargement (les deux sont entrelacés)
+        start = time.perf_counter()
         try:
-            if filename.endswith('.yaml') or filename.endswith('.yml'):
-                return yaml.safe_load(content)
-            else:
-                return json.loads(content)
-        except (json.JSONDecodeError, yaml.YAMLError) as e:
+            body = ingest_json(streamed.chunks)
+        except (IngestError, StorageError) as e:
             logger.error(f"Error parsing {filename}: {e}")
             return None
+        finally:
+            metrics.PARSE_DURATION.labels('json').observe(time.perf_counter() - start)
+        return ContentSnapshot.from_body(
+            filename, body, streamed.last_modified, source_etag=streamed.etag,
+            compress_min_size=self._setting('COMPRESSION_MIN_SIZE', 256)
+        )
 
-    def get_content(self, filename: str) -> dict:
+    def _load_yaml(self, filename: str, etag: Optional[str]):
         """
-        Récupère le contenu d'un fichier avec mise en cache.
+        Lecture complète puis parsing d'un fichier YAML, ou relecture du
+        résultat mémorisé sur disque si ce contenu a déjà été parsé.
+
+        Returns:
+            ContentSnapshot, NOT_MODIFIED ou None si erreur
+        """
+        raw = self._read_source(filename, self.storage.read, etag)
+        if raw is None or raw is NOT_MODIFIED:
+            return raw
+
+        key = data = None
+        if self._parsed_cache is not None:
+            key = ParsedArtifactCache.key_for(raw.content)
+            data = self._parsed_cache.get(key)
+            metrics.PARSED_ARTIFACT_LOOKUPS.labels('miss' if data is None else 'hit').inc()
+
+        if data is None:
+            try:
+                content = raw.content.decode('utf-8')
+            except UnicodeDecodeError as e:
+                logger.error(f"Error decoding {filename}: {e}")
+                return None
+            data = self._parse_content(content, filename)
+            if data is None:
+                return None
+            if key is not None:
+                self._parsed_cache.put(key, data)
+        return ContentSnapshot.build(
+            filename, data, raw.last_modified, source_etag=raw.etag,
+            compress_min_size=self._setting('COMPRESSION_MIN_SIZE', 256)
+        )
+
+    def _read_source(self, filename: str, read, etag: Optional[str]):
+        """
+        Lecture de la source, via la couche de résilience si elle est distante.
+        Un fichier introuvable est un échec de chargement comme une erreur
+        (None), mais ne compte pas pour le disjoncteur.
+        """
+        if self.guard is None:
+            result = read(filename, etag)
+        else:
+            result = self.guard.call(filename, lambda: read(filename, etag))
+        return None if result is NOT_FOUND else result
+
+    def _on_new_snapshot(self, filename: str, snapshot: ContentSnapshot):
+        """Met à jour les structures dérivées quand un fichier a changé"""
+        self._schedule_warm_cache_save(filename, snapshot)
+        collection = self.collection_for(filename)
+        # Contenu ingéré en flux (non décodé) : index construit à la première
+        # recherche (voir search)
+        if collection is not None and snapshot.decoded and snapshot.index is not None:
+            self.search_index.update(collection, snapshot.index.items, snapshot.etag)
+
+    def _schedule_warm_cache_save(self, filename: str, snapshot: Optional[ContentSnapshot]):
+        """
+        Enregistre le cache disque hors du chemin de la requête, par un seul
+        thread : les enregistrements s'exécutent dans l'ordre des changements
+        """
+        if self._warm_cache is None or filename not in self.content_files():
+            return
+        with self._fetch_pool_lock:
+            if self._warm_cache_writer is None:
+                self._warm_cache_writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='warm-cache'
+                )
+        self._warm_cache_writer.submit(self._save_warm_cache, filename, snapshot)
+
+    def search(self, query: str, collections: Optional[Iterable[str]] = None,
+               limit: int = 20) -> dict:
+        """
+        Recherche plein texte dans les collections (chargées si nécessaire).
 
         Args:
-            filename: Nom du fichier à récupérer
+            query: Texte recherché
+            collections: Collections à interroger (toutes par défaut)
+            limit: Nombre maximal de résultats
 
         Returns:
-            Contenu du fichier ou dict vide avec erreur
+            Résultats classés (voir SearchIndex.search)
         """
-        # Vérifier le cache
-        if filename in self._cache:
-            logger.debug(f"Cache hit for {filename}")
-            return self._cache[filename]
+        collections = list(collections or self.COLLECTIONS)
+        snapshots = self.get_many(self.filename_for(collection) for collection in collections)
+        for collection in collections:
+            # Instantanés lus depuis le fichier partagé : index construit ici,
+            # à la première recherche qui suit une nouvelle génération
+            snapshot = snapshots[self.filename_for(collection)]
+            if snapshot is not None and self.search_index.version(collection) != snapshot.etag \
+                    and snapshot.index is not None:
+                self.search_index.update(collection, snapshot.index.items, snapshot.etag)
+        return self.search_index.search(query, collections, limit)
 
-        logger.debug(f"Cache miss for {filename}, fetching...")
+    def changes(self, collection: str,
+                since: Optional[int] = None) -> Optional[Tuple[ContentSnapshot, dict]]:
+        """
+        Changements d'une collection depuis la version `since` (voir
+        ChangeFeed.changes_since). L'instantané courant est comparé au
+        précédent à la première demande qui suit son chargement.
 
-        # Lire depuis Blob ou fichiers locaux
-        use_local = getattr(self.config, 'USE_LOCAL_FILES', False)
+        Args:
+            collection: Nom de la collection
+            since: Version connue du client (None : collection complète)
 
-        if use_local:
-            data = self._read_from_local(filename)
-        else:
-            data = self._read_from_blob(filename)
+        Returns:
+            (instantané courant, delta ou collection complète), ou None si
+            la collection n'a jamais pu être chargée
+        """
+        snapshot = self.get_snapshot(self.filename_for(collection))
+        if snapshot is None:
+            return None
+        return snapshot, self.change_feeds[collection].changes_since(snapshot, since)
 
-        if data is None:
-            return {"items": [], "error": f"Unable to load {filename}"}
+    def updates(self) -> UpdateBroadcaster:
+        """
+        Diffuseur des mises à jour, avec la surveillance des instantanés qui
+        l'alimente (démarrés à la première utilisation)
+        """
+        with self._fetch_pool_lock:
+            if self._broadcaster is None:
+                self._broadcaster = UpdateBroadcaster()
+                self._update_watcher = threading.Thread(
+                    target=self._watch_updates, args=(self._broadcaster,),
+                    name='content-updates', daemon=True
+                )
+                created = True
+            else:
+                created = False
+        if created:
+            self.check_updates()
+            self._update_watcher.start()
+        return self._broadcaster
+
+    def _watch_updates(self, broadcaster: UpdateBroadcaster):
+        interval = self._setting('SSE_POLL_INTERVAL', 1)
+        while self._broadcaster is broadcaster:
+            time.sleep(interval)
+            try:
+                self.check_updates()
+            except Exception:
+                logger.exception("Update check failed")
+
+    def check_updates(self):
+        """
+        Publie la version de chaque collection dont l'instantané servi a changé
+        (rechargement local, nouvelle génération partagée, invalidation)
+        """
+        broadcaster = self._broadcaster
+        if broadcaster is None:
+            return
+        self.check_invalidations()
+        for collection in self.COLLECTIONS:
+            snapshot = self._peek(self.filename_for(collection))
+            if snapshot is None:
+                continue
+            feed = self.change_feeds[collection]
+            feed.update(snapshot)
+            if broadcaster.publish(collection, feed.version):
+                logger.debug("Published %s version %s", collection, feed.version)
+
+    def update_stream(self, known: Optional[Dict[str, int]] = None,
+                      heartbeat: float = 15, max_duration: float = 0):
+        """
+        Flux text/event-stream des mises à jour : un événement `update` par
+        collection modifiée (delta du flux de changements, ou seulement la
+        nouvelle version si le delta n'est pas disponible), et un commentaire
+        de heartbeat en l'absence de changement.
+
+        Args:
+            known: Versions déjà connues du client (Last-Event-ID) : les
+                changements manqués sont envoyés immédiatement
+            heartbeat: Intervalle maximal sans données (secondes)
+            max_duration: Durée au-delà de laquelle le flux est fermé (le
+                client se reconnecte, éventuellement sur un autre pod ; 0 = illimitée)
+        """
+        broadcaster = self.updates()
+        deadline = time.monotonic() + max_duration if max_duration else None
+        metrics.SSE_CONNECTIONS.inc()
+        try:
+            sequence = broadcaster.sequence
+            yield RETRY
+            if known is None:
+                known = broadcaster.versions()
+                yield hello_event(known)
+            else:
+                yield from self._update_events(broadcaster, known)
+
+            while deadline is None or time.monotonic() < deadline:
+                timeout = heartbeat if deadline is None else min(heartbeat, deadline - time.monotonic())
+                current = broadcaster.wait(sequence, max(timeout, 0))
+                if current == sequence:
+                    yield HEARTBEAT
+                    continue
+                sequence = current
+                yield from self._update_events(broadcaster, known)
+        finally:
+            metrics.SSE_CONNECTIONS.dec()
 
-        # Mettre en cache
-        self._cache[filename] = data
-        return data
+    def _update_events(self, broadcaster: UpdateBroadcaster, known: Dict[str, int]):
+        """Événements des collections dont la version publiée diffère de `known` (mis à jour)"""
+        for collection, version in broadcaster.versions().items():
+            since = known.get(collection)
+            if since == version:
+                continue
+            data = self._update_payload(collection, since, version)
+            known[collection] = version
+            yield format_event(data, 'update', event_id(known))
+
+    def _update_payload(self, collection: str, since: Optional[int], version: int) -> bytes:
+        """
+        Données d'un événement `update`, encodées une fois pour toutes les
+        connexions passant de la version `since` à `version`
+        """
+        key = (collection, since, version)
+        payload = self._update_payloads.get(key)
+        if payload is None:
+            changes = {"version": version, "full": True}
+            result = self.changes(collection, since)
+            if result is not None and not result[1]["full"] and result[1]["version"] == version:
+                changes = result[1]
+            payload = encode_json({"collection": collection, **changes})
+            if len(self._update_payloads) >= 256:
+                self._update_payloads.clear()
+            self._update_payloads[key] = payload
+        return payload
+
+    def filename_for(self, collection: str) -> str:
+        """
+        Retourne le nom du fichier associé à une collection.
+
+        Args:
+            collection: Nom de la collection ('events', 'news' ou 'faq')
+
+        Returns:
+            Nom du fichier configuré pour cette collection
+        """
+        setting, default = self.COLLECTIONS[collection]
+        return self._setting(setting, default)
+
+    def collection_for(self, filename: str) -> Optional[str]:
+        """Retourne la collection associée à un fichier (None si aucune)"""
+        for collection in self.COLLECTIONS:
+            if self.filename_for(collection) == filename:
+                return collection
+        return None
 
     def get_events(self) -> dict:
         """Récupère les événements"""
-        filename = getattr(self.config, 'EVENTS_FILE', 'events.json')
-        return self.get_content(filename)
+        return self.get_content(self.filename_for('events'))
 
     def get_news(self) -> dict:
         """Récupère les actualités"""
-        filename = getattr(self.config, 'NEWS_FILE', 'news.json')
-        return self.get_content(filename)
+        return self.get_content(self.filename_for('news'))
 
     def get_faq(self) -> dict:
         """Récupère la FAQ"""
-        filename = getattr(self.config, 'FAQ_FILE', 'faq.json')
-        return self.get_content(filename)
+        return self.get_content(self.filename_for('faq'))
 
     def clear_cache(self):
         """Vide le cache (utile pour les tests)"""
         self._cache.clear()
         logger.info("Cache cleared")
 
-    def is_blob_available(self) -> bool:
-        """Vérifie si le client Azure Blob est disponible et fonctionnel"""
-        if not self._container_client:
-            return False
+    def is_storage_available(self) -> bool:
+        """Vérifie si la source du contenu est disponible et fonctionnelle"""
+        if self.guard is not None:
+            return self.guard.check(self.storage.check)
+        return self.storage.check()
+
+    def request_connectivity_check(self):
+        """
+        Lance un test de connectivité de la source distante en arrière-plan si
+        le dernier date de plus de READINESS_CHECK_INTERVAL secondes (un seul à
+        la fois).
+        """
+        if not self.storage.remote:
+            return
+        age = self.health.connectivity_age()
+        if age is not None and age < self._setting('READINESS_CHECK_INTERVAL', 30):
+            return
+        with self._fetch_pool_lock:
+            if self._connectivity_check_pending:
+                return
+            self._connectivity_check_pending = True
+        self._pool().submit(self._check_connectivity)
+
+    def _check_connectivity(self):
         try:
-            # Tenter de lister les blobs pour vérifier la connexion
-            list(self._container_client.list_blobs(max_results=1))
+            self.health.record_connectivity(self.is_storage_available())
+        finally:
+            self._connectivity_check_pending = False
+
+    def is_connected(self) -> bool:
+        """
+        État de la connexion à la source d'après l'état mémorisé (disjoncteur,
+        dernier test de connectivité, derniers chargements), sans planifier
+        de test ni détailler l'état de chaque fichier comme readiness
+        """
+        if not self.storage.remote:
             return True
-        except AzureError:
+        if self.guard is not None and self.guard.breaker.state != CLOSED:
+            return False
+        files = self.content_files()
+        if any(self.health.file_state(filename).consecutive_failures for filename in files):
             return False
+        if self.health.connectivity_ok is not None:
+            return self.health.connectivity_ok
+        return all(self._peek(filename) is not None or self._cache.is_refused(filename)
+                   for filename in files)
+
+    def readiness(self) -> dict:
+        """
+        État de préparation calculé en mémoire, sans appel à Azure : le pod est
+        prêt si chaque collection a un instantané servable, ou à défaut si le
+        dernier test de connectivité a réussi. Un nouveau test est planifié en
+        arrière-plan si nécessaire.
+
+        Returns:
+            Dict avec "ready" (bool), "azure_connection", l'état du disjoncteur
+            et le détail par fichier
+        """
+        local = not self.storage.remote
+        if not local:
+            self.request_connectivity_check()
+
+        files = {}
+        for filename in self.content_files():
+            files[filename] = {
+                # Fichier trop volumineux pour le cache : servable tant que
+                # son dernier chargement est dans la fenêtre stale-if-error
+                "servable": self._peek(filename) is not None or self._cache.is_refused(filename),
+                **self.health.describe_file(filename),
+            }
+        servable = all(state["servable"] for state in files.values())
+
+        return {
+            "ready": local or servable or bool(self.health.connectivity_ok),
+            "azure_connection": "connected" if self.is_connected() else "failed",
+            "source": self.storage.name,
+            "refresher_running": self.refresher_running,
+            **({"circuit_breaker": self.guard.describe()} if self.guard is not None else {}),
+            **({"shared_snapshot": self.shared.describe()} if self.shared is not None else {}),
+            "connectivity": self.health.describe_connectivity(),
+            "cache": self._cache.describe(),
+            "files": files,
+        }
@@ -0,0 +1,78 @@
+"""
+Suivi de l'état des chargements de contenu, pour une readiness probe
+calculée en mémoire (sans appel réseau pendant la requête)
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@dataclass
+class FetchState:
+    """État des chargements d'un fichier"""
+    last_success: Optional[float] = None
+    last_failure: Optional[float] = None
+    consecutive_failures: int = 0
+
+
+class HealthTracker:
+    """
+    Mémorise le résultat des chargements par fichier et du dernier test de
+    connectivité. Toutes les méthodes sont thread-safe et sans I/O.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._files: Dict[str, FetchState] = {}
+        self.connectivity_ok: Optional[bool] = None
+        self.connectivity_checked_at: Optional[float] = None
+
+    def record_success(self, filename: str):
+        with self._lock:
+            state = self._files.setdefault(filename, FetchState())
+            state.last_success = self._clock()
+            state.consecutive_failures = 0
+
+    def record_failure(self, filename: str):
+        with self._lock:
+            state = self._files.setdefault(filename, FetchState())
+            state.last_failure = self._clock()
+            state.consecutive_failures += 1
+
+    def record_connectivity(self, ok: bool):
+        with self._lock:
+            self.connectivity_ok = ok
+            self.connectivity_checked_at = self._clock()
+
+    def connectivity_age(self) -> Optional[float]:
+        """Secondes écoulées depuis le dernier test de connectivité"""
+        checked_at = self.connectivity_checked_at
+        return None if checked_at is None else self._clock() - checked_at
+
+    def file_state(self, filename: str) -> FetchState:
+        with self._lock:
+            state = self._files.get(filename, FetchState())
+            return FetchState(state.last_success, state.last_failure, state.consecutive_failures)
+
+    def describe_file(self, filename: str) -> dict:
+        state = self.file_state(filename)
+        return {
+            "last_success": _iso(state.last_success),
+            "last_failure": _iso(state.last_failure),
+            "consecutive_failures": state.consecutive_failures,
+        }
+
+    def describe_connectivity(self) -> dict:
+        return {
+            "ok": self.connectivity_ok,
+            "checked_at": _iso(self.connectivity_checked_at),
+        }
@@ -0,0 +1,200 @@
+"""
+Ingestion en flux des fichiers de contenu JSON
+
+Le fichier est lu morceau par morceau (StreamedContent.chunks) et les items de
+la liste `items` sont décodés un par un, puis réencodés sous forme compacte
+directement dans le corps de la réponse. L'arbre Python complet n'est jamais
+construit pendant le chargement : il l'est à la demande, à partir du corps
+(voir ContentSnapshot.data), seulement si une requête filtrée ou une recherche
+en a besoin.
+
+Mémoire de pointe : environ 1,25 × le corps compact (tampon de sortie,
+rendu sans copie), plus un morceau et le plus gros item, au lieu de contenu
+brut + texte décodé + arbre Python + corps (environ 5 à 10 × la taille du
+fichier).
+"""
+import codecs
+import io
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+from app.services.snapshot import encode_json
+
+WHITESPACE = ' \t\n\r'
+
+# Clé de la liste décodée item par item
+ITEMS_KEY = 'items'
+
+
+class IngestError(ValueError):
+    """Contenu JSON invalide"""
+
+
+class _TextReader:
+    """
+    Texte décodé de façon incrémentale depuis un itérateur de morceaux UTF-8,
+    avec un tampon qui ne conserve que la partie non consommée.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder_json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, at_least: int = 1) -> bool:
+        """Ajoute au moins `at_least` caractères au tampon (False en fin de flux)"""
+        if self.eof:
+            return False
+        # Partie consommée abandonnée (amortie : au plus une copie par moitié)
+        if self.pos > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        added = []
+        size = 0
+        while size < at_least:
+            chunk = next(self._chunks, None)
+            try:
+                text = self._decoder.decode(chunk or b'', final=chunk is None)
+            except UnicodeDecodeError as e:
+                raise IngestError(f"Invalid UTF-8: {e}") from e
+            added.append(text)
+            size += len(text)
+            if chunk is None:
+                self.eof = True
+                break
+        self.buffer += ''.join(added)
+        return size > 0
+
+    def skip_whitespace(self):
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer) or not self.fill():
+                return
+
+    def peek(self) -> Optional[str]:
+        """Prochain caractère significatif (None en fin de flux)"""
+        self.skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise IngestError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Décode la valeur JSON suivante (lit de nouveaux morceaux si elle est incomplète)"""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder_json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Valeur coupée par la fin du tampon : lire la suite (le tampon
+                # au moins double à chaque essai, coût total linéaire)
+                if self.fill(max(len(self.buffer) - self.pos, 1)):
+                    continue
+                raise IngestError(str(e)) from e
+            # Un nombre en fin de tampon peut se poursuivre dans le morceau suivant
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def rest(self) -> str:
+        """Texte restant jusqu'à la fin du flux"""
+        while self.fill(1 << 20):
+            pass
+        return self.buffer[self.pos:]
+
+
+def ingest_json(chunks: Iterable[bytes]) -> bytes:
+    """
+    Lit un document JSON par morceaux et retourne son encodage compact
+    (identique à encode_json(json.loads(document))).
+
+    Les items de la liste `items` d'un objet racine sont traités un par un ;
+    les autres documents (liste racine...) sont décodés en entier.
+
+    Args:
+        chunks: Morceaux successifs du fichier (bytes UTF-8)
+
+    Returns:
+        Corps JSON compact UTF-8
+
+    Raises:
+        IngestError: si le contenu n'est pas du JSON valide
+    """
+    reader = _TextReader(chunks)
+    if reader.peek() == '\ufeff':  # BOM
+        reader.pos += 1
+    if reader.peek() != '{':
+        try:
+            return encode_json(json.loads(reader.rest()))
+        except json.JSONDecodeError as e:
+            raise IngestError(str(e)) from e
+
+    out = io.BytesIO()
+    reader.expect('{')
+    out.write(b'{')
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        first = True
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise IngestError(f"Expected an object key at offset {reader.pos}")
+            reader.expect(':')
+            if not first:
+                out.write(b',')
+            first = False
+            out.write(encode_json(key))
+            out.write(b':')
+            if key == ITEMS_KEY and reader.peek() == '[':
+                _copy_items(reader, out)
+            else:
+                out.write(encode_json(reader.value()))
+
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                break
+            if separator != ',':
+                raise IngestError(f"Expected ',' or '}}' at offset {reader.pos - 1}, found {separator!r}")
+
+    if reader.peek() is not None:
+        raise IngestError(f"Extra data at offset {reader.pos}")
+    out.write(b'}')
+    # Tampon interne réduit à sa taille et rendu tel quel (pas de seconde
+    # copie du corps, contrairement à bytes(out.getbuffer()))
+    return out.getvalue()
+
+
+def _copy_items(reader: _TextReader, out: io.BytesIO):
+    """Décode et réencode les items d'une liste un par un"""
+    reader.expect('[')
+    out.write(b'[')
+    if reader.peek() == ']':
+        reader.pos += 1
+    else:
+        first = True
+        while True:
+            item = reader.value()
+            if not first:
+                out.write(b',')
+            first = False
+            out.write(encode_json(item))
+
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise IngestError(f"Expected ',' or ']' at offset {reader.pos - 1}, found {separator!r}")
+    out.write(b']')
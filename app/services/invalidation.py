@@ -0,0 +1,203 @@
+"""
+Invalidation du cache déclenchée par événement (webhook)
+
+- parse_invalidation : extrait les fichiers modifiés d'une notification
+  Azure Event Grid (BlobCreated / BlobDeleted, schéma Event Grid ou
+  CloudEvents) ou d'une simple liste de fichiers, et gère la poignée de main
+  de validation de l'abonnement Event Grid (la poignée de main CloudEvents,
+  requête OPTIONS, est traitée par la route)
+- InvalidationBroadcaster : propage une invalidation à tous les workers du
+  pod par des fichiers marqueurs dans un répertoire local au pod ; chaque
+  worker vérifie au plus une fois par `poll_interval` si un marqueur a changé.
+  Les autres réplicas ne reçoivent rien : ils voient la modification à
+  l'expiration de leur CACHE_TTL
+"""
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+BLOB_CREATED = 'Microsoft.Storage.BlobCreated'
+BLOB_DELETED = 'Microsoft.Storage.BlobDeleted'
+BLOB_EVENTS = (BLOB_CREATED, BLOB_DELETED)
+VALIDATION_EVENT = 'Microsoft.EventGrid.SubscriptionValidationEvent'
+
+# Suffixe d'un marqueur d'invalidation signalant une suppression
+DELETED_MARKER = 'deleted'
+
+# Sujet d'un événement Blob : /blobServices/default/containers/<conteneur>/blobs/<chemin>
+BLOB_SUBJECT_RE = re.compile(r'^/blobServices/default/containers/(?P<container>[^/]+)/blobs/(?P<name>.+)$')
+
+
+class InvalidPayloadError(ValueError):
+    """Notification d'invalidation mal formée"""
+
+
+class Invalidation(NamedTuple):
+    """Contenu d'une notification"""
+    filenames: List[str]
+    # Code à renvoyer pour valider un abonnement Event Grid (None sinon)
+    validation_code: Optional[str] = None
+    # Fichiers supprimés de la source (sous-ensemble de `filenames`) : leur
+    # instantané est évincé au lieu d'être rechargé
+    deleted: Tuple[str, ...] = ()
+
+
+def parse_invalidation(payload, container: Optional[str] = None) -> Invalidation:
+    """
+    Interprète le corps JSON d'une notification.
+
+    Formats acceptés :
+        {"files": ["events.json", ...]} ou ["events.json", ...]
+        [{"eventType": "Microsoft.Storage.BlobCreated", "subject": "/blobServices/...", ...}]
+        (schéma Event Grid, ou CloudEvents avec "type" au lieu de "eventType")
+
+    Args:
+        payload: Corps JSON décodé
+        container: Conteneur Azure surveillé ; les événements des autres
+            conteneurs sont ignorés
+
+    Returns:
+        Invalidation (fichiers à recharger, code de validation éventuel,
+        fichiers supprimés)
+
+    Raises:
+        InvalidPayloadError: si le format n'est pas reconnu
+    """
+    if isinstance(payload, dict) and 'files' in payload:
+        payload = payload['files']
+        if not isinstance(payload, list) or not all(isinstance(name, str) for name in payload):
+            raise InvalidPayloadError("'files' must be a list of file names")
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list):
+        raise InvalidPayloadError("Expected a list of events or {\"files\": [...]}")
+
+    filenames = []
+    # Dernier événement de chaque fichier : supprimé ou non
+    deleted = {}
+    for event in payload:
+        if isinstance(event, str):
+            filenames.append(event)
+            continue
+        if not isinstance(event, dict):
+            raise InvalidPayloadError("Events must be JSON objects")
+
+        event_type = event.get('eventType') or event.get('type')
+        if event_type == VALIDATION_EVENT:
+            code = (event.get('data') or {}).get('validationCode')
+            if not code:
+                raise InvalidPayloadError("Missing validationCode")
+            return Invalidation([], code)
+        if event_type not in BLOB_EVENTS:
+            logger.debug("Ignoring event of type %s", event_type)
+            continue
+
+        match = BLOB_SUBJECT_RE.match(event.get('subject') or '')
+        if match is None:
+            raise InvalidPayloadError(f"Unexpected blob event subject: {event.get('subject')!r}")
+        if container and match.group('container') != container:
+            continue
+        filenames.append(match.group('name'))
+        deleted[match.group('name')] = event_type == BLOB_DELETED
+
+    return Invalidation(list(dict.fromkeys(filenames)),
+                        deleted=tuple(name for name, gone in deleted.items() if gone))
+
+
+class InvalidationBroadcaster:
+    """
+    Marqueurs d'invalidation partagés entre processus : un fichier par fichier
+    de contenu, réécrit à chaque invalidation (sa date de modification sert
+    de numéro de version, son contenu indique si le fichier a été supprimé).
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0, clock=time.monotonic):
+        """
+        Args:
+            directory: Répertoire partagé par les workers du pod (emptyDir)
+            poll_interval: Intervalle minimal (secondes) entre deux vérifications
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        # Les invalidations antérieures au démarrage sont déjà prises en compte
+        self._seen: Dict[str, int] = self._markers()
+
+    def publish(self, filenames: List[str], deleted: Iterable[str] = ()):
+        """
+        Signale aux autres workers que ces fichiers doivent être rechargés,
+        ou évincés pour ceux de `deleted`
+        """
+        deleted = set(deleted)
+        for filename in filenames:
+            path = self._path(filename)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    f.write(str(time.time_ns()))
+                    if filename in deleted:
+                        f.write(f" {DELETED_MARKER}")
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Cannot publish invalidation of {filename}: {e}")
+                continue
+            with self._lock:
+                # Déjà traité par le processus émetteur
+                self._seen[filename] = os.stat(path).st_mtime_ns
+
+    def poll(self) -> List[str]:
+        """
+        Fichiers invalidés par un autre worker depuis la dernière vérification
+        (liste vide si la dernière vérification date de moins de `poll_interval`).
+        """
+        now = self._clock()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < self.poll_interval:
+            return []
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.poll_interval:
+                return []
+            self._checked_at = now
+            changed = []
+            for filename, version in self._markers().items():
+                if self._seen.get(filename) != version:
+                    self._seen[filename] = version
+                    changed.append(filename)
+        return changed
+
+    def is_deleted(self, filename: str) -> bool:
+        """Indique si la dernière invalidation publiée pour ce fichier est une suppression"""
+        try:
+            with open(self._path(filename)) as f:
+                return f.read().split()[1:] == [DELETED_MARKER]
+        except OSError:
+            return False
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, quote(filename, safe=''))
+
+    def _markers(self) -> Dict[str, int]:
+        markers = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            logger.error(f"Cannot read invalidation markers: {e}")
+            return markers
+        for entry in entries:
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                markers[unquote(entry.name)] = entry.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return markers
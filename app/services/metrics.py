@@ -0,0 +1,127 @@
+"""
+Métriques Prometheus de l'application (exposées sur /metrics)
+
+En production sous gunicorn, définir PROMETHEUS_MULTIPROC_DIR (répertoire
+vide, par exemple un emptyDir) avant le démarrage : chaque worker écrit ses
+valeurs dans des fichiers mmap et /metrics agrège tous les workers.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Requêtes HTTP
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'Requêtes HTTP traitées', ['route', 'method', 'status']
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Durée de traitement des requêtes HTTP', ['route'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+)
+
+# Cache de contenu
+CACHE_LOOKUPS = Counter(
+    'content_cache_lookups_total',
+    'Lectures du cache de contenu par résultat (hit, miss, stale, stale_error, error)',
+    ['file', 'outcome']
+)
+CACHE_EVICTIONS = Counter(
+    'content_cache_evictions_total', 'Entrées évincées du cache de contenu'
+)
+CACHE_REFUSED = Counter(
+    'content_cache_refused_total', 'Entrées non mises en cache car trop volumineuses', ['file']
+)
+CACHE_BYTES = Gauge(
+    'content_cache_bytes', 'Empreinte mémoire estimée du cache de contenu',
+    multiprocess_mode='livesum'
+)
+
+# Azure Blob Storage
+BLOB_DOWNLOAD_DURATION = Histogram(
+    'blob_download_duration_seconds', 'Durée des lectures de blobs (y compris 304)', ['file'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+)
+BLOB_DOWNLOAD_BYTES = Counter(
+    'blob_download_bytes_total', 'Octets téléchargés depuis Azure Blob Storage', ['file']
+)
+BLOB_NOT_MODIFIED = Counter(
+    'blob_not_modified_total', 'Revalidations sans changement (304)', ['file']
+)
+BLOB_ERRORS = Counter(
+    'blob_errors_total', 'Erreurs de lecture Azure Blob Storage', ['file']
+)
+
+# Résilience des lectures de la source (voir app/services/resilience.py)
+STORAGE_CALLS = Counter(
+    'storage_calls_total',
+    'Lectures de la source distante par résultat (success, failure, timeout, rejected)',
+    ['outcome']
+)
+STORAGE_HEDGED = Counter(
+    'storage_hedged_reads_total',
+    'Lectures couvertes par la lecture retenue (primary, hedge)', ['winner']
+)
+STORAGE_BREAKER_STATE = Gauge(
+    'storage_circuit_breaker_state',
+    'État du disjoncteur de la source (0 fermé, 1 semi-ouvert, 2 ouvert)',
+    multiprocess_mode='livemax'
+)
+
+# Parsing
+PARSE_DURATION = Histogram(
+    'content_parse_duration_seconds', 'Durée de parsing des fichiers de contenu', ['format'],
+    buckets=(.0001, .0005, .001, .005, .01, .05, .1, .5, 1, 5)
+)
+
+PARSED_ARTIFACT_LOOKUPS = Counter(
+    'parsed_artifact_lookups_total',
+    'Lectures du cache disque des fichiers YAML parsés (hit, miss)', ['outcome']
+)
+
+INVALIDATIONS = Counter(
+    'content_invalidations_total',
+    "Fichiers invalidés par origine (webhook, marqueur d'un autre worker)",
+    ['file', 'source']
+)
+
+# Server-Sent Events
+SSE_CONNECTIONS = Gauge(
+    'sse_connections', 'Connexions /api/updates ouvertes', multiprocess_mode='livesum'
+)
+SSE_REJECTED = Counter(
+    'sse_rejected_total', 'Connexions /api/updates refusées (limite de flux du worker atteinte)'
+)
+
+# Logging
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total', 'Records de log abandonnés (file de logging pleine)'
+)
+
+
+def render_metrics():
+    """
+    Sérialise les métriques au format texte Prometheus.
+
+    Returns:
+        (corps, content-type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """À appeler quand un worker gunicorn se termine (hook child_exit)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
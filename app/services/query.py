@@ -0,0 +1,257 @@
+"""
+Requêtes sur les items d'une collection : pagination, filtres, tri et
+projection de champs.
+
+Les index (positions triées par champ, positions par valeur) sont calculés
+une fois au remplissage du cache ; une requête n'itère jamais sur
+l'ensemble des items.
+"""
+import base64
+import binascii
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Champs triables, filtrables par égalité et par intervalle
+SORT_FIELDS = ('date', 'id', 'title')
+FILTER_FIELDS = ('location', 'category')
+RANGE_FIELD = 'date'
+
+MAX_LIMIT = 1000
+
+
+class InvalidQueryError(ValueError):
+    """Paramètre de requête invalide (réponse HTTP 400)"""
+
+
+def _sort_key(value: Any) -> Optional[Tuple[int, Any]]:
+    """Clé de tri comparable quel que soit le type (None si non triable)"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, date):
+        return (1, value.isoformat())
+    if isinstance(value, str):
+        return (1, value.casefold())
+    return None
+
+
+def _filter_key(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value.casefold()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+class ItemIndex:
+    """Index précalculés sur la liste `items` d'un fichier de contenu"""
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        positions = [i for i, item in enumerate(items) if isinstance(item, dict)]
+
+        # Champ -> positions triées par valeur (items sans valeur exclus)
+        # et rang de chaque position dans cet ordre
+        self._sorted: Dict[str, List[int]] = {}
+        self._rank: Dict[str, Dict[int, int]] = {}
+        # Tri ("champ" ou "-champ") -> toutes les positions dans cet ordre,
+        # items sans valeur pour le champ en fin de liste quel que soit le sens
+        self._ordered: Dict[str, List[int]] = {}
+        for field in SORT_FIELDS:
+            keyed = [(_sort_key(items[i].get(field)), i) for i in positions]
+            keyed = sorted((key, i) for key, i in keyed if key is not None)
+            self._sorted[field] = [i for _, i in keyed]
+            self._rank[field] = {i: rank for rank, (_, i) in enumerate(keyed)}
+            unranked = [i for i in range(len(items)) if i not in self._rank[field]]
+            self._ordered[field] = self._sorted[field] + unranked
+            self._ordered['-' + field] = self._sorted[field][::-1] + unranked
+
+        # Intervalle de dates : positions des items datés (chaînes ISO) triées
+        # par date et clés alignées, globalement et par valeur de filtre
+        self._dated = [
+            i for i in self._sorted[RANGE_FIELD]
+            if isinstance(_sort_key(items[i][RANGE_FIELD])[1], str)
+        ]
+        self._range_keys = self._keys_for(self._dated)
+
+        # Champ -> valeur -> positions (triées par date puis positions sans date)
+        self._by_value: Dict[str, Dict[str, List[int]]] = {}
+        self._by_value_keys: Dict[str, Dict[str, List[str]]] = {}
+        date_rank = {i: rank for rank, i in enumerate(self._dated)}
+        for field in FILTER_FIELDS:
+            groups: Dict[str, List[int]] = {}
+            for i in positions:
+                key = _filter_key(items[i].get(field))
+                if key is not None:
+                    groups.setdefault(key, []).append(i)
+            for key, group in groups.items():
+                group.sort(key=lambda i: (i not in date_rank, date_rank.get(i, i)))
+            self._by_value[field] = groups
+            self._by_value_keys[field] = {
+                key: self._keys_for([i for i in group if i in date_rank])
+                for key, group in groups.items()
+            }
+
+    def _keys_for(self, positions: List[int]) -> List[str]:
+        return [_sort_key(self.items[i][RANGE_FIELD])[1] for i in positions]
+
+    def select(self, query: 'ItemQuery') -> dict:
+        """
+        Exécute une requête.
+
+        Returns:
+            {"items": page, "total": nb de résultats, "next_cursor": curseur ou None}
+        """
+        candidates, ordered_by = self._candidates(query)
+
+        if query.sort and ordered_by != query.order:
+            # Les items sans valeur pour le champ restent dans les résultats, en fin de liste
+            rank = self._rank[query.sort]
+            ranked = sorted((i for i in candidates if i in rank),
+                            key=rank.__getitem__, reverse=query.descending)
+            candidates = ranked + [i for i in candidates if i not in rank]
+
+        total = len(candidates)
+        end = total if query.limit is None else min(total, query.offset + query.limit)
+        page = [self._project(self.items[i], query.fields) for i in candidates[query.offset:end]]
+        return {
+            "items": page,
+            "total": total,
+            "next_cursor": encode_cursor(end) if end < total else None,
+        }
+
+    def _candidates(self, query: 'ItemQuery') -> Tuple[Sequence[int], Optional[str]]:
+        """Positions correspondant aux filtres, et tri ('champ' ou '-champ') déjà appliqué"""
+        filters = [(field, _filter_key(value)) for field, value in query.filters.items()]
+        has_range = query.date_from is not None or query.date_to is not None
+
+        if not filters:
+            if has_range:
+                return self._slice(self._dated, self._range_keys, query), RANGE_FIELD
+            if query.sort:
+                return self._ordered[query.order], query.order
+            return range(len(self.items)), None
+
+        # Filtre le plus sélectif en premier, les autres par intersection
+        groups = sorted(
+            ((self._by_value[field].get(key, []), field, key) for field, key in filters),
+            key=lambda group: len(group[0])
+        )
+        positions, field, key = groups[0]
+        if has_range:
+            dated = positions[:len(self._by_value_keys[field].get(key, []))]
+            positions = self._slice(dated, self._by_value_keys[field][key], query) if dated else []
+            ordered_by = RANGE_FIELD
+        else:
+            positions = sorted(positions)
+            ordered_by = None
+        for other, _, _ in groups[1:]:
+            other = set(other)
+            positions = [i for i in positions if i in other]
+        return positions, ordered_by
+
+    @staticmethod
+    def _slice(positions: List[int], keys: List[str], query: 'ItemQuery') -> List[int]:
+        lo = bisect_left(keys, query.date_from.casefold()) if query.date_from else 0
+        # date_to inclusive, y compris pour les dates avec heure (préfixe)
+        hi = bisect_right(keys, query.date_to.casefold() + '\uffff') if query.date_to else len(keys)
+        return positions[lo:hi]
+
+    @staticmethod
+    def _project(item: Any, fields: Optional[Tuple[str, ...]]) -> Any:
+        # Les items qui ne sont pas des objets sont renvoyés tels quels
+        if not fields or not isinstance(item, dict):
+            return item
+        return {field: item[field] for field in fields if field in item}
+
+
+def encode_cursor(offset: int) -> str:
+    """Curseur opaque de pagination"""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded).decode().split(':', 1)
+        if prefix != 'o' or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidQueryError(f"Invalid cursor: {cursor}")
+
+
+@dataclass(frozen=True)
+class ItemQuery:
+    """Paramètres d'une requête sur les items"""
+    limit: Optional[int] = None
+    offset: int = 0
+    sort: Optional[str] = None
+    descending: bool = False
+    fields: Optional[Tuple[str, ...]] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    filters: Mapping[str, str] = None
+
+    # Paramètres reconnus dans la query string
+    PARAMS = ('limit', 'cursor', 'sort', 'fields', 'date_from', 'date_to') + FILTER_FIELDS
+
+    @property
+    def order(self) -> Optional[str]:
+        """Tri demandé sous la forme "champ" ou "-champ" (None sans tri)"""
+        if not self.sort:
+            return None
+        return f"-{self.sort}" if self.descending else self.sort
+
+    @classmethod
+    def requested(cls, args: Mapping[str, str]) -> bool:
+        """
+        Indique si la query string contient au moins un paramètre reconnu et
+        non vide (les autres, comme un cache-buster `?_=123`, sont ignorés)
+        """
+        return any(args.get(param) for param in cls.PARAMS)
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str]) -> 'ItemQuery':
+        """
+        Construit une requête depuis les paramètres HTTP
+        (limit, cursor, sort=[-]champ, fields=a,b, date_from, date_to, location...).
+        Les paramètres inconnus et les valeurs vides sont ignorés.
+
+        Raises:
+            InvalidQueryError: si un paramètre reconnu est invalide
+        """
+        limit = None
+        if args.get('limit'):
+            try:
+                limit = int(args['limit'])
+            except ValueError:
+                raise InvalidQueryError("limit must be an integer")
+            if not 1 <= limit <= MAX_LIMIT:
+                raise InvalidQueryError(f"limit must be between 1 and {MAX_LIMIT}")
+
+        offset = decode_cursor(args['cursor']) if args.get('cursor') else 0
+
+        sort, descending = args.get('sort') or None, False
+        if sort and sort.startswith('-'):
+            sort, descending = sort[1:], True
+        if sort is not None and sort not in SORT_FIELDS:
+            raise InvalidQueryError(f"sort must be one of: {', '.join(SORT_FIELDS)}")
+
+        fields = None
+        if args.get('fields'):
+            fields = tuple(field.strip() for field in args['fields'].split(',') if field.strip())
+
+        return cls(
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            descending=descending,
+            fields=fields,
+            date_from=args.get('date_from') or None,
+            date_to=args.get('date_to') or None,
+            filters={field: args[field] for field in FILTER_FIELDS if args.get(field)},
+        )
@@ -0,0 +1,386 @@
+"""
+Résilience des lectures de la source distante (Azure Blob Storage, origine HTTP)
+
+- délai maximal par appel (deadline) : une requête n'attend jamais plus de
+  `deadline` secondes la réponse de la source, quels que soient les délais et
+  retries du SDK ; l'appel abandonné se termine dans un thread du pool
+- disjoncteur (CircuitBreaker) : après `failure_threshold` échecs consécutifs,
+  les lectures échouent immédiatement pendant `reset_timeout` secondes (le
+  cache sert alors la dernière copie valide), puis une seule lecture d'essai
+  décide de la fermeture ou d'une nouvelle ouverture
+- requêtes couvertes (hedging, optionnel) : si la source n'a pas répondu après
+  `hedge_delay` secondes, une seconde lecture identique est lancée et la
+  première réponse valide est retenue ; le flux de la lecture perdante est
+  fermé dès qu'elle se termine
+
+Seuls les erreurs d'accès, les réponses en erreur et les dépassements de
+deadline comptent comme des échecs pour le disjoncteur : un fichier
+introuvable (NOT_FOUND) est une réponse valide de la source. Une lecture en
+flux n'est un succès qu'une fois le téléchargement terminé.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, Optional
+
+from app.services import metrics
+from app.services.storage import StorageError, StreamedContent
+
+logger = logging.getLogger(__name__)
+
+# États du disjoncteur (valeur exportée par la métrique)
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Lecture d'origine et lecture couverte
+PRIMARY = 'primary'
+HEDGE = 'hedge'
+
+
+class DeadlineExceededError(StorageError):
+    """La source n'a pas répondu dans le délai imparti"""
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / semi-ouvert. Thread-safe."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_change: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            failure_threshold: Échecs consécutifs ouvrant le disjoncteur (0 = jamais)
+            reset_timeout: Durée d'ouverture avant une lecture d'essai (secondes)
+            clock: Horloge monotone (injectable pour les tests)
+            on_change: Appelé avec le nouvel état à chaque transition
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # Lecture d'essai en cours (état semi-ouvert)
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        Indique si une lecture peut être tentée. En semi-ouvert, une seule
+        lecture d'essai est autorisée à la fois.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                logger.info("Circuit breaker closed")
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            state = self._current_state()
+            if state == HALF_OPEN or (
+                state == CLOSED and self.failure_threshold and self._failures >= self.failure_threshold
+            ):
+                logger.warning("Circuit breaker opened after %d consecutive failures", self._failures)
+                self._opened_at = self._clock()
+                self._set_state(OPEN)
+
+    def release_probe(self):
+        """Termine une lecture d'essai sans verdict (lecture abandonnée par l'appelant)"""
+        with self._lock:
+            self._probing = False
+
+    def describe(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self._opened_at + self.reset_timeout - self._clock()), 3)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in": retry_in,
+            }
+
+    def reset_after_fork(self):
+        """Nouveau verrou dans un processus enfant après fork()"""
+        self._lock = threading.Lock()
+        self._probing = False
+
+    def _current_state(self) -> str:
+        # Passage en semi-ouvert à l'expiration du délai, constaté à la lecture
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            logger.info("Circuit breaker half-open, allowing a trial read")
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str):
+        self._state = state
+        if self._on_change is not None:
+            self._on_change(state)
+
+
+class StorageGuard:
+    """
+    Exécute les lectures de la source avec deadline, disjoncteur et requêtes
+    couvertes. Une lecture refusée ou expirée retourne None, comme une lecture
+    en erreur : le cache sert alors sa copie stale-if-error.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, deadline: float = 0,
+                 hedge_delay: float = 0, max_workers: int = 10):
+        """
+        Args:
+            breaker: Disjoncteur partagé par toutes les lectures de la source
+            deadline: Délai maximal d'une lecture (secondes, 0 = aucun)
+            hedge_delay: Délai avant la lecture couverte (secondes, 0 = désactivée)
+            max_workers: Threads exécutant les lectures (y compris celles
+                abandonnées qui n'ont pas encore rendu la main)
+        """
+        self.breaker = breaker
+        self.deadline = deadline
+        self.hedge_delay = hedge_delay
+        self.max_workers = max_workers
+        self._pool_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call(self, name: str, read: Callable[[], object], hedge: bool = True):
+        """
+        Effectue une lecture de la source.
+
+        Args:
+            name: Fichier lu (logs)
+            read: Lecture (retourne StreamedContent, RawContent, NOT_MODIFIED,
+                NOT_FOUND ou None)
+            hedge: Autorise une lecture couverte si la première tarde
+
+        Returns:
+            Résultat de la lecture, ou None si elle a été refusée, a expiré ou a échoué
+        """
+        if not self.breaker.allow():
+            metrics.STORAGE_CALLS.labels('rejected').inc()
+            logger.debug("Circuit breaker open, not reading %s", name)
+            return None
+
+        start = time.monotonic()
+        try:
+            result = self._run(read, hedge)
+        except DeadlineExceededError as e:
+            self.breaker.record_failure()
+            metrics.STORAGE_CALLS.labels('timeout').inc()
+            logger.error(f"Reading {name} timed out: {e}")
+            return None
+        except Exception:
+            self.breaker.record_failure()
+            metrics.STORAGE_CALLS.labels('failure').inc()
+            raise
+
+        if result is None:
+            self.breaker.record_failure()
+            metrics.STORAGE_CALLS.labels('failure').inc()
+            return None
+        if isinstance(result, StreamedContent):
+            # Issue enregistrée à la fin du téléchargement (voir GuardedChunks)
+            deadline_at = start + self.deadline if self.deadline else None
+            return result._replace(chunks=GuardedChunks(self, name, result.chunks, deadline_at))
+        # NOT_FOUND compris : la source a répondu
+        self.breaker.record_success()
+        metrics.STORAGE_CALLS.labels('success').inc()
+        return result
+
+    def check(self, check: Callable[[], bool]) -> bool:
+        """Test de connectivité borné par la deadline (sans effet sur le disjoncteur)"""
+        try:
+            return bool(self._run(check, hedge=False))
+        except DeadlineExceededError as e:
+            logger.error(f"Connectivity check timed out: {e}")
+            return False
+
+    def describe(self) -> dict:
+        return {
+            **self.breaker.describe(),
+            "deadline": self.deadline,
+            "hedge_delay": self.hedge_delay,
+        }
+
+    def reset_after_fork(self):
+        """Réinitialise verrous et threads dans un processus enfant après fork()"""
+        self.breaker.reset_after_fork()
+        self._pool_lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='storage-read'
+                )
+            return self._executor
+
+    def _run(self, read: Callable[[], object], hedge: bool):
+        """
+        Exécute `read` dans le pool, relancée une fois après `hedge_delay`
+        si elle n'a pas répondu, et attend au plus `deadline` secondes.
+
+        Raises:
+            DeadlineExceededError: si aucune lecture n'a répondu à temps
+        """
+        hedge = hedge and self.hedge_delay > 0
+        if not self.deadline and not hedge:
+            return read()
+
+        start = time.monotonic()
+        pool = self._pool()
+        pending = {pool.submit(read): PRIMARY}
+        hedged = False
+        while True:
+            elapsed = time.monotonic() - start
+            timeouts = []
+            if self.deadline:
+                timeouts.append(self.deadline - elapsed)
+            if hedge and not hedged:
+                timeouts.append(self.hedge_delay - elapsed)
+            timeout = max(0.0, min(timeouts)) if timeouts else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                role = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    if pending:
+                        continue
+                    raise
+                # Un échec rapide n'est pas couvert : seule une lecture lente l'est
+                if result is not None or not pending:
+                    for other in pending:
+                        self._abandon(other)
+                    if hedged:
+                        metrics.STORAGE_HEDGED.labels(role).inc()
+                    return result
+
+            elapsed = time.monotonic() - start
+            if self.deadline and elapsed >= self.deadline:
+                for future in pending:
+                    self._abandon(future)
+                raise DeadlineExceededError(f"no response after {self.deadline}s")
+            if hedge and not hedged and elapsed >= self.hedge_delay:
+                logger.debug("Hedging a read after %.3fs", elapsed)
+                pending[pool.submit(read)] = HEDGE
+                hedged = True
+
+    @staticmethod
+    def _abandon(future):
+        """
+        Annule une lecture qui n'a pas encore démarré ; si elle est en cours,
+        son résultat est fermé dès qu'elle se termine (connexion rendue au
+        pool au lieu d'un téléchargement ouvert que personne ne lit ; Azure
+        n'a rien à fermer, download_blob ayant déjà lu la première plage)
+        """
+        if not future.cancel():
+            future.add_done_callback(_close_result)
+
+    def _settle(self, outcome: Optional[str]):
+        """
+        Issue d'une lecture en flux : 'success' à la fin du téléchargement,
+        'failure' sur erreur ou deadline, None si le lecteur l'abandonne
+        (aucun verdict sur la source, la lecture d'essai est seulement libérée)
+        """
+        if outcome == 'success':
+            self.breaker.record_success()
+        elif outcome == 'failure':
+            self.breaker.record_failure()
+        else:
+            self.breaker.release_probe()
+            return
+        metrics.STORAGE_CALLS.labels(outcome).inc()
+
+
+class GuardedChunks:
+    """
+    Morceaux d'une lecture en flux protégée : le disjoncteur n'enregistre le
+    succès qu'à la fin du téléchargement (une source qui accepte la connexion
+    puis échoue en cours de route accumule des échecs et finit par l'ouvrir).
+
+    La deadline n'est vérifiée qu'entre deux morceaux : un morceau bloqué
+    n'est interrompu que par les délais de connexion et de lecture du
+    transport (AZURE_CONNECTION_TIMEOUT / AZURE_READ_TIMEOUT pour Azure,
+    timeout de HTTPStorage), sans lesquels ce contrôle ne borne rien.
+    """
+
+    def __init__(self, guard: StorageGuard, name: str, chunks: Iterator[bytes],
+                 deadline_at: Optional[float]):
+        self._guard = guard
+        self._name = name
+        self._source = chunks
+        self._chunks = iter(chunks)
+        self._deadline_at = deadline_at
+        self._settled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self._settled:
+            raise StopIteration
+        try:
+            chunk = next(self._chunks)
+            if self._deadline_at is not None and time.monotonic() > self._deadline_at:
+                raise DeadlineExceededError(
+                    f"download of {self._name} exceeded {self._guard.deadline}s"
+                )
+        except StopIteration:
+            self._finish('success')
+            raise
+        except StorageError:
+            self._finish('failure')
+            raise
+        return chunk
+
+    def close(self):
+        """Abandon du téléchargement par le lecteur (sans effet si déjà terminé)"""
+        if not self._settled:
+            self._finish(None)
+
+    def _finish(self, outcome: Optional[str]):
+        self._settled = True
+        try:
+            close = getattr(self._source, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._guard._settle(outcome)
+
+
+def _close_result(future):
+    """Ferme le flux d'une lecture abandonnée (callback de Future)"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if isinstance(result, StreamedContent):
+        close = getattr(result.chunks, 'close', None)
+        if close is not None:
+            close()
@@ -0,0 +1,184 @@
+"""
+Recherche plein texte en mémoire sur les items des collections.
+
+Index inversé par collection (segment), reconstruit uniquement pour le
+fichier rechargé. Les accents sont ignorés ("évènement" == "evenement")
+et le classement utilise BM25.
+"""
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Mots vides (français et anglais) ignorés à l'indexation et à la recherche
+STOPWORDS = frozenset("""
+    au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma
+    mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se
+    ses son sur ta te tes toi ton tu un une vos votre vous est sont
+    a an and are as at be by for from in is it of on or that the this to was with
+""".split())
+
+# Champs dont les termes comptent double (titre, question de FAQ)
+BOOSTED_FIELDS = ('title', 'question')
+
+# Nombre maximal de termes développés pour le préfixe du dernier mot
+MAX_PREFIX_EXPANSIONS = 20
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents : 'Évènement' -> 'evenement'"""
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+@lru_cache(maxsize=65536)
+def _fold_token(token: str) -> str:
+    # Le vocabulaire est limité : chaque mot n'est normalisé qu'une fois
+    return fold(token)
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes normalisés, sans mots vides"""
+    tokens = (_fold_token(token) for token in TOKEN_RE.findall(text.casefold()))
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def _item_terms(item: dict) -> Counter:
+    terms = Counter()
+    for field, value in item.items():
+        if not isinstance(value, str):
+            continue
+        weight = 2 if field in BOOSTED_FIELDS else 1
+        for token in tokenize(value):
+            terms[token] += weight
+    return terms
+
+
+class _Segment:
+    """Index inversé d'une collection (immuable une fois construit)"""
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        self.postings: Dict[str, List[tuple]] = {}
+        self.lengths: List[int] = []
+
+        for position, item in enumerate(items):
+            terms = _item_terms(item) if isinstance(item, dict) else Counter()
+            self.lengths.append(sum(terms.values()))
+            for token, frequency in terms.items():
+                self.postings.setdefault(token, []).append((position, frequency))
+
+        self.vocabulary = sorted(self.postings)
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+
+    def expand(self, prefix: str) -> List[str]:
+        """Termes du vocabulaire commençant par `prefix`"""
+        start = bisect_left(self.vocabulary, prefix)
+        matches = []
+        for token in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def score(self, terms: List[str], prefix: Optional[str]) -> Dict[int, float]:
+        """Scores BM25 des items contenant au moins un des termes"""
+        scores: Dict[int, float] = {}
+        count = len(self.items)
+        queried = [(token, 1.0) for token in terms]
+        if prefix:
+            # Recherche à la frappe : le dernier mot peut être incomplet
+            queried += [(token, 1.0 if token == prefix else 0.5) for token in self.expand(prefix)]
+
+        for token, weight in queried:
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, frequency in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / (self.average_length or 1))
+                scores[position] = scores.get(position, 0.0) + \
+                    weight * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+
+class SearchIndex:
+    """Index de recherche multi-collections, mis à jour collection par collection"""
+
+    def __init__(self):
+        self._segments: Dict[str, _Segment] = {}
+        # Version du contenu indexé par collection (ETag de l'instantané)
+        self._versions: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, collection: str, items: List[dict], version: Optional[str] = None):
+        """(Re)construit l'index d'une collection puis le publie atomiquement"""
+        segment = _Segment(items)
+        with self._lock:
+            self._segments = {**self._segments, collection: segment}
+            self._versions[collection] = version
+
+    def remove(self, collection: str):
+        with self._lock:
+            self._segments = {k: v for k, v in self._segments.items() if k != collection}
+            self._versions.pop(collection, None)
+
+    def version(self, collection: str) -> Optional[str]:
+        """Version du contenu indexé pour une collection (None si non indexée)"""
+        return self._versions.get(collection)
+
+    def __contains__(self, collection: str) -> bool:
+        return collection in self._segments
+
+    def search(self, query: str, collections: Optional[Iterable[str]] = None,
+               limit: int = 20) -> dict:
+        """
+        Recherche les items correspondant à la requête.
+
+        Args:
+            query: Texte recherché (le dernier mot est traité comme un préfixe)
+            collections: Collections à interroger (toutes par défaut)
+            limit: Nombre maximal de résultats
+
+        Returns:
+            {"total": nb d'items trouvés, "results": [{"collection", "score", "item"}]}
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return {"total": 0, "results": []}
+        # Le dernier mot n'est traité comme préfixe que si la requête ne se
+        # termine pas par un séparateur
+        prefix = tokens[-1] if query[-1:].isalnum() else None
+        terms = tokens[:-1] if prefix else tokens
+
+        segments = self._segments
+        if collections is not None:
+            segments = {name: segments[name] for name in collections if name in segments}
+
+        total = 0
+        ranked = []
+        for name, segment in segments.items():
+            scores = segment.score(terms, prefix)
+            total += len(scores)
+            ranked.extend((score, name, position) for position, score in scores.items())
+
+        best = heapq.nlargest(limit, ranked, key=lambda entry: entry[0])
+        return {
+            "total": total,
+            "results": [
+                {"collection": name, "score": round(score, 4), "item": segments[name].items[position]}
+                for score, name, position in best
+            ],
+        }
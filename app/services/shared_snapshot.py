@@ -0,0 +1,289 @@
+"""
+Instantanés de contenu partagés entre les workers gunicorn
+
+Un seul processus (le writer, élu par un verrou fcntl sur `writer.lock`)
+charge le contenu depuis la source et écrit tous les instantanés (corps
+pré-encodés, variantes compressées, ETags) dans un fichier unique, remplacé
+atomiquement (os.replace) à chaque nouvelle génération. Les autres workers
+projettent ce fichier en mémoire (mmap) : les corps sont des vues sur les
+pages partagées du page cache, sans copie ni parsing, et aucun worker lecteur
+n'interroge Azure. Les données parsées et les index ne sont calculés dans un
+lecteur que s'il sert une requête qui en a besoin (filtres, recherche).
+
+Format du fichier :
+
+    MAGIC (8 octets) | taille de l'en-tête (uint32) | en-tête JSON | corps...
+
+L'en-tête décrit chaque fichier de contenu (ETags, date de modification,
+position et taille du corps et de ses variantes).
+"""
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.services.snapshot import ContentSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'CPSNAP01'
+_HEADER_SIZE = struct.Struct('>I')
+
+SNAPSHOT_FILE = 'snapshot.bin'
+LOCK_FILE = 'writer.lock'
+
+# Erreurs possibles à la lecture d'un fichier d'instantanés absent ou corrompu
+SNAPSHOT_FILE_ERRORS = (OSError, ValueError, KeyError, TypeError, struct.error)
+
+
+class SharedSnapshotStore:
+    """
+    Fichier d'instantanés partagé : écrit par le writer élu, lu par tous les
+    workers via mmap. Thread-safe.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0, clock=time.monotonic):
+        """
+        Args:
+            directory: Répertoire partagé par les workers du pod (ex. /dev/shm/...)
+            poll_interval: Intervalle minimal (secondes) entre deux vérifications
+                d'une nouvelle génération par un lecteur
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, SNAPSHOT_FILE)
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._lock_fd: Optional[int] = None
+
+        # Génération projetée : identité du fichier (inode, mtime, taille),
+        # numéro de génération et instantanés
+        self._file_key: Optional[Tuple[int, int, int]] = None
+        self._checked_at: Optional[float] = None
+        self.generation = 0
+        self._snapshots: Dict[str, ContentSnapshot] = {}
+
+    # -- Élection du writer ---------------------------------------------------
+
+    @property
+    def is_writer(self) -> bool:
+        """Indique si ce processus détient le verrou d'écriture"""
+        return self._lock_fd is not None
+
+    def try_acquire_writer(self) -> bool:
+        """
+        Tente (sans attendre) de devenir le writer. Le verrou est libéré par le
+        système si le processus meurt : un autre worker prend alors le relais.
+
+        Returns:
+            True si ce processus est le writer
+        """
+        with self._lock:
+            if self._lock_fd is not None:
+                return True
+            fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+        logger.info("Shared snapshot writer elected (pid %s)", os.getpid())
+        return True
+
+    def release_writer(self):
+        with self._lock:
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    def reset_after_fork(self):
+        """
+        À appeler dans un processus forké : le verrou hérité du parent est
+        abandonné (un flock est partagé par les descripteurs dupliqués).
+        La projection en lecture reste valide.
+        """
+        self._lock = threading.Lock()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    # -- Écriture ---------------------------------------------------------------
+
+    def publish(self, snapshots: Dict[str, ContentSnapshot]) -> int:
+        """
+        Écrit une nouvelle génération contenant `snapshots` puis la publie
+        atomiquement. Réservé au writer.
+
+        Args:
+            snapshots: Instantanés par nom de fichier
+
+        Returns:
+            Numéro de la génération publiée
+        """
+        if not self.is_writer:
+            raise RuntimeError("Only the elected writer can publish shared snapshots")
+
+        self._reload()
+        generation = self.generation + 1
+        size = write_snapshot_file(self.path, snapshots, generation)
+        logger.info("Shared snapshot generation %d published (%d files, %d bytes)",
+                    generation, len(snapshots), size)
+        self._reload()
+        return generation
+
+    # -- Lecture ----------------------------------------------------------------
+
+    def get(self, filename: str) -> Optional[ContentSnapshot]:
+        """
+        Instantané d'un fichier dans la dernière génération publiée.
+
+        Returns:
+            ContentSnapshot dont les corps sont des vues sur le fichier partagé,
+            ou None si aucune génération ne le contient
+        """
+        now = self._clock()
+        if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+            self._checked_at = now
+            self._reload()
+        return self._snapshots.get(filename)
+
+    def snapshots(self) -> Dict[str, ContentSnapshot]:
+        """Instantanés de la génération projetée (sans vérifier s'il en existe une plus récente)"""
+        return dict(self._snapshots)
+
+    def _reload(self):
+        """Projette la génération courante si le fichier a été remplacé"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._file_key:
+            return
+        with self._lock:
+            if key == self._file_key:
+                return
+            try:
+                generation, snapshots = self._map()
+            except SNAPSHOT_FILE_ERRORS as e:
+                logger.error(f"Error reading shared snapshot {self.path}: {e}")
+                return
+            # Données déjà parsées par ce worker et toujours valides : conservées
+            for filename, snapshot in snapshots.items():
+                previous = self._snapshots.get(filename)
+                if previous is not None:
+                    snapshot.adopt(previous)
+            self._file_key = key
+            self.generation = generation
+            self._snapshots = snapshots
+        logger.debug("Shared snapshot generation %d mapped", generation)
+
+    def _map(self) -> Tuple[int, Dict[str, ContentSnapshot]]:
+        with open(self.path, 'rb') as f:
+            # La projection reste valide après la fermeture du fichier, et
+            # après son remplacement par une génération plus récente
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return read_snapshot_file(memoryview(mapping))
+
+    def describe(self) -> dict:
+        return {
+            "role": "writer" if self.is_writer else "reader",
+            "generation": self.generation,
+            "files": sorted(self._snapshots),
+        }
+
+
+def write_snapshot_file(path: str, snapshots: Dict[str, ContentSnapshot],
+                        generation: int = 0) -> int:
+    """
+    Écrit des instantanés dans un fichier, remplacé atomiquement.
+
+    Args:
+        path: Chemin du fichier
+        snapshots: Instantanés par nom de fichier
+        generation: Numéro de génération enregistré dans l'en-tête
+
+    Returns:
+        Taille totale des corps écrits (octets)
+    """
+    files = {}
+    chunks = []
+    offset = 0
+    for filename, snapshot in snapshots.items():
+        entry = {
+            "etag": snapshot.etag,
+            "source_etag": snapshot.source_etag,
+            "last_modified": snapshot.last_modified.isoformat(),
+            "variants": {},
+        }
+        for encoding, body in ((None, snapshot.body), *snapshot.variants.items()):
+            position = [offset, len(body)]
+            if encoding is None:
+                entry["body"] = position
+            else:
+                entry["variants"][encoding] = position
+            chunks.append(body)
+            offset += len(body)
+        files[filename] = entry
+
+    header = json.dumps({"generation": generation, "files": files}).encode('utf-8')
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_HEADER_SIZE.pack(len(header)))
+            f.write(header)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return offset
+
+
+def read_snapshot_file(view: memoryview) -> Tuple[int, Dict[str, ContentSnapshot]]:
+    """
+    Lit des instantanés écrits par write_snapshot_file. Les corps sont des
+    vues sur `view` (aucune copie).
+
+    Returns:
+        (génération, instantanés par nom de fichier)
+
+    Raises:
+        ValueError: si le contenu n'est pas un fichier d'instantanés valide
+    """
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a shared snapshot file")
+    start = len(MAGIC) + _HEADER_SIZE.size
+    (header_size,) = _HEADER_SIZE.unpack(view[len(MAGIC):start])
+    header = json.loads(bytes(view[start:start + header_size]))
+    data = view[start + header_size:]
+
+    def part(position):
+        offset, size = position
+        if offset + size > len(data):
+            raise ValueError("truncated shared snapshot file")
+        return data[offset:offset + size]
+
+    snapshots = {}
+    for filename, entry in header["files"].items():
+        snapshots[filename] = ContentSnapshot(
+            filename,
+            part(entry["body"]),
+            entry["etag"],
+            datetime.fromisoformat(entry["last_modified"]),
+            {encoding: part(position) for encoding, position in entry["variants"].items()},
+            entry["source_etag"],
+        )
+    return header["generation"], snapshots
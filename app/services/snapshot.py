@@ -0,0 +1,247 @@
+"""
+Instantané d'un fichier de contenu : données parsées et réponse JSON
+pré-encodée (et pré-compressée), avec son ETag et sa date de dernière
+modification
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.services.query import ItemIndex
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : seul gzip est alors proposé
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : module json standard à défaut
+    orjson = None
+
+IDENTITY = 'identity'
+
+# Taille des morceaux écrits par réponse pour un corps partagé (voir body_chunks)
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Niveaux de compression modérés : la compression est refaite à chaque
+# rechargement (parfois attendu par une requête), les niveaux maximaux
+# coûtent plusieurs fois plus de CPU pour quelques pourcents de taille.
+# Niveaux réduits au-delà de LARGE_BODY_SIZE octets
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+LARGE_BODY_SIZE = 4 * 1024 * 1024
+LARGE_BODY_BROTLI_QUALITY = 3
+LARGE_BODY_GZIP_LEVEL = 4
+
+# Empreinte mémoire estimée des objets Python par octet de JSON compact
+# (mesurée sur les fichiers de contenu : données parsées ≈ 4, index ≈ 2)
+PARSED_BYTES_PER_BODY_BYTE = 4
+INDEX_BYTES_PER_BODY_BYTE = 2
+
+
+def _json_default(value: Any) -> Any:
+    """Sérialise les dates produites par le parseur YAML au format ISO 8601"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(data: Any) -> bytes:
+    """Encode des données en JSON compact UTF-8"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # ex. entiers de plus de 64 bits : le module standard les accepte
+    return json.dumps(
+        data, ensure_ascii=False, separators=(',', ':'), default=_json_default
+    ).encode('utf-8')
+
+
+def decode_json(body) -> Any:
+    """Décode un corps JSON UTF-8 (bytes ou memoryview)"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(bytes(body))
+
+
+def body_chunks(body, chunk_size: int = RESPONSE_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Corps de réponse par morceaux : un corps partagé (memoryview sur le
+    fichier projeté) n'est jamais copié en entier par requête, seul le
+    morceau en cours d'envoi l'est (les serveurs WSGI n'acceptent que des bytes).
+    """
+    for start in range(0, len(body), chunk_size):
+        yield bytes(body[start:start + chunk_size])
+
+
+def compress_variants(body: bytes, min_size: int = 256) -> Dict[str, bytes]:
+    """
+    Compresse un corps de réponse une fois par rechargement et non par
+    requête (niveaux modérés, réduits pour les corps volumineux).
+
+    Args:
+        body: Corps non compressé
+        min_size: Taille en dessous de laquelle la compression n'est pas tentée
+
+    Returns:
+        Variantes compressées par Content-Encoding, ordonnées par préférence
+    """
+    variants = {}
+    if len(body) < min_size:
+        return variants
+    large = len(body) > LARGE_BODY_SIZE
+    if brotli is not None:
+        variants['br'] = brotli.compress(
+            body, quality=LARGE_BODY_BROTLI_QUALITY if large else BROTLI_QUALITY
+        )
+    # mtime=0 : sortie identique d'un pod à l'autre pour un même contenu
+    variants['gzip'] = gzip.compress(
+        body, compresslevel=LARGE_BODY_GZIP_LEVEL if large else GZIP_LEVEL, mtime=0
+    )
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+@dataclass(frozen=True)
+class ContentSnapshot:
+    """
+    Contenu prêt à servir : les routes renvoient `body` tel quel au lieu
+    de réencoder `data` à chaque requête.
+
+    `data` et `index` sont calculés à la première utilisation à partir de
+    `body` quand l'instantané n'a pas été construit par `build` (instantané
+    partagé entre workers, voir app/services/shared_snapshot.py).
+    """
+    filename: str
+    # bytes, ou memoryview sur un fichier partagé
+    body: bytes
+    etag: str
+    last_modified: datetime
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    # Version de la source (ETag du blob) pour les revalidations conditionnelles
+    source_etag: Optional[str] = None
+
+    @cached_property
+    def data(self) -> Any:
+        """Contenu parsé"""
+        return decode_json(self.body)
+
+    @cached_property
+    def index(self) -> Optional[ItemIndex]:
+        """Index de requête sur `items` (None si le contenu n'a pas de liste d'items)"""
+        data = self.data
+        if isinstance(data, dict) and isinstance(data.get('items'), list):
+            return ItemIndex(data['items'])
+        return None
+
+    @property
+    def decoded(self) -> bool:
+        """Indique si `data` a déjà été calculé"""
+        return 'data' in self.__dict__
+
+    @classmethod
+    def build(cls, filename: str, data: Any, last_modified: Optional[datetime] = None,
+              source_etag: Optional[str] = None,
+              compress_min_size: int = 256) -> 'ContentSnapshot':
+        """
+        Construit un instantané à partir des données parsées.
+
+        Args:
+            filename: Nom du fichier source
+            data: Contenu parsé
+            last_modified: Date de modification de la source (maintenant si inconnue)
+            source_etag: ETag de la source, réutilisé pour les lectures conditionnelles
+            compress_min_size: Taille minimale du corps pour le pré-compresser
+
+        Returns:
+            ContentSnapshot avec corps encodé, variantes compressées, index de
+            requête et ETag fort (hash du corps)
+        """
+        snapshot = cls.from_body(filename, encode_json(data), last_modified, source_etag,
+                                 compress_min_size)
+        # Données et index déjà disponibles : rien à recalculer depuis le corps
+        snapshot.__dict__['data'] = data
+        snapshot.__dict__['index'] = snapshot.index
+        return snapshot
+
+    @classmethod
+    def from_body(cls, filename: str, body: bytes, last_modified: Optional[datetime] = None,
+                  source_etag: Optional[str] = None,
+                  compress_min_size: int = 256) -> 'ContentSnapshot':
+        """
+        Construit un instantané à partir d'un corps JSON déjà encodé (ingestion
+        en flux) : les données et l'index sont calculés à la première utilisation.
+
+        Args:
+            filename: Nom du fichier source
+            body: Corps JSON compact UTF-8
+            last_modified: Date de modification de la source (maintenant si inconnue)
+            source_etag: ETag de la source, réutilisé pour les lectures conditionnelles
+            compress_min_size: Taille minimale du corps pour le pré-compresser
+
+        Returns:
+            ContentSnapshot avec variantes compressées et ETag fort (hash du corps)
+        """
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if last_modified is None:
+            last_modified = datetime.now(timezone.utc)
+        return cls(filename, body, etag, last_modified,
+                   compress_variants(body, compress_min_size), source_etag)
+
+    def adopt(self, other: 'ContentSnapshot'):
+        """
+        Reprend les données et l'index déjà calculés d'un instantané de même
+        ETag (évite de reparser un contenu inchangé).
+        """
+        if other.etag == self.etag:
+            for name in ('data', 'index'):
+                if name in other.__dict__:
+                    self.__dict__.setdefault(name, other.__dict__[name])
+
+    def compact(self) -> 'ContentSnapshot':
+        """
+        Copie sans données parsées ni index (recalculés à la première
+        utilisation), qui ne garde que le corps et les variantes compressées
+        """
+        if 'data' not in self.__dict__ and 'index' not in self.__dict__:
+            return self
+        return replace(self)
+
+    def memory_size(self) -> int:
+        """
+        Empreinte mémoire estimée (octets) : corps et variantes compressées,
+        plus données parsées et index, comptés avant même d'être calculés (une
+        entrée acceptée par le cache ne dépasse pas sa limite une fois décodée).
+        L'index n'est plus compté s'il s'avère absent (pas de liste d'items).
+        """
+        body = len(self.body)
+        size = body + sum(len(variant) for variant in self.variants.values())
+        size += body * PARSED_BYTES_PER_BODY_BYTE
+        if self.__dict__.get('index', True) is not None:
+            size += body * INDEX_BYTES_PER_BODY_BYTE
+        return size
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Content-Encodings disponibles, du plus au moins préféré"""
+        return tuple(self.variants) + (IDENTITY,)
+
+    def representation(self, encoding: str) -> Tuple[bytes, str]:
+        """
+        Retourne le corps et l'ETag de la représentation demandée.
+        Chaque encodage a son propre ETag fort.
+
+        Args:
+            encoding: Content-Encoding négocié ('br', 'gzip' ou 'identity')
+
+        Returns:
+            (corps, etag)
+        """
+        if encoding in self.variants:
+            return self.variants[encoding], f"{self.etag}-{encoding}"
+        return self.body, self.etag
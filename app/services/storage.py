@@ -0,0 +1,432 @@
+"""
+Sources du contenu (backends de stockage)
+
+Tous les backends respectent le même contrat :
+
+- stream(name, etag) : contenu sous forme d'itérateur de morceaux
+  (StreamedContent), NOT_MODIFIED si la version `etag` est toujours à jour
+  (lecture conditionnelle), NOT_FOUND si le fichier n'existe pas, None si la
+  source est inaccessible ou en erreur
+- read(name, etag) : comme stream, avec le contenu complet (RawContent)
+- list(prefix) : noms des fichiers disponibles
+- check() : test de connectivité (readiness probe)
+
+Les erreurs survenant pendant la lecture des morceaux sont levées sous forme
+de StorageError.
+
+Backends : Azure Blob Storage, fichiers locaux, mémoire et origine HTTP (CDN).
+Le SDK Azure et requests ne sont importés que par les backends qui les
+utilisent, à leur premier appel (démarrage plus rapide en local et en test).
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.services import metrics
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Taille des morceaux lus par les backends qui la choisissent
+CHUNK_SIZE = 64 * 1024
+
+
+class RawContent(NamedTuple):
+    """Contenu brut lu depuis la source, avant parsing"""
+    content: bytes
+    last_modified: Optional[datetime]
+    # Version de la source (ETag du blob, mtime/taille du fichier local)
+    etag: Optional[str] = None
+
+
+class StreamedContent(NamedTuple):
+    """Contenu lu morceau par morceau (le parsing peut commencer avant la fin)"""
+    chunks: Iterator[bytes]
+    last_modified: Optional[datetime]
+    etag: Optional[str] = None
+    # Taille totale en octets, si la source la connaît
+    size: Optional[int] = None
+
+    def read(self) -> bytes:
+        return b''.join(self.chunks)
+
+
+# Retourné par les backends quand la source n'a pas changé depuis `etag`
+NOT_MODIFIED = object()
+# Retourné par les backends quand le fichier n'existe pas : réponse valide de
+# la source (sans effet sur le disjoncteur), à distinguer d'une erreur (None)
+NOT_FOUND = object()
+
+
+class StorageError(Exception):
+    """Erreur d'accès à une source de contenu"""
+
+
+class ClosingChunks:
+    """
+    Itérateur de morceaux dont close() libère la source (réponse HTTP,
+    fichier) même s'il n'a jamais été parcouru : fermer un générateur non
+    démarré n'exécute pas son bloc finally / with
+    """
+
+    def __init__(self, chunks: Iterator[bytes], release):
+        self._chunks = chunks
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._chunks)
+
+    def close(self):
+        try:
+            self._chunks.close()
+        finally:
+            self._release()
+
+
+class StorageBackend:
+    """Interface commune des sources de contenu"""
+
+    # Nom du backend (exposé par la readiness probe)
+    name = 'base'
+    # Source distante : sa connectivité est vérifiée par la readiness probe
+    remote = False
+
+    def stream(self, name: str, etag: Optional[str] = None):
+        """
+        Ouvre un fichier en lecture par morceaux.
+
+        Args:
+            name: Nom du fichier
+            etag: Version déjà connue ; si fournie, la lecture est conditionnelle
+
+        Returns:
+            StreamedContent, NOT_MODIFIED si le fichier n'a pas changé,
+            NOT_FOUND s'il n'existe pas, ou None si erreur
+        """
+        raise NotImplementedError
+
+    def read(self, name: str, etag: Optional[str] = None):
+        """
+        Lit un fichier en entier.
+
+        Args:
+            name: Nom du fichier
+            etag: Version déjà connue ; si fournie, la lecture est conditionnelle
+
+        Returns:
+            RawContent, NOT_MODIFIED si le fichier n'a pas changé,
+            NOT_FOUND s'il n'existe pas, ou None si erreur
+        """
+        streamed = self.stream(name, etag)
+        if streamed is None or streamed is NOT_MODIFIED or streamed is NOT_FOUND:
+            return streamed
+        try:
+            content = streamed.read()
+        except StorageError as e:
+            logger.error(f"Error reading {name} from {self.name}: {e}")
+            return None
+        return RawContent(content, streamed.last_modified, streamed.etag)
+
+    def list(self, prefix: str = '') -> List[str]:
+        """
+        Noms des fichiers disponibles, triés.
+
+        Raises:
+            StorageError: si la source est inaccessible
+        """
+        raise NotImplementedError
+
+    def check(self) -> bool:
+        """Vérifie que la source répond"""
+        try:
+            self.list()
+            return True
+        except StorageError:
+            return False
+
+
+class BlobStorage(StorageBackend):
+    """Azure Blob Storage (ou tout client de conteneur compatible)"""
+
+    name = 'blob'
+    remote = True
+
+    def __init__(self, container_client, timeout: Optional[float] = None):
+        """
+        Args:
+            container_client: ContainerClient Azure (None si non configuré)
+            timeout: Délai des opérations de listing (en secondes)
+        """
+        self.container_client = container_client
+        self.timeout = timeout
+
+    def stream(self, name: str, etag: Optional[str] = None):
+        if not self.container_client:
+            logger.warning("Azure Blob client not available")
+            return None
+        from azure.core import MatchConditions
+        from azure.core.exceptions import AzureError, ResourceNotFoundError, ResourceNotModifiedError
+
+        start = time.perf_counter()
+        try:
+            blob_client = self.container_client.get_blob_client(name)
+            if etag:
+                downloader = blob_client.download_blob(
+                    etag=etag, match_condition=MatchConditions.IfModified
+                )
+            else:
+                downloader = blob_client.download_blob()
+        except ResourceNotModifiedError:
+            logger.debug("Blob %s not modified", name)
+            metrics.BLOB_NOT_MODIFIED.labels(name).inc()
+            metrics.BLOB_DOWNLOAD_DURATION.labels(name).observe(time.perf_counter() - start)
+            return NOT_MODIFIED
+        except ResourceNotFoundError:
+            logger.error(f"Blob not found: {name}")
+            metrics.BLOB_DOWNLOAD_DURATION.labels(name).observe(time.perf_counter() - start)
+            return NOT_FOUND
+        except AzureError as e:
+            logger.error(f"Error reading blob {name}: {e}")
+            metrics.BLOB_ERRORS.labels(name).inc()
+            metrics.BLOB_DOWNLOAD_DURATION.labels(name).observe(time.perf_counter() - start)
+            return None
+
+        properties = downloader.properties
+        return StreamedContent(
+            self._chunks(name, downloader, start), properties.last_modified,
+            properties.etag, getattr(properties, 'size', None)
+        )
+
+    def _chunks(self, name: str, downloader, start: float) -> Iterator[bytes]:
+        # Durée mesurée jusqu'au dernier morceau, comme pour un readall()
+        from azure.core.exceptions import AzureError
+        try:
+            for chunk in downloader.chunks():
+                metrics.BLOB_DOWNLOAD_BYTES.labels(name).inc(len(chunk))
+                yield chunk
+        except AzureError as e:
+            metrics.BLOB_ERRORS.labels(name).inc()
+            raise StorageError(str(e)) from e
+        finally:
+            metrics.BLOB_DOWNLOAD_DURATION.labels(name).observe(time.perf_counter() - start)
+
+    def list(self, prefix: str = '') -> List[str]:
+        if not self.container_client:
+            raise StorageError("Azure Blob client not available")
+        from azure.core.exceptions import AzureError
+        try:
+            blobs = self.container_client.list_blobs(
+                name_starts_with=prefix or None, timeout=self.timeout
+            )
+            return sorted(blob.name for blob in blobs)
+        except AzureError as e:
+            raise StorageError(str(e)) from e
+
+    def check(self) -> bool:
+        if not self.container_client:
+            return False
+        from azure.core.exceptions import AzureError
+        try:
+            # Une seule page d'un seul blob suffit (pas de parcours du conteneur)
+            pages = self.container_client.list_blobs(
+                results_per_page=1, timeout=self.timeout
+            ).by_page()
+            list(next(pages))
+            return True
+        except (AzureError, StopIteration):
+            return False
+
+
+class LocalStorage(StorageBackend):
+    """Fichiers d'un répertoire local (version = mtime et taille)"""
+
+    name = 'local'
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def stream(self, name: str, etag: Optional[str] = None):
+        filepath = os.path.join(self.root, name)
+        try:
+            f = open(filepath, 'rb')
+        except FileNotFoundError:
+            logger.error(f"Local file not found: {filepath}")
+            return NOT_FOUND
+        except OSError as e:
+            logger.error(f"Error reading local file {filepath}: {e}")
+            return None
+
+        stat = os.fstat(f.fileno())
+        version = f"{stat.st_mtime_ns}-{stat.st_size}"
+        if etag and etag == version:
+            f.close()
+            return NOT_MODIFIED
+        return StreamedContent(
+            ClosingChunks(self._chunks(f), f.close),
+            datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            version, stat.st_size
+        )
+
+    @staticmethod
+    def _chunks(f) -> Iterator[bytes]:
+        with f:
+            try:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+            except OSError as e:
+                raise StorageError(str(e)) from e
+
+    def list(self, prefix: str = '') -> List[str]:
+        names = []
+        try:
+            for directory, _, files in os.walk(self.root):
+                for filename in files:
+                    path = os.path.relpath(os.path.join(directory, filename), self.root)
+                    names.append(path.replace(os.sep, '/'))
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        return sorted(name for name in names if name.startswith(prefix))
+
+    def check(self) -> bool:
+        return os.path.isdir(self.root)
+
+
+class MemoryStorage(StorageBackend):
+    """Fichiers en mémoire (tests, benchmarks, contenu injecté)"""
+
+    name = 'memory'
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None):
+        self._files: Dict[str, Tuple[bytes, str, datetime]] = {}
+        self._lock = threading.Lock()
+        for name, content in (files or {}).items():
+            self.put(name, content)
+
+    def put(self, name: str, content, last_modified: Optional[datetime] = None) -> str:
+        """
+        Ajoute ou remplace un fichier.
+
+        Args:
+            name: Nom du fichier
+            content: Contenu (bytes ou str, encodé en UTF-8)
+            last_modified: Date de modification (maintenant par défaut)
+
+        Returns:
+            ETag de la nouvelle version
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        etag = f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+        with self._lock:
+            self._files[name] = (content, etag, last_modified or datetime.now(timezone.utc))
+        return etag
+
+    def delete(self, name: str):
+        with self._lock:
+            self._files.pop(name, None)
+
+    def stream(self, name: str, etag: Optional[str] = None):
+        entry = self._files.get(name)
+        if entry is None:
+            logger.error(f"File not found in memory storage: {name}")
+            return NOT_FOUND
+        content, current_etag, last_modified = entry
+        if etag and etag == current_etag:
+            return NOT_MODIFIED
+        chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+        return StreamedContent(chunks, last_modified, current_etag, len(content))
+
+    def list(self, prefix: str = '') -> List[str]:
+        return sorted(name for name in self._files if name.startswith(prefix))
+
+
+class HTTPStorage(StorageBackend):
+    """
+    Origine HTTP (CDN, Azure Static Website...) : GET conditionnel
+    (If-None-Match) sur `<base_url>/<name>`. Le listing n'est pas disponible.
+    """
+
+    name = 'http'
+    remote = True
+
+    def __init__(self, base_url: str, session: Optional['requests.Session'] = None,
+                 timeout: Tuple[float, float] = (5, 15)):
+        """
+        Args:
+            base_url: URL de base de l'origine
+            session: Session HTTP (pool de connexions) à utiliser
+            timeout: Délais (connexion, lecture) en secondes
+        """
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def stream(self, name: str, etag: Optional[str] = None):
+        import requests
+        url = f"{self.base_url}/{name}"
+        headers = {'If-None-Match': etag} if etag else {}
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            logger.error(f"Error reading {url}: {e}")
+            return None
+
+        if response.status_code == 304:
+            response.close()
+            return NOT_MODIFIED
+        if response.status_code in (404, 410):
+            logger.error(f"Not found: {url}")
+            response.close()
+            return NOT_FOUND
+        if response.status_code != 200:
+            logger.error(f"Error reading {url}: HTTP {response.status_code}")
+            response.close()
+            return None
+
+        last_modified = None
+        if response.headers.get('Last-Modified'):
+            try:
+                last_modified = parsedate_to_datetime(response.headers['Last-Modified'])
+            except (TypeError, ValueError):
+                pass
+        # Taille inconnue si la réponse est compressée (décompressée à la lecture)
+        size = None if response.headers.get('Content-Encoding') else response.headers.get('Content-Length')
+        return StreamedContent(
+            ClosingChunks(self._chunks(response), response.close),
+            last_modified, response.headers.get('ETag'),
+            int(size) if size and size.isdigit() else None
+        )
+
+    @staticmethod
+    def _chunks(response) -> Iterator[bytes]:
+        import requests
+        with response:
+            try:
+                yield from response.iter_content(CHUNK_SIZE)
+            except requests.RequestException as e:
+                raise StorageError(str(e)) from e
+
+    def list(self, prefix: str = '') -> List[str]:
+        raise StorageError("Listing is not supported by HTTP origins")
+
+    def check(self) -> bool:
+        import requests
+        try:
+            response = self.session.head(self.base_url + '/', timeout=self.timeout)
+            return response.status_code < 500
+        except requests.RequestException:
+            return False
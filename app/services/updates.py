@@ -0,0 +1,137 @@
+"""
+Diffusion des mises à jour de contenu aux clients connectés (Server-Sent Events)
+
+Les connexions attendent toutes sur une même Condition : une publication
+incrémente un numéro de séquence et réveille toutes les connexions, qui
+comparent alors les versions publiées aux versions déjà envoyées à leur
+client. Aucun travail n'est fait pour une connexion inactive hors des
+heartbeats.
+
+L'identifiant de chaque événement est le vecteur des versions envoyées
+(`events=1709251200123456,news=...`, versions du flux de changements, voir
+app/services/changes.py) : identiques dans tous les workers et tous les pods,
+elles permettent de reprendre un flux interrompu (Last-Event-ID) quel que
+soit le worker qui reçoit la reconnexion.
+"""
+import threading
+from typing import Dict, Optional
+
+from app.services.snapshot import encode_json
+
+# Délai de reconnexion conseillé aux clients (millisecondes)
+RETRY_MS = 3000
+
+
+class UpdateBroadcaster:
+    """Versions publiées par collection et réveil des connexions. Thread-safe."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.sequence = 0
+        self._versions: Dict[str, int] = {}
+
+    def publish(self, collection: str, version: int) -> bool:
+        """
+        Publie la version courante d'une collection.
+
+        Returns:
+            True si la version a changé (connexions réveillées)
+        """
+        with self._condition:
+            if self._versions.get(collection) == version:
+                return False
+            self._versions[collection] = version
+            self.sequence += 1
+            self._condition.notify_all()
+            return True
+
+    def versions(self) -> Dict[str, int]:
+        """Dernière version publiée de chaque collection"""
+        with self._condition:
+            return dict(self._versions)
+
+    def wait(self, sequence: int, timeout: float) -> int:
+        """
+        Attend une publication postérieure à `sequence`.
+
+        Returns:
+            Numéro de séquence courant (égal à `sequence` si le délai a expiré)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence != sequence, timeout)
+            return self.sequence
+
+
+class StreamSlots:
+    """
+    Nombre de flux ouverts simultanément dans le worker : avec des workers
+    gthread, chaque flux occupe un thread pendant toute sa durée ; au-delà de
+    la limite, les connexions sont refusées pour laisser des threads aux
+    autres requêtes (sondes comprises). Thread-safe.
+    """
+
+    def __init__(self, limit: int = 0):
+        """
+        Args:
+            limit: Nombre maximal de flux simultanés (0 = illimité)
+        """
+        self.limit = limit
+        self._lock = threading.Lock()
+        self.open = 0
+
+    def acquire(self) -> bool:
+        """Réserve un flux ; False si la limite est atteinte"""
+        with self._lock:
+            if self.limit and self.open >= self.limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        """Libère un flux réservé par acquire"""
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+
+
+def event_id(versions: Dict[str, int]) -> str:
+    """Identifiant d'événement : versions envoyées au client"""
+    return ','.join(f"{collection}={version}" for collection, version in sorted(versions.items()))
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Versions connues du client d'après son Last-Event-ID.
+
+    Returns:
+        Dict {collection: version}, ou None si l'identifiant est absent ou invalide
+    """
+    if not value:
+        return None
+    versions = {}
+    for part in value.split(','):
+        collection, _, version = part.partition('=')
+        try:
+            versions[collection.strip()] = int(version)
+        except ValueError:
+            return None
+    return versions
+
+
+def format_event(data: bytes, event: Optional[str] = None, id: Optional[str] = None) -> bytes:
+    """Sérialise un événement au format text/event-stream (`data` sur une ligne)"""
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}\n".encode('utf-8'))
+    if event is not None:
+        lines.append(f"event: {event}\n".encode('utf-8'))
+    lines.append(b"data: " + data + b"\n\n")
+    return b''.join(lines)
+
+
+def hello_event(versions: Dict[str, int]) -> bytes:
+    """Premier événement d'un flux sans Last-Event-ID : versions courantes"""
+    return format_event(encode_json({"versions": versions}), 'hello', event_id(versions))
+
+
+RETRY = f"retry: {RETRY_MS}\n\n".encode('ascii')
+HEARTBEAT = b": heartbeat\n\n"
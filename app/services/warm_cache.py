@@ -0,0 +1,61 @@
+"""
+Cache disque des derniers instantanés valides (démarrage à chaud)
+
+Chaque nouvel instantané est enregistré (corps pré-encodés, variantes
+compressées, ETags de la source) dans un fichier du répertoire configuré, par
+exemple un volume emptyDir. Au démarrage, ce fichier est relu en quelques
+millisecondes : le pod sert immédiatement la dernière version connue pendant
+que la source est revalidée en arrière-plan (requêtes conditionnelles).
+
+Le format est celui des instantanés partagés (voir shared_snapshot.py).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+from app.services.shared_snapshot import SNAPSHOT_FILE_ERRORS, read_snapshot_file, write_snapshot_file
+from app.services.snapshot import ContentSnapshot
+
+logger = logging.getLogger(__name__)
+
+WARM_CACHE_FILE = 'content.bin'
+
+
+class WarmCache:
+    """Derniers instantanés valides, persistés sur disque"""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, WARM_CACHE_FILE)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, ContentSnapshot]:
+        """
+        Relit les instantanés enregistrés.
+
+        Returns:
+            Instantanés par nom de fichier (vide si aucun ou fichier illisible)
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            _, snapshots = read_snapshot_file(memoryview(data))
+        except FileNotFoundError:
+            return {}
+        except SNAPSHOT_FILE_ERRORS as e:
+            logger.warning(f"Ignoring unreadable warm cache {self.path}: {e}")
+            return {}
+        logger.info("Warm cache loaded: %d files in %.1f ms",
+                    len(snapshots), (time.perf_counter() - start) * 1000)
+        return snapshots
+
+    def save(self, snapshots: Dict[str, ContentSnapshot]):
+        """Remplace atomiquement les instantanés enregistrés"""
+        with self._lock:
+            try:
+                write_snapshot_file(self.path, snapshots)
+            except OSError as e:
+                logger.warning(f"Cannot write warm cache {self.path}: {e}")
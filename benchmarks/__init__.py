@@ -0,0 +1,14 @@
+"""
+Benchmarks et tests de charge de l'API de contenu
+
+    python -m benchmarks                      # micro-benchmarks + charge, comparés à la référence
+    python -m benchmarks --quick              # version courte (CI, vérification rapide)
+    python -m benchmarks --save-baseline      # enregistre les résultats comme nouvelle référence
+    python -m benchmarks micro --filter parse # une seule suite, benchmarks filtrés par nom
+    python -m benchmarks startup              # temps de démarrage (import de app.main)
+
+Les résultats (p50 / p99, débit, mémoire, démarrage) sont comparés à
+benchmarks/baseline.json : le code de sortie vaut 1 si une mesure régresse
+au-delà de la tolérance, ou si le démarrage dépasse son budget absolu.
+Les références ne sont comparables que sur une même machine.
+"""
@@ -0,0 +1,129 @@
+"""
+Point d'entrée : python -m benchmarks [micro] [load] [startup] [options]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+# Avant l'import de l'application : pas de logs pendant les mesures
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('ACCESS_LOG', 'False')
+
+from benchmarks import load, micro, startup  # noqa: E402
+from benchmarks.stats import IncomparableRunsError, compare  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def print_micro(name, result):
+    print(f"  {name:<36} p50 {result['p50_us']:>11.2f} µs   p99 {result['p99_us']:>11.2f} µs   "
+          f"{result['ops_per_s']:>11.1f} op/s   {result['peak_memory_kib']:>9.1f} KiB", flush=True)
+
+
+def print_load(results):
+    for path, result in results.items():
+        if path == 'backend':
+            print(f"  {'backend':<36} {result['downloads']} downloads, {result['not_modified']} not modified")
+            continue
+        print(f"  {path:<36} p50 {result['p50_ms']:>8.2f} ms   p99 {result['p99_ms']:>8.2f} ms   "
+              f"{result['requests_per_s']:>9.1f} req/s   {result['errors']} errors")
+    total = results.get('total', {})
+    if 'rss_peak_kib' in total:
+        print(f"  {'RSS peak':<36} {total['rss_peak_kib'] / 1024:.1f} MiB")
+
+
+def print_startup(results):
+    for name, result in results.items():
+        print(f"  {name:<36} startup {result['startup_ms']:>8.1f} ms (budget {result['budget_ms']:g} ms)   "
+              f"import {result['import_ms']:>8.1f} ms   {result['modules']} modules")
+        for module, cumulative_ms in result['top']:
+            print(f"    {module:<34} {cumulative_ms:>8.1f} ms")
+
+
+SUITES = ('micro', 'load', 'startup')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('suites', nargs='*', metavar='{micro,load,startup}',
+                        help="Suites à exécuter (toutes par défaut)")
+    parser.add_argument('--quick', action='store_true', help="Tailles et durées réduites")
+    parser.add_argument('--filter', action='append', default=[],
+                        help="N'exécute que les micro-benchmarks dont le nom contient ce texte")
+    parser.add_argument('--duration', type=float, default=None, help="Durée de la charge (s)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Clients simultanés")
+    parser.add_argument('--latency', type=float, default=0.02, help="Latence simulée du blob (s)")
+    parser.add_argument('--url', help="Serveur à cibler au lieu de l'application locale")
+    parser.add_argument('--startup-budget', type=float, default=startup.BUDGET_MS,
+                        help="Budget du démarrage de l'application (ms)")
+    parser.add_argument('--baseline', default=BASELINE, help="Fichier de référence")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Dégradation tolérée (0.25 = 25 %%)")
+    parser.add_argument('--output', help="Écrit les résultats (JSON) dans ce fichier")
+    args = parser.parse_args(argv)
+    suites = args.suites or list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+            'quick': args.quick,
+        }
+    }
+    if 'micro' in suites:
+        print("Micro-benchmarks", flush=True)
+        results['micro'] = micro.run(quick=args.quick, only=args.filter, report=print_micro)
+    if 'load' in suites:
+        duration = args.duration or (3.0 if args.quick else 10.0)
+        print(f"Load ({args.concurrency} clients, {duration:g} s, blob latency {args.latency * 1000:g} ms)",
+              flush=True)
+        results['load'] = load.run(duration=duration, concurrency=args.concurrency,
+                                   latency=args.latency, url=args.url)
+        print_load(results['load'])
+    violations = []
+    if 'startup' in suites:
+        print("Startup (python -X importtime, fresh interpreter)", flush=True)
+        results['startup'] = startup.run(rounds=3 if args.quick else 5, budget_ms=args.startup_budget)
+        print_startup(results['startup'])
+        violations = startup.violations(results['startup'])
+        for message in violations:
+            print(f"  BUDGET {message}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 1 if violations else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (use --save-baseline)")
+        return 1 if violations else 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    try:
+        differences = compare(results, baseline, args.tolerance)
+    except IncomparableRunsError as e:
+        print(f"Not compared with baseline: {e} (run with the same options, or --save-baseline)")
+        return 2
+    regressions = [d for d in differences if d.regressed]
+    print(f"\nCompared with baseline of {baseline.get('meta', {}).get('date', '?')}: "
+          f"{len(differences)} measures, {len(regressions)} regressions")
+    for d in regressions:
+        print(f"  REGRESSION {d.suite} {d.name} {d.metric}: {d.baseline:g} -> {d.current:g} ({d.change:+.0%})")
+    return 1 if regressions or violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Documents de contenu synthétiques, de taille paramétrable, représentatifs
+des fichiers servis (événements, actualités, FAQ)
+"""
+import json
+from datetime import date, timedelta
+
+import yaml
+
+LOCATIONS = ('Paris', 'Lyon', 'Marseille', 'Lille', 'Nantes', 'Bordeaux')
+FIRST_DAY = date(2026, 1, 1)
+
+
+def make_items(count: int) -> list:
+    """`count` événements (≈ 250 octets chacun en JSON)"""
+    return [
+        {
+            "id": i,
+            "title": f"Événement {i} : conférence cloud",
+            "date": (FIRST_DAY + timedelta(days=i % 365)).isoformat(),
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "description": f"Présentation {i} sur Kubernetes, Azure et l'observabilité",
+            "tags": ["cloud", "azure"] if i % 2 else ["devops"],
+        }
+        for i in range(count)
+    ]
+
+
+def make_document(count: int) -> dict:
+    return {"updated": "2026-03-01", "items": make_items(count)}
+
+
+def json_document(count: int) -> str:
+    """Document JSON indenté, comme les fichiers édités à la main"""
+    return json.dumps(make_document(count), indent=2, ensure_ascii=False)
+
+
+def yaml_document(count: int) -> str:
+    return yaml.safe_dump(make_document(count), allow_unicode=True, sort_keys=False)
@@ -0,0 +1,218 @@
+"""
+Conteneur Azure Blob Storage simulé en mémoire
+
+Reproduit l'API du ContainerClient du SDK (download_blob conditionnel,
+chunks, list_blobs paginé, upload_blob, delete_blob) et ses exceptions,
+pour tester et mesurer le chemin Azure (BlobStorage) sans compte de stockage
+ni émulateur.
+
+Des pannes peuvent être injectées pour tester la résilience : échecs ou
+latence des prochains appels, ou taux d'erreur aléatoire.
+
+    container = FakeContainerClient(latency=0.02)
+    container.upload_blob('events.json', b'{"items": []}')
+    container.inject_latency(2.0)       # prochain appel ralenti de 2 s
+    container.inject_failures(3)        # trois appels suivants en erreur
+    storage = BlobStorage(container)
+"""
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    AzureError,
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError,
+    ServiceRequestError,
+)
+from azure.core.paging import ItemPaged
+from azure.storage.blob import BlobProperties
+
+# Taille des morceaux renvoyés par chunks() (comme max_chunk_get_size du SDK)
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class FakeDownloader:
+    """Équivalent de StorageStreamDownloader"""
+
+    def __init__(self, content: bytes, properties: BlobProperties, chunk_size: int,
+                 single_get_size: Optional[int] = None):
+        self._content = content
+        self._chunk_size = chunk_size
+        self._single_get_size = single_get_size or chunk_size
+        self.properties = properties
+        self.size = len(content)
+
+    def readall(self) -> bytes:
+        return self._content
+
+    def chunks(self):
+        # Comme le SDK : une première requête de max_single_get_size octets,
+        # puis des morceaux de max_chunk_get_size
+        first = self._content[:self._single_get_size]
+        if first:
+            yield first
+        for start in range(len(first), len(self._content), self._chunk_size):
+            yield self._content[start:start + self._chunk_size]
+
+
+class FakeBlobClient:
+    """Équivalent de BlobClient pour un blob du conteneur simulé"""
+
+    def __init__(self, container: 'FakeContainerClient', name: str):
+        self.container = container
+        self.blob_name = name
+
+    def download_blob(self, **kwargs) -> FakeDownloader:
+        return self.container._download(self.blob_name, **kwargs)
+
+    def upload_blob(self, data, overwrite: bool = False, **kwargs) -> dict:
+        return self.container.upload_blob(self.blob_name, data, overwrite=overwrite)
+
+    def get_blob_properties(self, **kwargs) -> BlobProperties:
+        return self.container._properties(self.blob_name)
+
+    def delete_blob(self, **kwargs):
+        self.container.delete_blob(self.blob_name)
+
+
+class FakeContainerClient:
+    """
+    Conteneur Azure en mémoire. Compte les appels, les téléchargements et
+    les revalidations (304) pour vérifier le comportement du cache.
+    """
+
+    def __init__(self, latency: float = 0.0, chunk_size: int = CHUNK_SIZE,
+                 error_rate: float = 0.0, seed: Optional[int] = None,
+                 single_get_size: Optional[int] = None):
+        """
+        Args:
+            latency: Délai simulé (secondes) de chaque appel au service
+            chunk_size: Taille des morceaux renvoyés par chunks()
+            single_get_size: Taille du premier morceau (max_single_get_size
+                du SDK, 32 Mio par défaut dans le SDK ; chunk_size si absent)
+            error_rate: Proportion d'appels échouant aléatoirement (0 à 1)
+            seed: Graine du tirage des échecs aléatoires
+        """
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.single_get_size = single_get_size
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._blobs: Dict[str, Tuple[bytes, BlobProperties]] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        # Pannes des prochains appels : (latence ajoutée, erreur levée ou None)
+        self._faults: Deque[Tuple[float, Optional[AzureError]]] = deque()
+        self.calls = 0
+        self.downloads = 0
+        self.not_modified = 0
+
+    def inject_failures(self, count: int = 1, error: Optional[AzureError] = None):
+        """
+        Fait échouer les `count` prochains appels au service.
+
+        Args:
+            count: Nombre d'appels en erreur
+            error: Exception levée (par défaut ServiceRequestError, comme une
+                connexion refusée)
+        """
+        error = error or ServiceRequestError("Injected failure")
+        with self._lock:
+            self._faults.extend([(0.0, error)] * count)
+
+    def inject_latency(self, seconds: float, count: int = 1):
+        """Ralentit les `count` prochains appels au service de `seconds` secondes"""
+        with self._lock:
+            self._faults.extend([(seconds, None)] * count)
+
+    def clear_faults(self):
+        """Annule les pannes injectées qui n'ont pas encore eu lieu"""
+        with self._lock:
+            self._faults.clear()
+        self.error_rate = 0.0
+
+    def get_blob_client(self, blob: str) -> FakeBlobClient:
+        return FakeBlobClient(self, blob)
+
+    def upload_blob(self, name: str, data, overwrite: bool = False, **kwargs) -> dict:
+        """Ajoute ou remplace un blob (bytes ou str)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        elif not isinstance(data, bytes):
+            data = data.read()
+        self._call()
+        with self._lock:
+            if name in self._blobs and not overwrite:
+                raise ResourceExistsError(message=f"Blob {name} already exists")
+            self._version += 1
+            properties = BlobProperties()
+            properties.name = name
+            properties.etag = f'"0x{self._version:X}"'
+            properties.last_modified = datetime.now(timezone.utc)
+            properties.size = len(data)
+            self._blobs[name] = (data, properties)
+        return {"etag": properties.etag, "last_modified": properties.last_modified}
+
+    def delete_blob(self, blob: str, **kwargs):
+        self._call()
+        with self._lock:
+            if self._blobs.pop(blob, None) is None:
+                raise ResourceNotFoundError(message=f"Blob {blob} not found")
+
+    def list_blobs(self, name_starts_with: Optional[str] = None,
+                   results_per_page: Optional[int] = None, **kwargs) -> ItemPaged:
+        """Liste paginée des blobs (une page par appel simulé)"""
+        with self._lock:
+            blobs = [properties for name, (_, properties) in sorted(self._blobs.items())
+                     if name.startswith(name_starts_with or '')]
+        page_size = results_per_page or 5000
+
+        def get_next(continuation_token):
+            self._call()
+            return int(continuation_token or 0)
+
+        def extract_data(start):
+            end = start + page_size
+            return (end if end < len(blobs) else None), iter(blobs[start:end])
+
+        return ItemPaged(get_next, extract_data)
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+            delay, error = self._faults.popleft() if self._faults else (0.0, None)
+            if error is None and self.error_rate and self._random.random() < self.error_rate:
+                error = ServiceRequestError("Injected random failure")
+        if self.latency + delay:
+            time.sleep(self.latency + delay)
+        if error is not None:
+            raise error
+
+    def _properties(self, name: str) -> BlobProperties:
+        self._call()
+        with self._lock:
+            if name not in self._blobs:
+                raise ResourceNotFoundError(message=f"Blob {name} not found")
+            return self._blobs[name][1]
+
+    def _download(self, name: str, etag: Optional[str] = None,
+                  match_condition: Optional[MatchConditions] = None, **kwargs) -> FakeDownloader:
+        self._call()
+        with self._lock:
+            if name not in self._blobs:
+                raise ResourceNotFoundError(message=f"Blob {name} not found")
+            content, properties = self._blobs[name]
+            if match_condition == MatchConditions.IfModified and etag == properties.etag:
+                self.not_modified += 1
+                raise ResourceNotModifiedError(message="Not modified")
+            if match_condition == MatchConditions.IfNotModified and etag != properties.etag:
+                raise ResourceModifiedError(message="Condition not met")
+            self.downloads += 1
+        return FakeDownloader(content, properties, self.chunk_size, self.single_get_size)
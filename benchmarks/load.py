@@ -0,0 +1,162 @@
+"""
+Générateur de charge local
+
+Démarre l'application dans un serveur WSGI multi-thread (keep-alive), servie
+par un conteneur Azure simulé et lent (FakeContainerClient), puis envoie des
+requêtes depuis `concurrency` clients pendant `duration` secondes sur
+/api/* et /readyz. Le TTL court force des revalidations pendant la mesure.
+
+Les clients partagent le processus (et le GIL) avec le serveur : les
+résultats servent à comparer deux versions du code sur une même machine, pas
+à dimensionner la production (utiliser --url contre gunicorn pour cela).
+"""
+import http.client
+import resource
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.services.content_service import ContentService
+from app.services.storage import BlobStorage
+from benchmarks import datasets
+from benchmarks.fake_blob import FakeContainerClient
+from benchmarks.stats import summarize_seconds
+
+PATHS = (
+    '/api/events',
+    '/api/news',
+    '/api/faq',
+    '/api/events?limit=10&sort=date',
+    '/api/search?q=kubernetes',
+    '/readyz',
+)
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _client(host: str, port: int, paths: Sequence[str], offset: int, deadline: float,
+            latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    """Envoie des requêtes en boucle sur une connexion keep-alive"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors[path] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies[path].append(time.perf_counter() - start)
+        if response.status >= 400 and path != '/readyz':
+            errors[path] += 1
+    connection.close()
+
+
+def generate_load(host: str, port: int, duration: float, concurrency: int,
+                  paths: Sequence[str] = PATHS) -> dict:
+    """
+    Envoie la charge et résume les latences par chemin et au total.
+
+    Returns:
+        Dict {chemin ou 'total': résumé (p50 / p99 en ms, débit, erreurs)}
+    """
+    per_client = [(defaultdict(list), defaultdict(int)) for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=_client, args=(host, port, paths, i, deadline, *per_client[i]),
+                         name=f'load-client-{i}', daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    for client_latencies, client_errors in per_client:
+        for path, values in client_latencies.items():
+            latencies[path].extend(values)
+        for path, count in client_errors.items():
+            errors[path] += count
+
+    results = {
+        path: {**summarize_seconds(latencies[path], elapsed), 'errors': errors[path]}
+        for path in paths
+    }
+    results['total'] = {
+        **summarize_seconds([value for values in latencies.values() for value in values], elapsed),
+        'errors': sum(errors.values()),
+        'rss_peak_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    return results
+
+
+def run(duration: float = 10.0, concurrency: int = 8, latency: float = 0.02,
+        cache_ttl: int = 1, items: int = 200, url: Optional[str] = None) -> dict:
+    """
+    Exécute le test de charge.
+
+    Args:
+        duration: Durée de la charge (secondes)
+        concurrency: Nombre de clients simultanés
+        latency: Latence simulée de chaque lecture de blob (secondes)
+        cache_ttl: CACHE_TTL du service pendant la charge (secondes)
+        items: Nombre d'éléments par fichier de contenu
+        url: Serveur déjà démarré à cibler (ex. gunicorn) ; sinon l'application
+            est démarrée dans ce processus avec le conteneur simulé
+
+    Returns:
+        Résultats par chemin, plus 'total' (et 'backend' en mode local)
+    """
+    if url:
+        target = urlsplit(url)
+        return generate_load(target.hostname, target.port or 80, duration, concurrency)
+
+    from app.config import get_config
+    from app.main import create_app
+
+    container = FakeContainerClient(latency=latency)
+    for filename in ('events.json', 'news.json', 'faq.json'):
+        container.upload_blob(filename, datasets.json_document(items).encode('utf-8'))
+    base = get_config()
+    config = {
+        **{name: getattr(base, name) for name in dir(base) if name.isupper()},
+        'CACHE_TTL': cache_ttl,
+        'SHARED_SNAPSHOT_DIR': '',
+        'WARM_CACHE_DIR': '',
+        'INVALIDATION_DIR': '',
+        'ACCESS_LOG': False,
+    }
+
+    service = ContentService(config, storage=BlobStorage(container))
+    server = make_server('127.0.0.1', 0, create_app(config, service), threaded=True,
+                         request_handler=KeepAliveHandler)
+    server_thread = threading.Thread(target=server.serve_forever, name='load-server', daemon=True)
+    server_thread.start()
+    try:
+        results = generate_load('127.0.0.1', server.server_port, duration, concurrency)
+    finally:
+        server.shutdown()
+        server_thread.join()
+        service.stop_refresher()
+
+    results['backend'] = {'downloads': container.downloads, 'not_modified': container.not_modified}
+    return results
@@ -0,0 +1,198 @@
+"""
+Micro-benchmarks des chemins critiques du service de contenu
+
+- get_content : lecture en cache (hit) et chargement complet (miss : lecture
+  de la source, ingestion, pré-encodage et compression, parsing)
+- parsing à plusieurs tailles : ingestion en flux pour JSON (ingest_json,
+  comme au chargement), _parse_content pour YAML
+- sérialisation JSON des réponses (encode_json, et json.dumps en comparaison)
+- envoi d'un corps partagé (vue mmap) : par morceaux, et copie complète en
+  comparaison (pic mémoire par requête)
+"""
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, Optional
+
+from app.services.content_service import ContentService
+from app.services.ingest import ingest_json
+from app.services.shared_snapshot import SharedSnapshotStore
+from app.services.snapshot import ContentSnapshot, body_chunks, encode_json
+from app.services.storage import CHUNK_SIZE, MemoryStorage
+from benchmarks import datasets
+from benchmarks.stats import summarize_ns
+
+SIZES = {
+    'json': (10, 1000, 10000),
+    'yaml': (10, 100, 1000),
+    'miss': (100, 1000),
+    'serialize': (10, 1000, 10000),
+    'shared_body': (10000,),
+}
+QUICK_SIZES = {
+    'json': (10, 1000),
+    'yaml': (10, 100),
+    'miss': (100,),
+    'serialize': (10, 1000),
+    'shared_body': (10000,),
+}
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.5, rounds: int = 3,
+            max_samples: int = 100_000, min_samples: int = 5,
+            setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Mesure la durée de chaque appel de `fn` pendant au moins `min_time`
+    secondes, répartie en `rounds` séries dont seule la plus rapide (p50) est
+    retenue (comme timeit : les séries ralenties par d'autres processus sont
+    écartées), puis la mémoire allouée au pic d'un appel (tracemalloc).
+
+    Args:
+        fn: Fonction mesurée (sans argument)
+        min_time: Durée minimale de mesure (secondes)
+        rounds: Nombre de séries
+        max_samples: Nombre maximal d'appels mesurés par série
+        min_samples: Nombre minimal d'appels mesurés par série
+        setup: Appelée avant chaque appel, hors mesure
+
+    Returns:
+        Résumé (p50 / p99 en µs, opérations par seconde, pic mémoire en KiB)
+    """
+    # Échauffement (imports paresseux, caches internes)
+    if setup:
+        setup()
+    fn()
+
+    best = None
+    for _ in range(rounds):
+        samples = []
+        deadline = time.perf_counter() + min_time / rounds
+        while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() < deadline):
+            if setup:
+                setup()
+            start = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - start)
+        summary = summarize_ns(samples)
+        if best is None or summary['p50_us'] < best['p50_us']:
+            best = summary
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {**best, 'peak_memory_kib': round(peak / 1024, 1)}
+
+
+def make_service(items: int) -> ContentService:
+    storage = MemoryStorage({
+        'events.json': datasets.json_document(items),
+        'events.yaml': datasets.yaml_document(items),
+    })
+    return ContentService({'CACHE_TTL': 3600}, storage=storage)
+
+
+def shared_body(items: int, directory: str) -> memoryview:
+    """Corps d'un instantané publié puis relu par mmap, comme dans un worker lecteur"""
+    store = SharedSnapshotStore(directory, poll_interval=0)
+    store.try_acquire_writer()
+    store.publish({'events.json': ContentSnapshot.from_body(
+        'events.json', encode_json(datasets.make_document(items)), compress_min_size=0
+    )})
+    return SharedSnapshotStore(directory, poll_interval=0).get('events.json').body
+
+
+def benchmarks(quick: bool = False) -> Dict[str, Callable[[], dict]]:
+    """Benchmarks disponibles, par nom (construits à la demande)"""
+    sizes = QUICK_SIZES if quick else SIZES
+    min_time = 0.3 if quick else 1.0
+    suite = {}
+
+    def get_content_hit():
+        service = make_service(100)
+        service.get_content('events.json')
+        return measure(lambda: service.get_content('events.json'), min_time)
+
+    suite['get_content.hit'] = get_content_hit
+
+    for items in sizes['miss']:
+        def get_content_miss(items=items):
+            service = make_service(items)
+            return measure(lambda: service.get_content('events.json'), min_time,
+                           setup=service.clear_cache)
+
+        suite[f'get_content.miss[{items}]'] = get_content_miss
+
+    for items in sizes['json']:
+        def parse_json(items=items):
+            # Morceaux de la taille lue depuis la source
+            content = datasets.json_document(items).encode('utf-8')
+            chunks = [content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE)]
+            return measure(lambda: ingest_json(iter(chunks)), min_time)
+
+        suite[f'parse.json[{items}]'] = parse_json
+
+    for items in sizes['yaml']:
+        def parse_yaml(items=items):
+            service = make_service(0)
+            content = datasets.yaml_document(items)
+            return measure(lambda: service._parse_content(content, 'events.yaml'), min_time)
+
+        suite[f'parse.yaml[{items}]'] = parse_yaml
+
+    for items in sizes['serialize']:
+        def serialize(items=items):
+            data = datasets.make_document(items)
+            return measure(lambda: encode_json(data), min_time)
+
+        def serialize_stdlib(items=items):
+            data = datasets.make_document(items)
+            return measure(lambda: json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                           min_time)
+
+        suite[f'serialize.encode_json[{items}]'] = serialize
+        suite[f'serialize.json_dumps[{items}]'] = serialize_stdlib
+
+    for items in sizes['shared_body']:
+        def send_chunks(items=items):
+            with tempfile.TemporaryDirectory() as directory:
+                body = shared_body(items, os.path.join(directory, 'shared'))
+                return measure(lambda: sum(len(chunk) for chunk in body_chunks(body)), min_time)
+
+        def send_copy(items=items):
+            with tempfile.TemporaryDirectory() as directory:
+                body = shared_body(items, os.path.join(directory, 'shared'))
+                return measure(lambda: len(bytes(body)), min_time)
+
+        suite[f'response.shared_body.chunks[{items}]'] = send_chunks
+        suite[f'response.shared_body.copy[{items}]'] = send_copy
+
+    return suite
+
+
+def run(quick: bool = False, only: Iterable[str] = (), report=print) -> dict:
+    """
+    Exécute les micro-benchmarks.
+
+    Args:
+        quick: Tailles et durées réduites
+        only: Sous-chaînes de noms à exécuter (tous par défaut)
+        report: Appelée avec le nom et le résultat de chaque benchmark
+
+    Returns:
+        Dict {benchmark: résultat}
+    """
+    only = list(only)
+    results = {}
+    for name, bench in benchmarks(quick).items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = bench()
+        report(name, results[name])
+    return results
@@ -0,0 +1,144 @@
+"""
+Temps de démarrage : import de app.main et création de l'application
+
+Chaque mesure lance un interpréteur neuf (aucun module déjà importé) :
+- durée de `from app.main import create_app; create_app()`, moins celle d'un
+  interpréteur vide (meilleure de `rounds` exécutions)
+- rapport `python -X importtime` : durée d'import de app.main et modules les
+  plus coûteux (temps cumulé)
+- modules chargés à la demande (SDK Azure, PyYAML, dotenv, requests) qui ne
+  doivent pas être importés au démarrage avec une source locale
+
+Le budget est absolu : il est vérifié même sans référence enregistrée.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENT = 'from app.main import create_app; create_app()'
+# Modules importés seulement quand une source Azure / HTTP ou un fichier YAML est utilisé
+LAZY_MODULES = ('azure', 'yaml', 'dotenv', 'requests')
+# Budget du démarrage (import + create_app), en millisecondes
+BUDGET_MS = 350
+
+# Ligne de -X importtime : "import time: <self µs> | <cumulé µs> | <indentation><module>"
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    # Profondeur dans l'arbre des imports (0 = importé directement)
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """Lignes de -X importtime (stderr), dans l'ordre de fin d'import"""
+    imports = []
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(ImportTime(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return imports
+
+
+def direct_imports(imports: List[ImportTime], module: str) -> List[ImportTime]:
+    """Modules importés directement par `module` (listés juste avant lui)"""
+    for position, entry in enumerate(imports):
+        if entry.module == module:
+            children = []
+            for child in reversed(imports[:position]):
+                if child.depth <= entry.depth:
+                    break
+                if child.depth == entry.depth + 1:
+                    children.append(child)
+            return children
+    return []
+
+
+def _environment() -> dict:
+    """Configuration de test, source locale, sans logs ni mode multi-processus"""
+    env = {
+        name: value for name, value in os.environ.items()
+        if name not in ('PROMETHEUS_MULTIPROC_DIR', 'SHARED_SNAPSHOT_DIR', 'CONTENT_REFRESH_INTERVAL',
+                        'STORAGE_BACKEND', 'PYTHONPROFILEIMPORTTIME')
+    }
+    env.update(FLASK_ENV='testing', USE_LOCAL_FILES='True', LOCAL_DATA_PATH='tests/data',
+               LOG_LEVEL='WARNING')
+    return env
+
+
+def _python(statement: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, '-c', statement], cwd=ROOT, env=_environment(),
+        capture_output=True, text=True, check=True
+    )
+
+
+def _wall_ms(statement: str, rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _python(statement)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def run(rounds: int = 5, top: int = 10, budget_ms: Optional[float] = None) -> dict:
+    """
+    Mesure le démarrage de l'application.
+
+    Args:
+        rounds: Exécutions par mesure de durée (la meilleure est retenue)
+        top: Nombre de modules les plus coûteux rapportés
+        budget_ms: Budget du démarrage (BUDGET_MS par défaut)
+
+    Returns:
+        {'app.main': {startup_ms, import_ms, modules, budget_ms, lazy_imported, top}}
+    """
+    # Premier lancement : fichiers .pyc compilés, hors mesure
+    _python(STATEMENT)
+    startup_ms = _wall_ms(STATEMENT, rounds) - _wall_ms('pass', rounds)
+
+    check = 'import sys; print(",".join(sorted(sys.modules)))'
+    process = _python(f'{STATEMENT}; {check}', '-X', 'importtime')
+    imports = parse_importtime(process.stderr)
+    loaded = process.stdout.strip().split(',')
+    lazy_imported = sorted({
+        name for name in LAZY_MODULES
+        if any(module == name or module.startswith(name + '.') for module in loaded)
+    })
+    main_import = next((entry for entry in imports if entry.module == 'app.main'), None)
+    costliest = sorted(direct_imports(imports, 'app.main'),
+                       key=lambda entry: entry.cumulative_us, reverse=True)[:top]
+
+    return {
+        'app.main': {
+            'startup_ms': round(max(startup_ms, 0.0), 1),
+            'import_ms': round(main_import.cumulative_us / 1000, 1) if main_import else 0.0,
+            'modules': len(imports),
+            'budget_ms': budget_ms or BUDGET_MS,
+            'lazy_imported': lazy_imported,
+            'top': [[entry.module, round(entry.cumulative_us / 1000, 1)] for entry in costliest],
+        }
+    }
+
+
+def violations(results: dict) -> List[str]:
+    """Dépassements du budget et modules importés à tort au démarrage"""
+    messages = []
+    for name, result in results.items():
+        if result['startup_ms'] > result['budget_ms']:
+            messages.append(f"{name} startup {result['startup_ms']:g} ms exceeds the "
+                            f"{result['budget_ms']:g} ms budget")
+        if result['lazy_imported']:
+            messages.append(f"{name} imports {', '.join(result['lazy_imported'])} at startup")
+    return messages
@@ -0,0 +1,110 @@
+"""
+Statistiques des mesures et comparaison avec une référence
+"""
+import math
+from typing import Dict, List, NamedTuple, Sequence
+
+# Sens de chaque mesure comparée : True si une valeur plus basse est meilleure
+METRICS = {
+    'p50_us': True,
+    'p99_us': True,
+    'ops_per_s': False,
+    'peak_memory_kib': True,
+    'p50_ms': True,
+    'p99_ms': True,
+    'requests_per_s': False,
+    'rss_peak_kib': True,
+    'startup_ms': True,
+    'import_ms': True,
+}
+# Mesures bruitées : tolérance doublée
+NOISY = {'p99_us', 'p99_ms'}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Percentile par rang le plus proche (valeurs déjà triées)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_ns(samples: List[int]) -> dict:
+    """Résumé de durées en nanosecondes, en microsecondes"""
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        'samples': len(samples),
+        'p50_us': round(percentile(samples, 50) / 1000, 3),
+        'p99_us': round(percentile(samples, 99) / 1000, 3),
+        'ops_per_s': round(len(samples) / (total / 1e9), 1) if total else 0.0,
+    }
+
+
+def summarize_seconds(samples: List[float], elapsed: float) -> dict:
+    """Résumé de latences de requêtes (secondes), en millisecondes"""
+    samples = sorted(samples)
+    return {
+        'requests': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'requests_per_s': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+class IncomparableRunsError(ValueError):
+    """Exécution et référence mesurées dans des modes différents (--quick ou non)"""
+
+
+class Difference(NamedTuple):
+    suite: str
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float      # variation relative (+0.10 = +10 %)
+    regressed: bool
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> List[Difference]:
+    """
+    Compare deux séries de résultats ({suite: {benchmark: {mesure: valeur}}}).
+    Seuls les benchmarks et mesures présents des deux côtés sont comparés.
+    Une exécution rapide (--quick : durées plus courtes, autres tailles) n'est
+    comparable qu'à une référence rapide, et inversement.
+
+    Args:
+        current: Résultats de l'exécution
+        baseline: Résultats de référence
+        tolerance: Dégradation relative tolérée (0.25 = 25 %)
+
+    Returns:
+        Liste des différences, régressions signalées
+
+    Raises:
+        IncomparableRunsError: si une seule des deux exécutions est rapide
+    """
+    quick = bool(current.get('meta', {}).get('quick'))
+    if quick != bool(baseline.get('meta', {}).get('quick')):
+        raise IncomparableRunsError(
+            f"cannot compare a {'quick' if quick else 'full'} run with a "
+            f"{'full' if quick else 'quick'} baseline"
+        )
+    differences = []
+    for suite, results in current.items():
+        reference: Dict[str, dict] = baseline.get(suite)
+        if not isinstance(results, dict) or not isinstance(reference, dict):
+            continue
+        for name, measures in results.items():
+            base_measures = reference.get(name)
+            if not isinstance(base_measures, dict):
+                continue
+            for metric, lower_is_better in METRICS.items():
+                base, value = base_measures.get(metric), measures.get(metric)
+                if not base or value is None:
+                    continue
+                change = (value - base) / base
+                allowed = tolerance * (2 if metric in NOISY else 1)
+                regressed = change > allowed if lower_is_better else change < -allowed
+                differences.append(Difference(suite, name, metric, base, value, change, regressed))
+    return differences
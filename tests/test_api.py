@@ -126,3 +126,176 @@ class TestIndexPage:
         """Vérifie que / retourne du HTML"""
         response = client.get('/')
         assert 'text/html' in response.content_type
+
+    def test_news_are_rendered_on_the_server(self, client):
+        """Vérifie que les news sont dans la page (sans appel à l'API)"""
+        from app.main import content_service
+        news = content_service.get_content(content_service.filename_for('news'))
+        html = client.get('/').get_data(as_text=True)
+        assert news['items'][0]['title'] in html
+        assert "fetch('/api/news')" not in html
+
+    def test_if_none_match_returns_304(self, client):
+        """Vérifie que la page en cache du client est revalidée par ETag"""
+        etag = client.get('/').headers['ETag']
+        assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_page_is_rendered_once_per_news_version(self, client, app, monkeypatch):
+        """Vérifie que la page n'est rendue à nouveau que si les news changent"""
+        from app import main
+        from app.services.snapshot import ContentSnapshot
+
+        renders = []
+        template = main.INDEX_TEMPLATE
+
+        class CountingTemplate:
+            def render(self, **context):
+                renders.append(context)
+                return template.render(**context)
+
+        monkeypatch.setattr(main, 'INDEX_TEMPLATE', CountingTemplate())
+        monkeypatch.delitem(app.extensions, 'index_page', raising=False)
+
+        first = client.get('/')
+        client.get('/')
+        assert len(renders) == 1
+
+        news = ContentSnapshot.build('news.json', {"items": [{"title": "<Nouvelle> news", "content": "x"}]})
+        monkeypatch.setattr(main.content_service, 'lookup', lambda filename: (news, 'hit'))
+        second = client.get('/')
+        assert len(renders) == 2
+        assert second.headers['ETag'] != first.headers['ETag']
+        assert '&lt;Nouvelle&gt; news' in second.get_data(as_text=True)
+
+    def test_page_does_not_compute_readiness(self, client, app, monkeypatch):
+        """Vérifie que la page lit l'état de connexion mémorisé sans calculer la readiness"""
+        service = app.extensions['content_service']
+        monkeypatch.setattr(service, 'readiness', None)  # tout appel échouerait
+        assert client.get('/').status_code == 200
+
+    def test_rendered_page_is_kept_per_application(self, app):
+        """Vérifie que deux applications ne partagent pas leur dernière page rendue"""
+        from app.main import create_app
+
+        other = create_app({'ACCESS_LOG': False}, content_service=app.extensions['content_service'])
+        app.test_client().get('/')
+        assert 'index_page' not in other.extensions
+
+
+class TestConditionalRequests:
+    """Tests des ETag / If-None-Match sur les endpoints de contenu"""
+
+    def test_content_has_etag_and_last_modified(self, client):
+        """Vérifie la présence des en-têtes de validation"""
+        response = client.get('/api/events')
+        assert response.headers.get('ETag')
+        assert response.headers.get('Last-Modified')
+
+    def test_if_none_match_returns_304(self, client):
+        """Vérifie qu'un ETag connu donne 304 sans corps"""
+        etag = client.get('/api/news').headers['ETag']
+        response = client.get('/api/news', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_stale_etag_returns_200(self, client):
+        """Vérifie qu'un ETag différent renvoie le contenu complet"""
+        response = client.get('/api/faq', headers={'If-None-Match': '"outdated"'})
+        assert response.status_code == 200
+        assert json.loads(response.data)['items']
+
+
+class TestCompression:
+    """Tests de la négociation Accept-Encoding"""
+
+    def test_gzip_variant_is_served(self, client, app):
+        """Vérifie que la variante gzip pré-compressée est servie si acceptée"""
+        import gzip
+
+        app.config['COMPRESSION_MIN_SIZE'] = 0
+        from app.main import content_service
+        content_service.clear_cache()
+        try:
+            response = client.get('/api/events', headers={'Accept-Encoding': 'gzip'})
+        finally:
+            app.config.pop('COMPRESSION_MIN_SIZE')
+            content_service.clear_cache()
+
+        assert response.headers.get('Content-Encoding') == 'gzip'
+        assert 'Accept-Encoding' in response.headers.get('Vary', '')
+        data = json.loads(gzip.decompress(response.data))
+        assert 'items' in data
+
+    def test_identity_without_accept_encoding(self, client):
+        """Vérifie qu'aucun encodage n'est appliqué sans Accept-Encoding"""
+        response = client.get('/api/events')
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers.get('Vary', '')
+
+
+class TestQueryParameters:
+    """Tests de la pagination / filtrage sur les endpoints de contenu"""
+
+    def test_limit_and_fields(self, client):
+        """Vérifie la pagination et la projection via la query string"""
+        response = client.get('/api/events?limit=1&fields=id,title')
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data['items'] == [{"id": 1, "title": "Test Event"}]
+        assert data['total'] == 1
+        assert data['next_cursor'] is None
+
+    def test_filter_without_match(self, client):
+        """Vérifie un filtre sans résultat"""
+        data = json.loads(client.get('/api/events?location=Nowhere').data)
+        assert data['items'] == []
+
+    def test_cache_buster_serves_the_full_collection(self, client):
+        """Vérifie que les paramètres inconnus ou vides sont ignorés (?_=123, ?limit=)"""
+        full = client.get('/api/events')
+        for url in ('/api/events?_=123', '/api/events?limit='):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.data == full.data
+            assert response.headers['ETag'] == full.headers['ETag']
+
+    def test_invalid_parameter_returns_400(self, client):
+        """Vérifie qu'un paramètre invalide retourne HTTP 400"""
+        response = client.get('/api/news?limit=-1')
+        assert response.status_code == 400
+        assert 'error' in json.loads(response.data)
+
+
+class TestSearch:
+    """Tests de l'endpoint /api/search"""
+
+    def test_search_finds_items(self, client):
+        """Vérifie que la recherche retourne les items correspondants"""
+        response = client.get('/api/search?q=test')
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data['total'] == 3
+        assert {r['collection'] for r in data['results']} == {'events', 'news', 'faq'}
+
+    def test_search_requires_query(self, client):
+        """Vérifie que q est obligatoire"""
+        assert client.get('/api/search').status_code == 400
+
+    def test_search_rejects_unknown_collection(self, client):
+        """Vérifie qu'une collection inconnue est refusée"""
+        assert client.get('/api/search?q=test&collection=unknown').status_code == 400
+
+
+class TestRequestId:
+    """Tests de l'identifiant de requête"""
+
+    def test_request_id_is_echoed(self, client):
+        """Vérifie que X-Request-ID fourni par le client est renvoyé"""
+        response = client.get('/api/events', headers={'X-Request-ID': 'req-42'})
+        assert response.headers['X-Request-ID'] == 'req-42'
+
+    def test_request_id_is_generated(self, client):
+        """Vérifie qu'un identifiant est généré sinon"""
+        assert client.get('/healthz').headers.get('X-Request-ID')
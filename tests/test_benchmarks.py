@@ -0,0 +1,77 @@
+"""
+Tests de la suite de benchmarks (statistiques, comparaison à la référence,
+exécution courte du générateur de charge, rapport de démarrage)
+"""
+import pytest
+
+from benchmarks import load
+from benchmarks.micro import measure
+from benchmarks.startup import direct_imports, parse_importtime, violations
+from benchmarks.stats import IncomparableRunsError, compare, percentile
+
+
+class TestStats:
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) == 0.0
+
+    def test_compare_flags_regressions_only(self):
+        baseline = {"micro": {"a": {"p50_us": 10, "ops_per_s": 1000}, "b": {"p50_us": 10}}}
+        current = {
+            "meta": {"date": "2026-03-01"},
+            "micro": {"a": {"p50_us": 11, "ops_per_s": 600}, "b": {"p50_us": 5}, "new": {"p50_us": 1}},
+        }
+        regressions = {(d.name, d.metric) for d in compare(current, baseline, 0.25) if d.regressed}
+        assert regressions == {("a", "ops_per_s")}
+
+    def test_quick_run_is_not_compared_with_full_baseline(self):
+        baseline = {"meta": {"quick": False}, "micro": {"a": {"p50_us": 10}}}
+        with pytest.raises(IncomparableRunsError):
+            compare({"meta": {"quick": True}, "micro": {"a": {"p50_us": 10}}}, baseline)
+        assert compare({"meta": {"quick": False}, "micro": {"a": {"p50_us": 10}}}, baseline)
+
+    def test_p99_has_a_wider_tolerance(self):
+        baseline = {"load": {"total": {"p99_ms": 10}}}
+        assert not compare({"load": {"total": {"p99_ms": 14}}}, baseline, 0.25)[0].regressed
+        assert compare({"load": {"total": {"p99_ms": 16}}}, baseline, 0.25)[0].regressed
+
+
+class TestRunners:
+
+    def test_measure(self):
+        result = measure(lambda: sum(range(100)), min_time=0.01)
+        assert result['samples'] >= 5
+        assert 0 < result['p50_us'] <= result['p99_us']
+        assert result['peak_memory_kib'] >= 0
+
+    def test_load_against_fake_backend(self):
+        results = load.run(duration=0.3, concurrency=2, latency=0.001, items=10)
+        assert results['total']['requests'] > 0
+        assert results['total']['errors'] == 0
+        assert results['backend']['downloads'] >= 3
+
+
+class TestStartupReport:
+
+    IMPORTTIME = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |     werkzeug.utils\n"
+        "import time:       500 |        600 |   flask\n"
+        "import time:       200 |        200 |   app.config\n"
+        "import time:       300 |       1100 | app.main\n"
+    )
+
+    def test_parse_importtime(self):
+        imports = parse_importtime(self.IMPORTTIME)
+        assert [(entry.module, entry.depth) for entry in imports] == [
+            ('werkzeug.utils', 2), ('flask', 1), ('app.config', 1), ('app.main', 0)
+        ]
+        assert [entry.module for entry in direct_imports(imports, 'app.main')] == ['app.config', 'flask']
+
+    def test_violations(self):
+        result = {'startup_ms': 120.0, 'budget_ms': 100, 'lazy_imported': ['azure']}
+        assert len(violations({'app.main': result})) == 2
+        assert violations({'app.main': {**result, 'startup_ms': 80.0, 'lazy_imported': []}}) == []
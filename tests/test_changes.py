@@ -0,0 +1,176 @@
+"""
+Tests du flux de changements incrémental (/api/<collection>/changes)
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.changes import VERSION_HASH_RANGE, ChangeFeed, snapshot_version
+from app.services.content_service import ContentService
+from app.services.snapshot import ContentSnapshot
+from app.services.storage import MemoryStorage
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def make_snapshot(items, minute=0):
+    return ContentSnapshot.build('events.json', {"items": items}, START + timedelta(minutes=minute))
+
+
+def item(item_id, title='Titre'):
+    return {"id": item_id, "title": title}
+
+
+class TestChangeFeed:
+
+    def test_first_request_is_full(self):
+        snapshot = make_snapshot([item(1)])
+        changes = ChangeFeed().changes_since(snapshot)
+        assert changes == {"version": snapshot_version(snapshot), "full": True, "items": [item(1)]}
+
+    def test_delta_since_previous_version(self):
+        feed = ChangeFeed()
+        first = make_snapshot([item(1), item(2), item(3)])
+        feed.update(first)
+        second = make_snapshot([item(1), item(2, 'Modifié'), item(4)], minute=1)
+
+        changes = feed.changes_since(second, snapshot_version(first))
+        assert changes == {
+            "version": snapshot_version(second), "since": snapshot_version(first), "full": False,
+            "added": [item(4)], "updated": [item(2, 'Modifié')], "removed": [3],
+        }
+
+    def test_steady_state_delta_is_empty(self):
+        feed = ChangeFeed()
+        snapshot = make_snapshot([item(1)])
+        version = feed.changes_since(snapshot)["version"]
+        changes = feed.changes_since(snapshot, version)
+        assert changes["full"] is False
+        assert changes["added"] == changes["updated"] == changes["removed"] == []
+
+    def test_net_effect_over_several_versions(self):
+        feed = ChangeFeed()
+        base = make_snapshot([item(1), item(2)])
+        feed.update(base)
+        feed.update(make_snapshot([item(1), item(2), item(3)], minute=1))        # 3 ajouté
+        feed.update(make_snapshot([item(1, 'v2'), item(2), item(3, 'v2')], minute=2))
+        latest = make_snapshot([item(1, 'v2'), item(3, 'v2')], minute=3)      # 2 supprimé
+
+        changes = feed.changes_since(latest, snapshot_version(base))
+        assert changes["added"] == [item(3, 'v2')]
+        assert changes["updated"] == [item(1, 'v2')]
+        assert changes["removed"] == [2]
+
+    def test_trimmed_history_falls_back_to_full(self):
+        feed = ChangeFeed(max_versions=2)
+        versions = []
+        for minute in range(4):
+            snapshot = make_snapshot([item(1, f"v{minute}")], minute=minute)
+            feed.update(snapshot)
+            versions.append(snapshot_version(snapshot))
+
+        assert feed.changes_since(snapshot, versions[0])["full"] is True
+        assert feed.changes_since(snapshot, versions[1])["updated"] == [item(1, 'v3')]
+        assert feed.changes_since(snapshot, versions[3] + 1)["full"] is True
+
+    def test_items_without_unique_id_are_always_full(self):
+        feed = ChangeFeed()
+        snapshot = make_snapshot([{"title": "sans id"}, item(1), item(1)])
+        version = feed.changes_since(snapshot)["version"]
+        assert feed.changes_since(snapshot, version)["full"] is True
+
+    def test_same_timestamp_versions_do_not_depend_on_history(self):
+        """Vérifie que deux workers attribuent la même version à un contenu de même date"""
+        first, second = make_snapshot([item(1)]), make_snapshot([item(1, 'v2')])
+        seen_both, seen_second = ChangeFeed(), ChangeFeed()
+        seen_both.update(first)
+        seen_both.update(second)
+        seen_second.update(second)
+
+        assert seen_both.version == seen_second.version == snapshot_version(second)
+        assert snapshot_version(first) != snapshot_version(second)
+        # Versions de même date non ordonnées : pas de delta depuis la précédente
+        assert seen_both.changes_since(second, snapshot_version(first))["full"] is True
+
+    def test_version_not_seen_by_this_feed_is_full(self):
+        """Vérifie qu'une version enregistrée par un autre pod donne la collection complète"""
+        v1 = make_snapshot([item(1), item(2)])
+        v2 = make_snapshot([item(1, 'v2')], minute=1)                    # 2 supprimé
+        v3 = make_snapshot([item(1), item(2)], minute=2)                 # 1 rétabli, 2 réajouté
+        pod_a, pod_b = ChangeFeed(), ChangeFeed()
+        for snapshot in (v1, v2, v3):
+            pod_a.update(snapshot)
+        pod_b.update(v1)
+        pod_b.update(v3)
+
+        assert pod_a.changes_since(v3, snapshot_version(v2))["full"] is False
+        changes = pod_b.changes_since(v3, snapshot_version(v2))
+        assert changes["full"] is True and changes["items"] == [item(1), item(2)]
+        # Version inconnue comprise entre deux versions enregistrées
+        assert pod_a.changes_since(v3, snapshot_version(v1) + 1)["full"] is True
+
+    def test_reverted_content_gets_a_new_version(self):
+        """Vérifie qu'un retour à un ETag antérieur donne la même version dans tous les pods"""
+        v1 = make_snapshot([item(1)])
+        v2 = make_snapshot([item(1, 'v2')], minute=1)
+        v3 = make_snapshot([item(1)], minute=2)
+        assert v3.etag == v1.etag
+        pod_a, pod_b = ChangeFeed(), ChangeFeed()
+        for snapshot in (v1, v2, v3):
+            pod_a.update(snapshot)
+        pod_b.update(v1)
+        pod_b.update(v3)
+
+        assert pod_a.version == pod_b.version == snapshot_version(v3)
+        changes = pod_b.changes_since(v3, snapshot_version(v1))
+        assert changes["full"] is False and changes["updated"] == []
+
+    def test_older_snapshot_is_not_recorded(self):
+        """Vérifie qu'un instantané lu avant un rechargement ne revient pas en arrière"""
+        feed = ChangeFeed()
+        old, new = make_snapshot([item(1)]), make_snapshot([item(1, 'v2')], minute=1)
+        feed.update(new)
+        changes = feed.changes_since(old, snapshot_version(old))
+        assert changes == {"version": snapshot_version(old), "full": True, "items": [item(1)]}
+        assert feed.version == snapshot_version(new)
+
+
+class TestChangesEndpoint:
+    """Tests de /api/<collection>/changes"""
+
+    def test_full_then_empty_delta(self, client):
+        full = client.get('/api/events/changes').get_json()
+        assert full["full"] is True and full["items"]
+
+        delta = client.get(f"/api/events/changes?since={full['version']}").get_json()
+        assert delta["full"] is False
+        assert delta["added"] == delta["updated"] == delta["removed"] == []
+
+    def test_conditional_request(self, client):
+        etag = client.get('/api/news/changes?since=0').headers['ETag']
+        assert client.get('/api/news/changes?since=0', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_unknown_collection_returns_404(self, client):
+        assert client.get('/api/unknown/changes').status_code == 404
+
+    def test_invalid_since_returns_400(self, client):
+        assert client.get('/api/events/changes?since=yesterday').status_code == 400
+
+
+class TestServiceChanges:
+
+    @pytest.fixture
+    def storage(self):
+        storage = MemoryStorage()
+        storage.put('events.json', '{"items": [{"id": 1, "title": "a"}]}', START)
+        return storage
+
+    def test_delta_after_reload(self, storage):
+        service = ContentService({'CACHE_TTL': 3600}, storage=storage)
+        _, full = service.changes('events')
+
+        storage.put('events.json', '{"items": [{"id": 1, "title": "b"}]}', START + timedelta(seconds=5))
+        service.refresh('events.json')
+        _, delta = service.changes('events', full["version"])
+        assert delta["updated"] == [{"id": 1, "title": "b"}]
+        assert delta["version"] // VERSION_HASH_RANGE == full["version"] // VERSION_HASH_RANGE + 5
@@ -0,0 +1,684 @@
+"""
+Tests unitaires du ContentService et de son cache
+
+Ces tests vérifient le single-flight, le stale-while-revalidate et le
+stale-if-error sans passer par Flask.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.cache import ContentCache, HIT, MISS, STALE, STALE_ERROR, ERROR
+from app.services.content_service import ContentService
+from app.services.storage import BlobStorage, MemoryStorage
+from app.services.snapshot import ContentSnapshot
+from benchmarks.fake_blob import FakeContainerClient
+
+
+class FakeClock:
+    """Horloge monotone contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def upload(container, name, data):
+    """Publie `data` (sérialisé en JSON) dans le conteneur simulé"""
+    container.upload_blob(name, json.dumps(data), overwrite=True)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def service():
+    """ContentService configuré sur les fichiers locaux de test"""
+    return ContentService({
+        'USE_LOCAL_FILES': True,
+        'LOCAL_DATA_PATH': 'tests/data',
+        'CACHE_TTL': 60,
+    })
+
+
+class TestContentCache:
+    """Tests du cache single-flight / stale-while-revalidate"""
+
+    def test_miss_then_hit(self, clock):
+        """Vérifie qu'une valeur chargée est ensuite servie depuis le cache"""
+        cache = ContentCache(ttl=10, clock=clock)
+        calls = []
+
+        def loader(key, previous):
+            calls.append(key)
+            return {"items": [key]}
+
+        assert cache.get('a', loader).status == MISS
+        result = cache.get('a', loader)
+        assert result.status == HIT
+        assert result.value == {"items": ['a']}
+        assert calls == ['a']
+
+    def test_single_flight(self):
+        """Vérifie qu'un seul chargement a lieu pour des appels concurrents"""
+        cache = ContentCache(ttl=10)
+        calls = []
+
+        def loader(key, previous):
+            calls.append(key)
+            time.sleep(0.05)
+            return {"items": []}
+
+        threads = [threading.Thread(target=cache.get, args=('a', loader)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+
+    def test_stale_while_revalidate(self, clock):
+        """Vérifie que la copie périmée est servie pendant la revalidation"""
+        cache = ContentCache(ttl=10, stale_while_revalidate=5, clock=clock)
+        versions = iter([1, 2])
+        refreshed = threading.Event()
+
+        def loader(key, previous):
+            value = next(versions)
+            if value == 2:
+                refreshed.set()
+            return value
+
+        cache.get('a', loader)
+        clock.now += 12
+        result = cache.get('a', loader)
+        assert result == (1, STALE)
+
+        assert refreshed.wait(1)
+        # Laisser le thread de revalidation stocker la valeur
+        for _ in range(100):
+            if cache.peek('a').value == 2:
+                break
+            time.sleep(0.01)
+        assert cache.get('a', loader) == (2, HIT)
+
+    def test_stale_if_error(self, clock):
+        """Vérifie que la dernière copie valide est servie si le rechargement échoue"""
+        cache = ContentCache(ttl=10, stale_if_error=100, clock=clock)
+        responses = iter([{"items": [1]}, None, None])
+
+        cache.get('a', lambda key, previous: next(responses))
+        clock.now += 50
+        assert cache.get('a', lambda key, previous: next(responses)) == ({"items": [1]}, STALE_ERROR)
+
+        clock.now += 100
+        assert cache.get('a', lambda key, previous: next(responses)) == (None, ERROR)
+
+    def test_loader_exception_is_contained(self, clock):
+        """Vérifie qu'une exception du loader est traitée comme un échec"""
+        cache = ContentCache(ttl=10, clock=clock)
+
+        def loader(key, previous):
+            raise RuntimeError("boom")
+
+        assert cache.get('a', loader) == (None, ERROR)
+
+
+class TestCacheBudget:
+    """Tests du budget mémoire du cache (taille estimée des entrées)"""
+
+    def loader(self, sizes, calls=None):
+        def load(key, previous):
+            if calls is not None:
+                calls.append(key)
+            return 'x' * sizes[key]
+        return load
+
+    def test_least_recently_used_entries_are_evicted_over_budget(self, clock):
+        """Vérifie l'éviction LRU quand la taille totale dépasse le budget"""
+        evicted = []
+        cache = ContentCache(ttl=10, max_bytes=100, getsizeof=len, clock=clock, on_evict=evicted.append)
+        load = self.loader({'a': 40, 'b': 40, 'c': 40})
+        cache.get('a', load)
+        cache.get('b', load)
+        cache.get('a', load)
+        cache.get('c', load)
+
+        assert evicted == ['b']
+        assert cache.describe()['sizes'] == {'a': 40, 'c': 40}
+        assert cache.describe()['bytes'] == 80
+
+    def test_entry_count_is_still_bounded(self, clock):
+        cache = ContentCache(ttl=10, maxsize=2, max_bytes=1000, getsizeof=len, clock=clock)
+        load = self.loader({'a': 1, 'b': 1, 'c': 1})
+        for key in ('a', 'b', 'c'):
+            cache.get(key, load)
+        assert len(cache) == 2 and 'a' not in cache
+
+    def test_oversized_value_is_served_but_not_kept(self, clock):
+        """Vérifie qu'une entrée trop volumineuse est servie puis rechargée"""
+        refused, calls = [], []
+        cache = ContentCache(ttl=10, max_bytes=1000, max_entry_bytes=50, getsizeof=len,
+                             clock=clock, on_refuse=lambda key, size: refused.append((key, size)))
+        sizes = {'big': 20}
+        load = self.loader(sizes, calls)
+        cache.get('big', load)
+        assert 'big' in cache
+
+        # Le fichier grossit : l'ancienne copie est supprimée, la nouvelle servie
+        sizes['big'] = 80
+        assert cache.refresh('big', load) is True
+        result = cache.get('big', load)
+        assert result.status == MISS and len(result.value) == 80
+        assert 'big' not in cache
+        assert refused == [('big', 80), ('big', 80)]
+        assert calls == ['big', 'big', 'big']
+        assert cache.describe()['refused'] == {'big': 80}
+
+    def test_refused_value_is_loaded_once_for_concurrent_requests(self):
+        """Vérifie que le single-flight s'applique aussi aux valeurs trop volumineuses"""
+        cache = ContentCache(ttl=10, max_entry_bytes=50, getsizeof=len)
+        calls = []
+
+        def loader(key, previous):
+            calls.append(key)
+            time.sleep(0.05)
+            return 'x' * 80
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('big', loader)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == ['big']
+        assert all(len(result.value) == 80 for result in results)
+        assert 'big' not in cache
+
+    def test_refused_value_is_kept_briefly_for_conditional_revalidation(self, clock):
+        """Vérifie qu'une valeur refusée est servie refused_ttl secondes puis libérée"""
+        cache = ContentCache(ttl=10, max_entry_bytes=50, refused_ttl=5, getsizeof=len, clock=clock)
+        previous_values = []
+
+        def loader(key, previous):
+            previous_values.append(previous)
+            return previous or 'x' * 80
+
+        assert cache.get('big', loader).status == MISS
+        assert cache.get('big', loader).status == HIT
+        # Rechargement dans la fenêtre : la valeur refusée sert de base
+        assert cache.refresh('big', loader) is True
+        assert previous_values == [None, 'x' * 80]
+
+        clock.now += 6
+        assert cache.get('big', loader).status == MISS
+        assert previous_values[-1] is None
+        assert cache.is_refused('big')
+
+    def test_shrunk_refused_value_is_base_of_conditional_revalidation(self, clock):
+        """Vérifie qu'après refused_ttl, la forme compacte sert de base à la revalidation"""
+        cache = ContentCache(ttl=10, max_entry_bytes=50, refused_ttl=5, getsizeof=len,
+                             shrink=lambda value: value[:1], clock=clock)
+        previous_values = []
+
+        def loader(key, previous):
+            previous_values.append(previous)
+            return 'x' * 80 if previous is None else previous + 'x' * 79
+
+        cache.get('big', loader)
+        clock.now += 6
+        assert cache.get('big', loader).status == MISS
+        assert previous_values == [None, 'x']
+
+    def test_refused_value_is_servable_without_reload(self, clock):
+        """Vérifie qu'une valeur refusée, même réduite, reste servable sans rechargement"""
+        cache = ContentCache(ttl=10, stale_if_error=100, max_entry_bytes=50, refused_ttl=5,
+                             getsizeof=len, shrink=lambda value: value[:1], clock=clock)
+        cache.get('big', lambda key, previous: 'x' * 80)
+        assert cache.servable('big').value == 'x' * 80
+        clock.now += 6
+        assert cache.servable('big').value == 'x'
+        clock.now += 200
+        assert cache.servable('big') is None
+
+    def test_size_is_reassessed_when_value_grows(self, clock):
+        """Vérifie que la taille d'une entrée qui grossit en cache est réévaluée à la lecture"""
+        cache = ContentCache(ttl=10, max_bytes=1000, getsizeof=len, clock=clock)
+        cache.get('a', lambda key, previous: ['x'])
+        cache.get('a', lambda key, previous: None).value.extend(['y', 'z'])
+
+        assert cache.get('a', lambda key, previous: None).status == HIT
+        assert cache.describe()['sizes'] == {'a': 3}
+        assert cache.describe()['bytes'] == 3
+
+    def test_lazy_snapshot_size_counts_parsed_data_before_decoding(self):
+        """Vérifie qu'un instantané non décodé est compté à sa taille décodée"""
+        built = ContentSnapshot.build('events.json', {"items": [{"id": i} for i in range(100)]})
+        snapshot = ContentSnapshot.from_body('events.json', built.body)
+        size = snapshot.memory_size()
+        assert size == built.memory_size()
+
+        snapshot.data
+        snapshot.index
+        assert snapshot.memory_size() == size
+
+        # Sans liste d'items, l'index n'est plus compté une fois constaté absent
+        flat = ContentSnapshot.from_body('faq.json', b'{"questions":[]}')
+        estimated = flat.memory_size()
+        assert flat.index is None
+        assert flat.memory_size() == estimated - len(flat.body) * 2
+
+    def test_decoding_does_not_push_accepted_entry_over_limit(self, clock):
+        """Vérifie qu'une entrée acceptée reste en cache après décodage"""
+        body = ContentSnapshot.build('events.json', {"items": [{"id": i} for i in range(100)]}).body
+        limit = ContentSnapshot.from_body('events.json', body).memory_size()
+        cache = ContentCache(ttl=10, max_entry_bytes=limit, getsizeof=ContentSnapshot.memory_size,
+                             clock=clock)
+        snapshot = cache.get('events.json', lambda key, previous: ContentSnapshot.from_body(key, body)).value
+        snapshot.index
+        assert cache.get('events.json', lambda key, previous: None).status == HIT
+        assert 'events.json' in cache
+
+    def test_compact_snapshot_drops_parsed_data(self):
+        snapshot = ContentSnapshot.build('events.json', {"items": [{"id": 1}]}, source_etag='"v1"')
+        compact = snapshot.compact()
+        assert compact == snapshot and not compact.decoded
+        assert compact.compact() is compact
+
+    def test_snapshot_size_accounts_for_parsed_data_and_variants(self):
+        snapshot = ContentSnapshot.build('events.json', {"items": [{"id": i} for i in range(100)]},
+                                         compress_min_size=0)
+        body = len(snapshot.body)
+        assert snapshot.memory_size() == body * 7 + sum(len(v) for v in snapshot.variants.values())
+
+    def test_service_exposes_cache_sizes(self, service):
+        service.get_snapshot('events.json')
+        cache = service.readiness()['cache']
+        assert cache['sizes']['events.json'] == service.get_snapshot('events.json').memory_size()
+        assert cache['bytes'] >= cache['sizes']['events.json']
+
+
+class TestContentService:
+    """Tests du service de contenu"""
+
+    def test_reads_local_files_from_mapping_config(self, service):
+        """Vérifie que la configuration sous forme de dict (app.config) est lue"""
+        data = service.get_events()
+        assert 'error' not in data
+        assert data['items'][0]['title'] == 'Test Event'
+
+    def test_missing_file_returns_error(self, service):
+        """Vérifie qu'un fichier absent retourne une liste vide avec erreur"""
+        data = service.get_content('missing.json')
+        assert data['items'] == []
+        assert 'error' in data
+
+    def test_snapshot_is_pre_encoded(self, service):
+        """Vérifie que l'instantané contient le JSON encodé et un ETag stable"""
+        snapshot = service.get_snapshot('events.json')
+        assert json.loads(snapshot.body) == snapshot.data
+        assert snapshot.etag == ContentSnapshot.build('events.json', snapshot.data).etag
+
+    def test_json_is_ingested_without_building_the_tree(self, service):
+        """Vérifie que les données ne sont décodées qu'à la demande"""
+        snapshot = service.get_snapshot('events.json')
+        assert snapshot.decoded is False
+        assert service.search('test')['total'] >= 1
+        assert snapshot.decoded is True
+
+    def test_invalid_json_is_a_failure(self):
+        """Vérifie qu'un JSON invalide n'est pas mis en cache"""
+        storage = MemoryStorage({'events.json': b'{"items": [}'})
+        service = ContentService({}, storage=storage)
+        assert service.get_snapshot('events.json') is None
+        assert service.health.file_state('events.json').consecutive_failures == 1
+
+
+class TestConditionalFetch:
+    """Tests de la revalidation conditionnelle des blobs (If-None-Match)"""
+
+    @pytest.fixture
+    def blob_service(self):
+        container = FakeContainerClient()
+        upload(container, 'events.json', {"items": [{"id": 1}]})
+        return ContentService({'CACHE_TTL': 0, 'CACHE_STALE_WHILE_REVALIDATE': 0},
+                              storage=BlobStorage(container))
+
+    def test_unchanged_blob_reuses_snapshot(self, blob_service):
+        """Vérifie qu'un blob inchangé n'est ni retéléchargé ni reparsé"""
+        first = blob_service.get_snapshot('events.json')
+        second = blob_service.get_snapshot('events.json')
+
+        fake = blob_service.storage.container_client
+        assert second is first
+        assert fake.downloads == 1
+        assert fake.not_modified == 1
+
+    def test_changed_blob_is_reloaded(self, blob_service):
+        """Vérifie qu'un blob modifié est rechargé"""
+        blob_service.get_snapshot('events.json')
+        upload(blob_service.storage.container_client, 'events.json', {"items": [{"id": 2}]})
+
+        snapshot = blob_service.get_snapshot('events.json')
+        assert snapshot.data == {"items": [{"id": 2}]}
+        assert blob_service.storage.container_client.downloads == 2
+
+
+class TestRefresher:
+    """Tests du rafraîchissement en arrière-plan"""
+
+    def test_refresher_warms_all_collections(self, service):
+        """Vérifie que le démarrage précharge events, news et faq"""
+        service.start_refresher(interval=60)
+        try:
+            for _ in range(100):
+                if all(filename in service._cache for filename in service.content_files()):
+                    break
+                time.sleep(0.01)
+            assert service.refresher_running
+            assert all(filename in service._cache for filename in service.content_files())
+        finally:
+            service.stop_refresher()
+        assert not service.refresher_running
+
+    def test_requests_do_not_block_while_refresher_runs(self, service):
+        """Vérifie qu'un instantané périmé est servi sans rechargement synchrone"""
+        service.warm_up()
+        snapshot = service.get_snapshot('news.json')
+        service._cache.ttl = 0
+        service._fetch = None  # tout appel synchrone échouerait
+        service.start_refresher(interval=3600)
+        try:
+            assert service.get_snapshot('news.json') is snapshot
+        finally:
+            service.stop_refresher()
+
+    def test_file_too_large_to_cache_does_not_block_while_refresher_runs(self, service, clock):
+        """Vérifie qu'un fichier refusé par le cache est servi sans lecture synchrone"""
+        service._cache._clock = clock
+        service._cache.max_entry_bytes = 1
+        service.warm_up()
+        clock.now += service._cache.refused_ttl + 1
+        service._fetch = None  # tout appel synchrone échouerait
+        service.start_refresher(interval=3600)
+        try:
+            result = service.lookup('news.json')
+            assert result.status == HIT and result.value.filename == 'news.json'
+        finally:
+            service.stop_refresher()
+
+    def test_snapshot_past_stale_if_error_is_not_served(self, service, clock):
+        """Vérifie qu'un rafraîchissement en échec ne sert pas indéfiniment une copie expirée"""
+        service._cache._clock = clock
+        service._cache.ttl, service._cache.stale_if_error = 10, 100
+        service.warm_up()
+        snapshot = service.get_snapshot('news.json')
+        service._fetch = lambda filename, previous=None: None  # source en panne
+        service.start_refresher(interval=3600)
+        try:
+            clock.now += 50
+            assert service.lookup('news.json') == (snapshot, HIT)
+            clock.now += 100
+            assert service.lookup('news.json') == (None, ERROR)
+        finally:
+            service.stop_refresher()
+
+    def test_warm_up_reports_failures(self, service):
+        """Vérifie que warm_up indique les fichiers non chargés"""
+        service.config['FAQ_FILE'] = 'missing.json'
+        result = service.warm_up()
+        assert result['events.json'] is True
+        assert result['missing.json'] is False
+
+
+class TestBulkLoading:
+    """Tests du chargement parallèle (get_many / warm_up)"""
+
+    def test_get_many_fetches_in_parallel(self, service):
+        """Vérifie que les fichiers absents du cache sont chargés en parallèle"""
+        fetch = service._fetch
+
+        def slow_fetch(filename, previous=None):
+            time.sleep(0.2)
+            return fetch(filename, previous)
+
+        service._fetch = slow_fetch
+        start = time.monotonic()
+        snapshots = service.get_many(service.content_files())
+        elapsed = time.monotonic() - start
+
+        assert set(snapshots) == {'events.json', 'news.json', 'faq.json'}
+        assert all(snapshot is not None for snapshot in snapshots.values())
+        assert elapsed < 0.5
+
+    def test_get_many_reports_missing_files(self, service):
+        """Vérifie qu'un fichier introuvable donne None sans bloquer les autres"""
+        snapshots = service.get_many(['events.json', 'missing.json'])
+        assert snapshots['events.json'] is not None
+        assert snapshots['missing.json'] is None
+
+
+class TestReadiness:
+    """Tests de la readiness calculée depuis l'état du cache"""
+
+    @pytest.fixture
+    def blob_service(self):
+        container = FakeContainerClient()
+        for filename in ('events.json', 'news.json', 'faq.json'):
+            upload(container, filename, {"items": []})
+        return ContentService({'READINESS_CHECK_INTERVAL': 3600}, storage=BlobStorage(container))
+
+    def test_ready_once_all_collections_are_servable(self, blob_service):
+        """Vérifie que la readiness dépend des instantanés disponibles"""
+        blob_service.health.record_connectivity(False)
+        assert blob_service.readiness()['ready'] is False
+
+        blob_service.warm_up()
+        readiness = blob_service.readiness()
+        assert readiness['ready'] is True
+        assert all(state['servable'] for state in readiness['files'].values())
+
+    def test_connectivity_check_runs_in_background(self, blob_service):
+        """Vérifie que le test de connectivité est planifié sans bloquer"""
+        blob_service.readiness()
+        for _ in range(100):
+            if blob_service.health.connectivity_ok is not None:
+                break
+            time.sleep(0.01)
+        assert blob_service.health.connectivity_ok is True
+        assert blob_service.readiness()['ready'] is True
+
+    def test_consecutive_failures_are_reported(self, blob_service):
+        """Vérifie le comptage des échecs consécutifs par fichier"""
+        blob_service.health.record_connectivity(True)
+        blob_service.storage.container_client.delete_blob('news.json')
+        blob_service.get_snapshot('news.json')
+        blob_service.get_snapshot('news.json')
+
+        readiness = blob_service.readiness()
+        assert readiness['files']['news.json']['consecutive_failures'] == 2
+        assert readiness['azure_connection'] == 'failed'
+
+    def test_file_too_large_to_cache_is_servable(self, blob_service):
+        """Vérifie qu'un fichier refusé par le budget mémoire reste compté servable"""
+        blob_service.health.record_connectivity(False)
+        blob_service._cache.max_entry_bytes = 1
+        blob_service.warm_up()
+
+        readiness = blob_service.readiness()
+        assert readiness['cache']['entries'] == 0
+        assert all(state['servable'] for state in readiness['files'].values())
+        assert readiness['ready'] is True
+
+    def test_snapshot_past_stale_if_error_is_not_servable(self, blob_service, clock):
+        """Vérifie qu'une copie expirée au-delà de stale-if-error n'est plus comptée servable"""
+        blob_service.health.record_connectivity(False)
+        blob_service._cache._clock = clock
+        blob_service._cache.ttl, blob_service._cache.stale_if_error = 10, 100
+        blob_service.warm_up()
+        clock.now += 50
+        assert blob_service.readiness()['ready'] is True
+
+        clock.now += 100
+        readiness = blob_service.readiness()
+        assert readiness['files']['events.json']['servable'] is False
+        assert readiness['ready'] is False
+
+
+class TestSharedSnapshot:
+    """Tests du mode partagé entre workers (writer élu + lecteurs mmap)"""
+
+    @pytest.fixture
+    def make_service(self, tmp_path):
+        def make(**overrides):
+            container = FakeContainerClient()
+            for filename in ('events.json', 'news.json', 'faq.json'):
+                upload(container, filename, {"items": [{"id": 1, "title": f"Titre {filename}"}]})
+            return ContentService({
+                'SHARED_SNAPSHOT_DIR': str(tmp_path / 'shared'),
+                'SHARED_SNAPSHOT_POLL_INTERVAL': 0,
+                'COMPRESSION_MIN_SIZE': 0,
+                **overrides,
+            }, storage=BlobStorage(container))
+        return make
+
+    def test_single_writer_is_elected(self, make_service):
+        """Vérifie qu'un seul worker devient writer, et qu'un autre prend le relais"""
+        writer, reader = make_service(), make_service()
+        assert writer.shared.try_acquire_writer() is True
+        assert reader.shared.try_acquire_writer() is False
+
+        writer.shared.release_writer()
+        assert reader.shared.try_acquire_writer() is True
+
+    def test_readers_serve_published_snapshot_without_fetching(self, make_service):
+        """Vérifie que seul le writer interroge la source"""
+        writer, reader = make_service(), make_service()
+        writer.refresh_cycle()
+        reader.refresh_cycle()
+
+        assert writer.shared.is_writer and not reader.shared.is_writer
+        assert writer.storage.container_client.downloads == 3
+        assert reader.storage.container_client.downloads == 0
+
+        published = writer.get_snapshot('events.json')
+        snapshot, status = reader.lookup('events.json')
+        assert status == HIT
+        assert isinstance(snapshot.body, memoryview)
+        assert bytes(snapshot.body) == published.body
+        assert snapshot.etag == published.etag
+        assert snapshot.last_modified == published.last_modified
+        assert {k: bytes(v) for k, v in snapshot.variants.items()} == published.variants
+        assert 'events.json' not in reader._cache
+        assert reader.storage.container_client.downloads == 0
+
+    def test_data_is_decoded_lazily(self, make_service):
+        """Vérifie que les lecteurs ne parsent le contenu qu'à la demande"""
+        writer, reader = make_service(), make_service()
+        writer.refresh_cycle()
+
+        snapshot = reader.get_snapshot('events.json')
+        assert snapshot.decoded is False
+        assert snapshot.data == writer.get_content('events.json')
+        assert reader.search('titre')['total'] == 3
+
+    def test_new_generation_is_picked_up(self, make_service):
+        """Vérifie que les lecteurs voient la génération suivante"""
+        writer, reader = make_service(), make_service()
+        writer.refresh_cycle()
+        first = reader.get_snapshot('events.json')
+        generation = reader.shared.generation
+
+        upload(writer.storage.container_client, 'events.json', {"items": [{"id": 2}]})
+        writer.clear_cache()
+        writer.refresh_cycle()
+
+        second = reader.get_snapshot('events.json')
+        assert reader.shared.generation == generation + 1
+        assert second.data == {"items": [{"id": 2}]}
+        # L'ancienne génération reste lisible par les requêtes en cours
+        assert json.loads(bytes(first.body)) == {"items": [{"id": 1, "title": "Titre events.json"}]}
+
+    def test_reader_response_is_sent_in_chunks(self, make_service):
+        """Vérifie qu'un lecteur sert la vue partagée par morceaux, sans copie complète"""
+        from app.main import create_app
+        writer, reader = make_service(), make_service()
+        writer.refresh_cycle()
+        client = create_app({'ACCESS_LOG': False}, content_service=reader).test_client()
+
+        response = client.get('/api/events', headers={'Accept-Encoding': 'identity'})
+        assert response.is_streamed
+        assert response.data == writer.get_snapshot('events.json').body
+        assert int(response.headers['Content-Length']) == len(response.data)
+        etag = response.headers['ETag']
+        assert client.get('/api/events', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_unchanged_content_is_not_republished(self, make_service):
+        """Vérifie qu'une génération n'est écrite que si le contenu change"""
+        writer = make_service()
+        writer.refresh_cycle()
+        generation = writer.shared.generation
+        writer.refresh_cycle()
+        assert writer.shared.generation == generation
+
+    def test_readiness_reports_shared_state(self, make_service):
+        """Vérifie que la readiness d'un lecteur tient compte du fichier partagé"""
+        writer, reader = make_service(), make_service()
+        writer.refresh_cycle()
+        readiness = reader.readiness()
+        assert all(state['servable'] for state in readiness['files'].values())
+        assert readiness['shared_snapshot']['role'] == 'reader'
+        assert readiness['shared_snapshot']['generation'] == 1
+
+
+class TestWarmCache:
+    """Tests du démarrage à chaud depuis le cache disque"""
+
+    @pytest.fixture
+    def container(self):
+        container = FakeContainerClient()
+        for filename in ('events.json', 'news.json', 'faq.json'):
+            upload(container, filename, {"items": [{"id": 1}]})
+        return container
+
+    def make_service(self, container, tmp_path):
+        return ContentService({'WARM_CACHE_DIR': str(tmp_path), 'READINESS_CHECK_INTERVAL': 3600},
+                              storage=BlobStorage(container))
+
+    def test_restart_serves_last_snapshot_without_waiting(self, container, tmp_path):
+        """Vérifie qu'un nouveau service sert le contenu enregistré puis le revalide"""
+        first = self.make_service(container, tmp_path)
+        first.warm_up()
+        first._warm_cache_writer.shutdown(wait=True)
+        expected = first.get_snapshot('events.json')
+
+        restarted = self.make_service(container, tmp_path)
+        assert sorted(restarted.restored_files) == ['events.json', 'faq.json', 'news.json']
+        assert restarted.readiness()['ready'] is True
+
+        snapshot, status = restarted.lookup('events.json')
+        assert status == STALE
+        assert bytes(snapshot.body) == expected.body
+        assert snapshot.etag == expected.etag
+
+        # Revalidation conditionnelle en arrière-plan : pas de nouveau téléchargement
+        for _ in range(100):
+            if container.not_modified:
+                break
+            time.sleep(0.01)
+        assert container.not_modified == 1
+        assert container.downloads == 3
+
+    def test_unreadable_cache_is_ignored(self, container, tmp_path):
+        (tmp_path / 'content.bin').write_bytes(b'garbage')
+        service = self.make_service(container, tmp_path)
+        assert service.restored_files == []
+        assert service.get_snapshot('events.json') is not None
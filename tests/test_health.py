@@ -64,3 +64,12 @@ class TestReadyz:
 
         assert 'azure_connection' in data
         assert data['azure_connection'] in ['connected', 'failed']
+
+    def test_readyz_reports_cache_state(self, client):
+        """Vérifie que /readyz détaille l'état de chaque fichier de contenu"""
+        client.get('/api/events')
+        data = json.loads(client.get('/readyz').data)
+
+        assert 'files' in data
+        assert data['files']['events.json']['servable'] is True
+        assert data['files']['events.json']['consecutive_failures'] == 0
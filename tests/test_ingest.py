@@ -0,0 +1,70 @@
+"""
+Tests de l'ingestion en flux des fichiers JSON
+"""
+import json
+import tracemalloc
+
+import pytest
+
+from app.services.ingest import IngestError, ingest_json
+from app.services.snapshot import encode_json
+
+
+def chunked(document: bytes, size: int):
+    return (document[i:i + size] for i in range(0, len(document), size))
+
+
+DOCUMENTS = [
+    {"items": [{"id": 1, "title": "Conférence", "tags": ["cloud", "azure"]}, {"id": 2}]},
+    {"updated": "2026-03-01", "items": [], "meta": {"count": 0, "nested": {"a": [1, 2.5, None]}}},
+    {"items": [{"text": "guillemets \" et \\ échappés é \U0001f680", "n": -12345678901}]},
+    {"other": [1, 2, 3]},
+    {},
+    [{"id": 1}, {"id": 2}],
+]
+
+
+class TestIngestJson:
+    """Résultat identique à encode_json(json.loads(...)) quel que soit le découpage"""
+
+    @pytest.mark.parametrize('document', DOCUMENTS)
+    @pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 65536])
+    def test_same_body_as_full_parse(self, document, chunk_size):
+        raw = json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')
+        assert ingest_json(chunked(raw, chunk_size)) == encode_json(document)
+
+    def test_number_split_across_chunks(self):
+        """Vérifie qu'un nombre coupé entre deux morceaux est lu en entier"""
+        assert ingest_json([b'{"items": [12', b'34]}']) == b'{"items":[1234]}'
+
+    def test_byte_order_mark_is_ignored(self):
+        assert ingest_json([b'\xef\xbb\xbf{"items": []}']) == b'{"items":[]}'
+
+    @pytest.mark.parametrize('document', [
+        b'{"items": [{"id": 1},]}',
+        b'{"items": [{"id": 1}',
+        b'{"items": []} trailing',
+        b'{"items" []}',
+        b'{1: 2}',
+        b'not json',
+        b'{"title": "\xff"}',
+    ])
+    def test_invalid_documents(self, document):
+        with pytest.raises(IngestError):
+            ingest_json(chunked(document, 4))
+
+    def test_peak_memory_is_bounded_by_body(self):
+        """Vérifie que la mémoire de pointe reste proche de la taille du corps"""
+        items = [{"id": i, "title": f"Actualité {i}", "content": "lorem ipsum " * 20}
+                 for i in range(5000)]
+        raw = json.dumps({"items": items}, indent=2, ensure_ascii=False).encode('utf-8')
+        del items
+
+        tracemalloc.start()
+        try:
+            body = ingest_json(chunked(raw, 64 * 1024))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Aucune seconde copie du corps : tampon de sortie seulement
+        assert peak < 1.5 * len(body)
@@ -0,0 +1,237 @@
+"""
+Tests de l'invalidation par webhook (Event Grid, liste de fichiers) et de sa
+propagation aux autres workers
+"""
+import json
+import time
+
+import pytest
+
+from app.services.content_service import ContentService
+from app.services.invalidation import (
+    InvalidPayloadError, InvalidationBroadcaster, parse_invalidation
+)
+from app.services.storage import MemoryStorage
+
+TOKEN = 's3cret-token'
+
+
+def blob_event(name, event_type='Microsoft.Storage.BlobCreated', container='content'):
+    return {
+        "id": "1",
+        "eventType": event_type,
+        "subject": f"/blobServices/default/containers/{container}/blobs/{name}",
+        "data": {"url": f"https://account.blob.core.windows.net/{container}/{name}"},
+    }
+
+
+def document(title):
+    return json.dumps({"items": [{"id": 1, "title": title}]})
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class TestParseInvalidation:
+
+    def test_event_grid_blob_events(self):
+        payload = [blob_event('events.json'),
+                   blob_event('news.json', 'Microsoft.Storage.BlobDeleted'),
+                   blob_event('events.json')]
+        notification = parse_invalidation(payload, 'content')
+        assert notification.filenames == ['events.json', 'news.json']
+        assert notification.deleted == ('news.json',)
+
+    def test_last_event_decides_deletion(self):
+        payload = [blob_event('events.json', 'Microsoft.Storage.BlobDeleted'),
+                   blob_event('events.json')]
+        assert parse_invalidation(payload).deleted == ()
+
+    def test_cloud_events_schema(self):
+        event = blob_event('faq.json')
+        event['type'] = event.pop('eventType')
+        assert parse_invalidation(event).filenames == ['faq.json']
+
+    def test_other_containers_and_event_types_are_ignored(self):
+        payload = [blob_event('events.json', container='other'),
+                   {"eventType": "Microsoft.Storage.BlobTierChanged", "subject": "x"}]
+        assert parse_invalidation(payload, 'content').filenames == []
+
+    def test_subscription_validation(self):
+        payload = [{"eventType": "Microsoft.EventGrid.SubscriptionValidationEvent",
+                    "data": {"validationCode": "512d38b6"}}]
+        assert parse_invalidation(payload).validation_code == '512d38b6'
+
+    def test_list_of_files(self):
+        assert parse_invalidation({"files": ["events.json"]}).filenames == ['events.json']
+        assert parse_invalidation(["faq.json"]).filenames == ['faq.json']
+
+    @pytest.mark.parametrize('payload', [
+        {"files": "events.json"},
+        42,
+        [blob_event('events.json') | {"subject": "/unexpected"}],
+        [{"eventType": "Microsoft.EventGrid.SubscriptionValidationEvent", "data": {}}],
+    ])
+    def test_invalid_payloads(self, payload):
+        with pytest.raises(InvalidPayloadError):
+            parse_invalidation(payload)
+
+
+class TestInvalidationBroadcaster:
+
+    def test_markers_reach_other_processes_once(self, tmp_path):
+        sender = InvalidationBroadcaster(str(tmp_path), poll_interval=0)
+        receiver = InvalidationBroadcaster(str(tmp_path), poll_interval=0)
+
+        sender.publish(['events.json', 'dossier/news.json'])
+        assert sorted(receiver.poll()) == ['dossier/news.json', 'events.json']
+        assert receiver.poll() == []
+        # Le processus émetteur a déjà traité ses propres invalidations
+        assert sender.poll() == []
+
+    def test_existing_markers_are_not_replayed_at_startup(self, tmp_path):
+        InvalidationBroadcaster(str(tmp_path)).publish(['events.json'])
+        assert InvalidationBroadcaster(str(tmp_path), poll_interval=0).poll() == []
+
+    def test_deletions_are_flagged(self, tmp_path):
+        sender = InvalidationBroadcaster(str(tmp_path), poll_interval=0)
+        receiver = InvalidationBroadcaster(str(tmp_path), poll_interval=0)
+
+        sender.publish(['events.json', 'news.json'], deleted=['news.json'])
+        assert sorted(receiver.poll()) == ['events.json', 'news.json']
+        assert receiver.is_deleted('news.json')
+        assert not receiver.is_deleted('events.json')
+
+        # Fichier recréé : la suppression n'est plus signalée
+        sender.publish(['news.json'])
+        assert not receiver.is_deleted('news.json')
+
+    def test_polling_is_rate_limited(self, tmp_path):
+        now = [0.0]
+        sender = InvalidationBroadcaster(str(tmp_path))
+        receiver = InvalidationBroadcaster(str(tmp_path), poll_interval=1.0, clock=lambda: now[0])
+        assert receiver.poll() == []
+
+        sender.publish(['events.json'])
+        assert receiver.poll() == []
+        now[0] = 1.0
+        assert receiver.poll() == ['events.json']
+
+
+class TestServiceInvalidation:
+    """Rechargement des fichiers invalidés dans tous les workers"""
+
+    @pytest.fixture
+    def storage(self):
+        return MemoryStorage({name: document('v1') for name in ('events.json', 'news.json', 'faq.json')})
+
+    @pytest.fixture
+    def make_service(self, tmp_path, storage):
+        def make(**overrides):
+            return ContentService({
+                'CACHE_TTL': 3600,
+                'INVALIDATION_DIR': str(tmp_path / 'invalidations'),
+                'INVALIDATION_POLL_INTERVAL': 0,
+                **overrides,
+            }, storage=storage)
+        return make
+
+    def title(self, service, filename='events.json'):
+        return service.get_content(filename)['items'][0]['title']
+
+    def test_unknown_files_are_ignored(self, make_service):
+        assert make_service().invalidate(['other.json', 'events.json']) == ['events.json']
+
+    def test_all_workers_reload_invalidated_file(self, make_service, storage):
+        receiver, other = make_service(), make_service()
+        assert self.title(receiver) == self.title(other) == 'v1'
+
+        storage.put('events.json', document('v2'))
+        assert receiver.invalidate(['events.json']) == ['events.json']
+
+        wait_for(lambda: self.title(receiver) == 'v2')
+        wait_for(lambda: self.title(other) == 'v2')
+        assert self.title(other, 'news.json') == 'v1'
+
+    def test_deleted_file_is_evicted_in_all_workers(self, make_service, storage):
+        receiver, other = make_service(CACHE_STALE_IF_ERROR=3600), make_service(CACHE_STALE_IF_ERROR=3600)
+        assert self.title(receiver) == self.title(other) == 'v1'
+
+        storage.delete('events.json')
+        assert receiver.invalidate(['events.json'], deleted=['events.json']) == ['events.json']
+
+        # Évincé immédiatement : pas de copie servie pendant stale-if-error
+        assert receiver.get_snapshot('events.json') is None
+        wait_for(lambda: other.get_snapshot('events.json') is None)
+        assert self.title(other, 'news.json') == 'v1'
+
+    def test_shared_mode_writer_publishes_invalidated_file(self, make_service, storage, tmp_path):
+        shared = {'SHARED_SNAPSHOT_DIR': str(tmp_path / 'shared'), 'SHARED_SNAPSHOT_POLL_INTERVAL': 0}
+        writer, reader = make_service(**shared), make_service(**shared)
+        writer.refresh_cycle()
+        reader.refresh_cycle()
+        assert self.title(reader) == 'v1'
+
+        # Webhook reçu par un lecteur : le writer recharge puis publie
+        storage.put('events.json', document('v2'))
+        reader.invalidate(['events.json'])
+        wait_for(lambda: self.title(writer) == 'v2')
+        wait_for(lambda: self.title(reader) == 'v2')
+
+
+class TestInvalidateEndpoint:
+    """Tests de POST /api/invalidate"""
+
+    @pytest.fixture
+    def secured(self, app):
+        app.config['INVALIDATION_TOKEN'] = TOKEN
+        yield app
+        app.config['INVALIDATION_TOKEN'] = ''
+
+    def test_disabled_without_token(self, client):
+        assert client.post('/api/invalidate', json={"files": ["events.json"]}).status_code == 404
+
+    @pytest.mark.parametrize('headers', [{}, {'Authorization': 'Bearer wrong'}, {'Authorization': TOKEN}])
+    def test_requires_valid_token(self, secured, client, headers):
+        response = client.post('/api/invalidate', json={"files": ["events.json"]}, headers=headers)
+        assert response.status_code == 401
+        assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+    def test_cloudevents_handshake(self, secured, client):
+        response = client.options(f'/api/invalidate?token={TOKEN}',
+                                  headers={'WebHook-Request-Origin': 'eventgrid.azure.net'})
+        assert response.status_code == 200
+        assert response.headers['WebHook-Allowed-Origin'] == 'eventgrid.azure.net'
+
+    def test_cloudevents_handshake_requires_token_and_origin(self, secured, client):
+        headers = {'WebHook-Request-Origin': 'eventgrid.azure.net'}
+        assert client.options('/api/invalidate', headers=headers).status_code == 401
+        assert client.options(f'/api/invalidate?token={TOKEN}').status_code == 400
+
+    def test_list_of_files(self, secured, client):
+        response = client.post('/api/invalidate', json={"files": ["events.json", "unknown.json"]},
+                               headers={'Authorization': f'Bearer {TOKEN}'})
+        assert response.status_code == 202
+        assert response.get_json() == {"invalidated": ["events.json"], "ignored": ["unknown.json"]}
+
+    def test_event_grid_validation_with_token_in_query(self, secured, client):
+        payload = [{"id": "1", "eventType": "Microsoft.EventGrid.SubscriptionValidationEvent",
+                    "data": {"validationCode": "512d38b6"}}]
+        response = client.post(f'/api/invalidate?token={TOKEN}', json=payload)
+        assert response.status_code == 200
+        assert response.get_json() == {"validationResponse": "512d38b6"}
+
+    def test_event_grid_blob_events(self, secured, client):
+        response = client.post(f'/api/invalidate?token={TOKEN}', json=[blob_event('news.json')])
+        assert response.status_code == 202
+        assert response.get_json()["invalidated"] == ["news.json"]
+
+    def test_invalid_payload_returns_400(self, secured, client):
+        response = client.post('/api/invalidate', data='not json', content_type='application/json',
+                               headers={'Authorization': f'Bearer {TOKEN}'})
+        assert response.status_code == 400
@@ -0,0 +1,67 @@
+"""
+Tests du pipeline de logging asynchrone
+"""
+import io
+import json
+import logging
+import queue
+
+from app.logging_config import AsyncLogging, DroppingQueueHandler, SamplingFilter
+
+
+def make_record(msg, level=logging.DEBUG, name='app.test'):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+class TestSamplingFilter:
+    """Tests de l'échantillonnage et de la limitation de débit"""
+
+    def test_sampling_keeps_one_in_n(self):
+        """Vérifie qu'un record DEBUG sur N est conservé"""
+        sampler = SamplingFilter(sample_rate=10)
+        kept = sum(sampler.filter(make_record("Cache %s for %s")) for _ in range(100))
+        assert kept == 10
+
+    def test_rate_limit_per_message(self):
+        """Vérifie la limite de records par seconde pour un même message"""
+        now = [0.0]
+        sampler = SamplingFilter(rate_limit=5, clock=lambda: now[0])
+        assert sum(sampler.filter(make_record("Cache hit")) for _ in range(20)) == 5
+        assert sampler.filter(make_record("Autre message"))
+
+        now[0] += 1.5
+        assert sampler.filter(make_record("Cache hit"))
+
+    def test_info_records_are_not_sampled(self):
+        """Vérifie que les niveaux supérieurs à DEBUG ne sont pas filtrés"""
+        sampler = SamplingFilter(sample_rate=1000, rate_limit=1)
+        assert all(sampler.filter(make_record("Request", logging.INFO)) for _ in range(10))
+
+
+class TestAsyncLogging:
+    """Tests de la file bornée et de l'écriture par lots"""
+
+    def test_full_queue_drops_without_blocking(self):
+        """Vérifie qu'une file pleine abandonne le record au lieu de bloquer"""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record("first", logging.INFO))
+        handler.handle(make_record("second", logging.INFO))
+        assert handler.dropped == 1
+
+    def test_records_are_written_as_json_lines(self):
+        """Vérifie que le listener écrit des lignes JSON avec les champs de requête"""
+        stream = io.StringIO()
+        pipeline = AsyncLogging(stream=stream)
+        handler = pipeline.start()
+
+        record = make_record("GET /api/news %s", logging.INFO)
+        record.args = (200,)
+        record.request_id = 'abc123'
+        record.duration_ms = 1.5
+        handler.handle(record)
+        pipeline.stop()
+
+        line = json.loads(stream.getvalue().strip())
+        assert line['message'] == 'GET /api/news 200'
+        assert line['request_id'] == 'abc123'
+        assert line['duration_ms'] == 1.5
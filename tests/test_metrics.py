@@ -0,0 +1,49 @@
+"""
+Tests de l'endpoint /metrics (format Prometheus)
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+
+class TestMetrics:
+    """Tests de l'exposition des métriques"""
+
+    def test_metrics_returns_prometheus_text(self, client):
+        """Vérifie que /metrics retourne le format texte Prometheus"""
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+
+    def test_requests_and_cache_are_counted(self, client):
+        """Vérifie le comptage des requêtes par route et des lectures du cache"""
+        client.get('/api/faq')
+        client.get('/api/faq')
+        body = client.get('/metrics').data.decode()
+
+        assert 'http_requests_total{method="GET",route="/api/faq",status="200"}' in body
+        assert 'http_request_duration_seconds_bucket{le="0.0005",route="/api/faq"}' in body
+        assert 'content_cache_lookups_total{file="faq.json",outcome="hit"}' in body
+        assert 'content_parse_duration_seconds_count{format="json"}' in body
+
+    def test_multiprocess_aggregation(self, tmp_path):
+        """Vérifie que les compteurs de plusieurs processus sont agrégés"""
+        script = textwrap.dedent("""
+            import os, sys
+            from app.services import metrics
+            if sys.argv[1] == 'inc':
+                metrics.BLOB_ERRORS.labels('events.json').inc()
+            else:
+                print(metrics.render_metrics()[0].decode())
+        """)
+        env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+        root = os.path.join(os.path.dirname(__file__), '..')
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', script, 'inc'], env=env, cwd=root, check=True)
+        output = subprocess.run(
+            [sys.executable, '-c', script, 'render'], env=env, cwd=root,
+            check=True, capture_output=True, text=True
+        ).stdout
+
+        assert 'blob_errors_total{file="events.json"} 2.0' in output
@@ -0,0 +1,100 @@
+"""
+Tests des requêtes paginées / filtrées / projetées sur les items
+"""
+import pytest
+
+from app.services.query import InvalidQueryError, ItemIndex, ItemQuery
+
+EVENTS = [
+    {"id": 3, "title": "Meetup DevOps", "date": "2026-05-20", "location": "Marseille"},
+    {"id": 1, "title": "Conférence Cloud", "date": "2026-03-15", "location": "Paris"},
+    {"id": 4, "title": "Atelier Docker", "date": "2026-06-01", "location": "Paris"},
+    {"id": 2, "title": "Workshop Kubernetes", "date": "2026-04-10", "location": "Lyon"},
+    {"id": 5, "title": "Sans date", "location": "Paris"},
+]
+
+
+def select(**args):
+    return ItemIndex(EVENTS).select(ItemQuery.from_args(args))
+
+
+class TestItemIndex:
+    """Tests de l'exécution des requêtes sur les index"""
+
+    def test_sort_by_date(self):
+        """Vérifie le tri par date (items sans date en fin de liste)"""
+        result = select(sort='date')
+        assert [item['id'] for item in result['items']] == [1, 2, 3, 4, 5]
+        assert result['total'] == 5
+
+    def test_sort_descending_keeps_undated_items_last(self):
+        """Vérifie que les items sans date restent en fin de liste en tri décroissant"""
+        result = select(sort='-date')
+        assert [item['id'] for item in result['items']] == [4, 3, 2, 1, 5]
+        filtered = select(sort='-date', location='paris')
+        assert [item['id'] for item in filtered['items']] == [4, 1, 5]
+
+    def test_sort_descending(self):
+        """Vérifie le tri décroissant"""
+        result = select(sort='-id')
+        assert [item['id'] for item in result['items']] == [5, 4, 3, 2, 1]
+
+    def test_date_range(self):
+        """Vérifie le filtre par intervalle de dates (bornes incluses)"""
+        result = select(date_from='2026-04-10', date_to='2026-05-20')
+        assert [item['id'] for item in result['items']] == [2, 3]
+
+    def test_location_filter_is_case_insensitive(self):
+        """Vérifie le filtre par lieu, insensible à la casse"""
+        result = select(location='paris')
+        assert [item['id'] for item in result['items']] == [1, 4, 5]
+
+    def test_location_and_date_range(self):
+        """Vérifie la combinaison lieu + intervalle de dates"""
+        result = select(location='Paris', date_from='2026-04-01')
+        assert [item['id'] for item in result['items']] == [4]
+
+    def test_pagination_with_cursor(self):
+        """Vérifie la pagination par curseur"""
+        first = select(sort='id', limit='2')
+        assert [item['id'] for item in first['items']] == [1, 2]
+        assert first['total'] == 5
+
+        second = select(sort='id', limit='2', cursor=first['next_cursor'])
+        assert [item['id'] for item in second['items']] == [3, 4]
+
+        last = select(sort='id', limit='2', cursor=second['next_cursor'])
+        assert [item['id'] for item in last['items']] == [5]
+        assert last['next_cursor'] is None
+
+    def test_fields_projection(self):
+        """Vérifie la projection de champs"""
+        result = select(sort='id', limit='1', fields='id,title')
+        assert result['items'] == [{"id": 1, "title": "Conférence Cloud"}]
+
+    def test_projection_passes_non_object_items_through(self):
+        """Vérifie que la projection renvoie tels quels les items qui ne sont pas des objets"""
+        index = ItemIndex(EVENTS[:1] + ["note", 42])
+        result = index.select(ItemQuery.from_args({'fields': 'id', 'sort': 'id'}))
+        assert result['items'] == [{"id": 3}, "note", 42]
+
+
+class TestItemQuery:
+    """Tests de la validation des paramètres"""
+
+    @pytest.mark.parametrize('args', [
+        {'limit': 'abc'},
+        {'limit': '0'},
+        {'sort': 'description'},
+        {'cursor': 'not-a-cursor'},
+    ])
+    def test_invalid_parameters(self, args):
+        """Vérifie que les paramètres invalides sont rejetés"""
+        with pytest.raises(InvalidQueryError):
+            ItemQuery.from_args(args)
+
+    def test_unknown_and_empty_parameters_are_ignored(self):
+        """Vérifie qu'un cache-buster ou un paramètre vide ne déclenche pas de requête"""
+        assert ItemQuery.requested({'_': '123', 'limit': ''}) is False
+        assert ItemQuery.requested({'_': '123', 'limit': '2'}) is True
+        assert ItemQuery.from_args({'_': '123', 'limit': '2'}).limit == 2
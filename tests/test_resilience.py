@@ -0,0 +1,293 @@
+"""
+Tests de la résilience des lectures Azure (deadline, disjoncteur, lectures
+couvertes) avec le conteneur simulé et ses pannes injectées
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.cache import STALE_ERROR
+from app.services.content_service import ContentService
+from app.services.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, DeadlineExceededError, StorageGuard
+)
+from app.services.storage import NOT_FOUND, BlobStorage, StorageError, StreamedContent
+from benchmarks.fake_blob import FakeContainerClient
+
+
+class FakeClock:
+    """Horloge monotone contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def container():
+    container = FakeContainerClient()
+    for filename in ('events.json', 'news.json', 'faq.json'):
+        container.upload_blob(filename, json.dumps({"items": [{"id": 1}]}))
+    return container
+
+
+def make_service(container, **overrides):
+    return ContentService({
+        'CACHE_TTL': 0,
+        'CACHE_STALE_WHILE_REVALIDATE': 0,
+        'READINESS_CHECK_INTERVAL': 3600,
+        **overrides,
+    }, storage=BlobStorage(container))
+
+
+class TestFakeContainerFaults:
+
+    def test_injected_failures_and_latency(self, container):
+        client = container.get_blob_client('events.json')
+        container.inject_failures(2)
+        container.inject_latency(0.05)
+        for _ in range(2):
+            with pytest.raises(Exception):
+                client.download_blob()
+        start = time.monotonic()
+        assert client.download_blob().readall()
+        assert time.monotonic() - start >= 0.05
+        assert client.download_blob().readall()
+
+    def test_random_failures_are_reproducible(self):
+        outcomes = []
+        for _ in range(2):
+            container = FakeContainerClient(error_rate=0.5, seed=42)
+            failed = []
+            for _ in range(20):
+                try:
+                    container._call()
+                    failed.append(False)
+                except Exception:
+                    failed.append(True)
+            outcomes.append(failed)
+        assert outcomes[0] == outcomes[1]
+        assert any(outcomes[0]) and not all(outcomes[0])
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_single_trial_read_when_half_open(self):
+        clock = FakeClock()
+        states = []
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock,
+                                 on_change=states.append)
+        breaker.record_failure()
+        clock.now += 10
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+        # Échec de la lecture d'essai : nouvelle période d'ouverture
+        breaker.record_failure()
+        assert breaker.describe()["retry_in"] == 10
+        clock.now += 10
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert states == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+
+    def test_disabled_with_zero_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        assert breaker.allow()
+
+
+class TestStorageGuard:
+
+    def test_deadline_abandons_slow_read(self):
+        guard = StorageGuard(CircuitBreaker(), deadline=0.05)
+        start = time.monotonic()
+        assert guard.call('events.json', lambda: time.sleep(0.5) or 'late') is None
+        assert time.monotonic() - start < 0.4
+        assert guard.breaker.describe()["consecutive_failures"] == 1
+
+    def test_hedged_read_wins_over_slow_primary(self):
+        calls = []
+
+        def read():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return 'primary'
+            return 'hedge'
+
+        guard = StorageGuard(CircuitBreaker(), deadline=1, hedge_delay=0.02)
+        start = time.monotonic()
+        assert guard.call('events.json', read) == 'hedge'
+        assert time.monotonic() - start < 0.4
+        assert len(calls) == 2
+
+    def test_fast_failure_is_not_hedged(self):
+        calls = []
+        guard = StorageGuard(CircuitBreaker(), deadline=1, hedge_delay=0.05)
+        assert guard.call('events.json', lambda: calls.append(None)) is None
+        assert len(calls) == 1
+
+    def test_missing_file_is_not_a_failure(self):
+        """Vérifie qu'un fichier introuvable ne compte pas pour le disjoncteur"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        guard = StorageGuard(breaker)
+        storage = BlobStorage(FakeContainerClient())
+        for _ in range(3):
+            assert guard.call('missing.json', lambda: storage.stream('missing.json')) is NOT_FOUND
+        assert breaker.state == CLOSED
+        assert breaker.describe()["consecutive_failures"] == 0
+
+        # Une erreur d'accès reste un échec
+        assert guard.call('events.json', lambda: None) is None
+        assert breaker.describe()["consecutive_failures"] == 1
+
+    def test_failures_during_download_open_the_breaker(self):
+        """Vérifie qu'un téléchargement qui échoue après l'ouverture du flux compte comme un échec"""
+        breaker = CircuitBreaker(failure_threshold=3)
+        guard = StorageGuard(breaker)
+
+        def broken_chunks():
+            yield b'{"items": ['
+            raise StorageError("connection reset")
+
+        for _ in range(10):
+            streamed = guard.call('events.json', lambda: StreamedContent(broken_chunks(), None))
+            if streamed is None:
+                break
+            with pytest.raises(StorageError):
+                streamed.read()
+        assert breaker.state == OPEN
+
+    def test_completed_download_is_a_success(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        breaker.record_failure()
+        guard = StorageGuard(breaker)
+        streamed = guard.call('events.json', lambda: StreamedContent(iter([b'{}']), None))
+        assert breaker.describe()["consecutive_failures"] == 1
+        assert streamed.read() == b'{}'
+        assert breaker.describe()["consecutive_failures"] == 0
+
+    def test_abandoned_download_releases_the_trial_read(self):
+        """Vérifie qu'un flux fermé sans être lu ne bloque pas le disjoncteur semi-ouvert"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now += 5
+        guard = StorageGuard(breaker)
+        guard.call('events.json', lambda: StreamedContent(iter([b'{}']), None)).chunks.close()
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+
+    def test_losing_hedged_read_is_closed(self):
+        """Vérifie que le flux de la lecture couverte perdante est fermé à sa fin"""
+        closed = threading.Event()
+        calls = []
+
+        class Download:
+            """Téléchargement ouvert (connexion tenue jusqu'à close)"""
+
+            def __iter__(self):
+                return iter([b'{}'])
+
+            def close(self):
+                closed.set()
+
+        def read():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                return StreamedContent(Download(), None)
+            return 'hedge'
+
+        guard = StorageGuard(CircuitBreaker(), deadline=1, hedge_delay=0.02)
+        assert guard.call('events.json', read) == 'hedge'
+        assert not closed.is_set()
+        assert closed.wait(2)
+
+    def test_deadline_applies_to_streamed_chunks(self):
+        guard = StorageGuard(CircuitBreaker(), deadline=0.05)
+        storage = BlobStorage(FakeContainerClient(chunk_size=1))
+        storage.container_client.upload_blob('events.json', b'{"items": []}')
+        streamed = guard.call('events.json', lambda: storage.stream('events.json'))
+
+        def slow_chunks():
+            for chunk in streamed.chunks:
+                time.sleep(0.01)
+                yield chunk
+
+        with pytest.raises(DeadlineExceededError):
+            b''.join(slow_chunks())
+        assert guard.breaker.describe()["consecutive_failures"] == 1
+
+
+class TestServiceResilience:
+
+    def test_open_breaker_serves_stale_without_calling_azure(self, container):
+        service = make_service(container, BREAKER_FAILURE_THRESHOLD=2)
+        assert service.get_snapshot('events.json') is not None
+
+        container.inject_failures(2)
+        assert service.lookup('events.json').status == STALE_ERROR
+        assert service.lookup('events.json').status == STALE_ERROR
+        assert service.guard.breaker.state == OPEN
+
+        calls = container.calls
+        result = service.lookup('events.json')
+        assert result.status == STALE_ERROR
+        assert result.value.data == {"items": [{"id": 1}]}
+        assert container.calls == calls
+
+    def test_slow_azure_does_not_block_requests(self, container):
+        service = make_service(container, STORAGE_DEADLINE=0.05)
+        service.get_snapshot('events.json')
+
+        container.inject_latency(1.0)
+        start = time.monotonic()
+        assert service.lookup('events.json').status == STALE_ERROR
+        assert time.monotonic() - start < 0.5
+
+    def test_hedged_read_hides_a_slow_call(self, container):
+        service = make_service(container, STORAGE_DEADLINE=2, STORAGE_HEDGE_DELAY=0.02)
+        container.inject_latency(1.0)
+        start = time.monotonic()
+        assert service.get_snapshot('news.json').data == {"items": [{"id": 1}]}
+        assert time.monotonic() - start < 0.5
+
+    def test_breaker_state_in_readiness(self, container):
+        service = make_service(container, BREAKER_FAILURE_THRESHOLD=1)
+        service.warm_up()
+        readiness = service.readiness()
+        assert readiness["circuit_breaker"]["state"] == CLOSED
+        assert readiness["azure_connection"] == "connected"
+
+        container.inject_failures(1)
+        service.get_snapshot('events.json')
+        readiness = service.readiness()
+        assert readiness["circuit_breaker"]["state"] == OPEN
+        assert readiness["azure_connection"] == "failed"
+        # Contenu toujours servable depuis le cache : le pod reste prêt
+        assert readiness["ready"] is True
+
+    def test_local_storage_has_no_guard(self):
+        service = ContentService({'USE_LOCAL_FILES': True, 'LOCAL_DATA_PATH': 'tests/data'})
+        assert service.guard is None
+        assert "circuit_breaker" not in service.readiness()
@@ -0,0 +1,65 @@
+"""
+Tests de la recherche plein texte
+"""
+from app.services.search import SearchIndex, fold, tokenize
+
+FAQ = [
+    {"id": 1, "question": "Comment s'inscrire à un évènement ?", "answer": "Via le formulaire."},
+    {"id": 2, "question": "Où trouver les actualités ?", "answer": "Dans la rubrique news."},
+]
+EVENTS = [
+    {"id": 1, "title": "Conférence Cloud Computing", "description": "Introduction aux services Azure"},
+    {"id": 2, "title": "Workshop Kubernetes", "description": "Déploiement sur AKS, un évènement pratique"},
+]
+
+
+def build_index():
+    index = SearchIndex()
+    index.update('faq', FAQ)
+    index.update('events', EVENTS)
+    return index
+
+
+class TestTokenizer:
+    """Tests de la normalisation du texte"""
+
+    def test_fold_removes_accents(self):
+        """Vérifie le repli des accents et de la casse"""
+        assert fold("Évènement") == "evenement"
+
+    def test_tokenize_drops_stopwords(self):
+        """Vérifie le découpage et la suppression des mots vides"""
+        assert tokenize("Les services de Azure") == ["services", "azure"]
+
+
+class TestSearchIndex:
+    """Tests de l'index inversé"""
+
+    def test_accent_insensitive_search(self):
+        """Vérifie que 'evenement' trouve 'évènement'"""
+        result = build_index().search("evenement ")
+        assert result['total'] == 2
+        assert {r['collection'] for r in result['results']} == {'faq', 'events'}
+
+    def test_title_match_ranks_first(self):
+        """Vérifie que la correspondance dans le titre est mieux classée"""
+        result = build_index().search("kubernetes ")
+        assert result['results'][0]['item']['id'] == 2
+        assert result['results'][0]['collection'] == 'events'
+
+    def test_prefix_on_last_word(self):
+        """Vérifie la recherche à la frappe sur le dernier mot"""
+        result = build_index().search("kuber")
+        assert result['total'] == 1
+
+    def test_collection_filter(self):
+        """Vérifie la restriction à certaines collections"""
+        result = build_index().search("evenement ", collections=['faq'])
+        assert [r['collection'] for r in result['results']] == ['faq']
+
+    def test_update_replaces_collection(self):
+        """Vérifie qu'un rechargement remplace l'index de la collection"""
+        index = build_index()
+        index.update('events', [{"id": 9, "title": "Nouveau meetup"}])
+        assert index.search("kubernetes ")['total'] == 0
+        assert index.search("meetup")['total'] == 1
@@ -0,0 +1,84 @@
+"""
+Tests du démarrage à froid : imports différés et fabrique d'application
+
+Chaque vérification lance un interpréteur neuf (les modules sont déjà
+importés dans le processus de test).
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    """Exécute `code` dans un interpréteur neuf et retourne sa sortie JSON"""
+    env = {**os.environ, 'FLASK_ENV': 'testing', 'USE_LOCAL_FILES': 'True',
+           'LOCAL_DATA_PATH': 'tests/data', 'LOG_LEVEL': 'WARNING'}
+    env.pop('STORAGE_BACKEND', None)
+    process = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+LOADED = "[name for name in ('azure', 'yaml', 'dotenv', 'requests') if name in sys.modules]"
+
+
+class TestLazyImports:
+
+    def test_importing_main_does_not_build_the_application(self):
+        result = run_python(
+            "import json, sys; import app.main as main; "
+            f"print(json.dumps({{'app': main._default_app is not None, 'loaded': {LOADED}}}))"
+        )
+        assert result == {'app': False, 'loaded': []}
+
+    def test_local_application_skips_azure_and_yaml(self):
+        result = run_python(
+            "import json, sys; from app.main import app; "
+            "response = app.test_client().get('/api/events'); "
+            f"print(json.dumps({{'status': response.status_code, 'loaded': {LOADED}}}))"
+        )
+        assert result == {'status': 200, 'loaded': []}
+
+    def test_yaml_is_imported_with_the_first_yaml_file(self):
+        result = run_python(
+            "import json, sys\n"
+            "from app.services.content_service import ContentService\n"
+            "from app.services.storage import MemoryStorage\n"
+            "service = ContentService({}, storage=MemoryStorage({'events.yaml': 'items: [{id: 1}]'}))\n"
+            "before = 'yaml' in sys.modules\n"
+            "data = service.get_content('events.yaml')\n"
+            "print(json.dumps({'before': before, 'after': 'yaml' in sys.modules, 'data': data}))"
+        )
+        assert result == {'before': False, 'after': True, 'data': {'items': [{'id': 1}]}}
+
+    def test_azure_is_imported_by_the_blob_backend(self):
+        result = run_python(
+            "import json, sys\n"
+            "from app.services.content_service import ContentService\n"
+            "service = ContentService({'STORAGE_BACKEND': 'blob', 'AZURE_STORAGE_CONNECTION_STRING':\n"
+            "    'DefaultEndpointsProtocol=https;AccountName=test;AccountKey=dGVzdA==;EndpointSuffix=core.windows.net'})\n"
+            "print(json.dumps({'azure': 'azure.storage.blob' in sys.modules,\n"
+            "                  'client': service.storage.container_client is not None}))"
+        )
+        assert result == {'azure': True, 'client': True}
+
+
+class TestCreateApp:
+
+    def test_application_with_injected_service(self):
+        from app.main import create_app
+        from app.services.content_service import ContentService
+        from app.services.storage import MemoryStorage
+
+        service = ContentService({}, storage=MemoryStorage({'events.json': '{"items": [{"id": 7}]}'}))
+        flask_app = create_app({'ACCESS_LOG': False, 'LOG_LEVEL': 'WARNING'}, content_service=service)
+        assert flask_app.test_client().get('/api/events').get_json() == {"items": [{"id": 7}]}
+        assert flask_app.extensions['content_service'] is service
+
+    def test_default_application_is_shared(self, app):
+        from app import main
+        assert main.app is app
+        assert main.content_service is app.extensions['content_service']
@@ -0,0 +1,226 @@
+"""
+Tests des sources de contenu : même contrat pour chaque backend
+(lecture complète ou par morceaux, lecture conditionnelle, listing)
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.storage import (
+    NOT_FOUND,
+    NOT_MODIFIED,
+    BlobStorage,
+    HTTPStorage,
+    LocalStorage,
+    MemoryStorage,
+    StorageError,
+)
+from benchmarks.fake_blob import FakeContainerClient
+
+# Compte fictif : le client est construit sans appel réseau
+CONNECTION_STRING = (
+    'DefaultEndpointsProtocol=https;AccountName=devaccount;AccountKey=a2V5;'
+    'EndpointSuffix=core.windows.net'
+)
+
+FILES = {
+    'events.json': b'{"items": [{"id": 1, "title": "Conf\xc3\xa9rence"}]}',
+    'news.json': b'{"items": []}',
+}
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """Origine HTTP minimale : ETag et réponses 304"""
+
+    files = {}
+
+    def do_GET(self):
+        name = self.path.lstrip('/')
+        if name == 'unavailable.json':
+            self.send_response(503)
+            self.end_headers()
+            return
+        if name not in self.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = self.files[name]
+        etag = f'"{len(content)}-{hash(content) & 0xffff:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Tue, 10 Mar 2026 08:00:00 GMT')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    OriginHandler.files = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_local(tmp_path, request):
+    for name, content in FILES.items():
+        (tmp_path / name).write_bytes(content)
+    return LocalStorage(str(tmp_path))
+
+
+def make_memory(tmp_path, request):
+    return MemoryStorage(FILES)
+
+
+def make_blob(tmp_path, request):
+    container = FakeContainerClient(chunk_size=8)
+    for name, content in FILES.items():
+        container.upload_blob(name, content)
+    return BlobStorage(container)
+
+
+def make_http(tmp_path, request):
+    origin = request.getfixturevalue('origin')
+    OriginHandler.files = dict(FILES)
+    return HTTPStorage(f"http://127.0.0.1:{origin.server_port}")
+
+
+@pytest.fixture(params=[make_local, make_memory, make_blob, make_http],
+                ids=['local', 'memory', 'blob', 'http'])
+def storage(request, tmp_path):
+    return request.param(tmp_path, request)
+
+
+class TestStorageContract:
+    """Contrat commun à tous les backends"""
+
+    def test_read(self, storage):
+        """Vérifie la lecture complète avec version et date"""
+        raw = storage.read('events.json')
+        assert raw.content == FILES['events.json']
+        assert raw.etag
+        assert raw.last_modified is not None
+
+    def test_stream_yields_whole_content(self, storage):
+        """Vérifie que la lecture par morceaux restitue le contenu"""
+        streamed = storage.stream('events.json')
+        assert b''.join(streamed.chunks) == FILES['events.json']
+        assert streamed.size in (None, len(FILES['events.json']))
+
+    def test_conditional_read(self, storage):
+        """Vérifie qu'une version à jour n'est pas relue"""
+        etag = storage.read('events.json').etag
+        assert storage.read('events.json', etag) is NOT_MODIFIED
+        assert storage.stream('events.json', etag) is NOT_MODIFIED
+        assert storage.read('events.json', '"stale"').content == FILES['events.json']
+
+    def test_missing_file(self, storage):
+        """Vérifie qu'un fichier absent donne NOT_FOUND (et non une erreur)"""
+        assert storage.read('missing.json') is NOT_FOUND
+
+    def test_check(self, storage):
+        assert storage.check() is True
+
+
+class TestListing:
+    """Listing des backends qui le supportent"""
+
+    @pytest.mark.parametrize('factory', [make_local, make_memory, make_blob])
+    def test_list(self, factory, tmp_path, request):
+        storage = factory(tmp_path, request)
+        assert storage.list() == sorted(FILES)
+        assert storage.list('news') == ['news.json']
+
+    def test_http_listing_is_unsupported(self, origin):
+        with pytest.raises(StorageError):
+            HTTPStorage(f"http://127.0.0.1:{origin.server_port}").list()
+
+
+class TestBlobStorage:
+    """Comportement propre à Azure (via le conteneur simulé)"""
+
+    def test_changed_blob_gets_new_etag(self):
+        container = FakeContainerClient()
+        storage = BlobStorage(container)
+        container.upload_blob('events.json', b'{"items": []}')
+        first = storage.read('events.json').etag
+        container.upload_blob('events.json', b'{"items": [1]}', overwrite=True)
+
+        raw = storage.read('events.json', first)
+        assert raw.etag != first
+        assert raw.content == b'{"items": [1]}'
+        assert container.downloads == 2
+
+    def test_unconfigured_client(self):
+        storage = BlobStorage(None)
+        assert storage.read('events.json') is None
+        assert storage.check() is False
+
+    def test_client_transport_applies_configured_timeouts(self):
+        """Vérifie les délais effectifs du transport (et non les kwargs passés au SDK)"""
+        from app.services.content_service import ContentService
+        service = ContentService({
+            'AZURE_STORAGE_CONNECTION_STRING': CONNECTION_STRING,
+            'AZURE_CONNECTION_TIMEOUT': 3,
+            'AZURE_READ_TIMEOUT': 7,
+        })
+        transport = service._blob_service_client._pipeline._transport
+        assert transport.connection_config.timeout == 3
+        assert transport.connection_config.read_timeout == 7
+
+    def test_client_downloads_in_bounded_chunks(self):
+        """Vérifie que la première requête d'un téléchargement est bornée (32 Mio par défaut dans le SDK)"""
+        from app.services.content_service import ContentService
+        service = ContentService({
+            'AZURE_STORAGE_CONNECTION_STRING': CONNECTION_STRING,
+            'AZURE_MAX_SINGLE_GET_SIZE': 1024 * 1024,
+            'AZURE_MAX_CHUNK_GET_SIZE': 512 * 1024,
+        })
+        config = service.storage.container_client._config
+        assert config.max_single_get_size == 1024 * 1024
+        assert config.max_chunk_get_size == 512 * 1024
+
+    def test_listing_is_paginated(self):
+        container = FakeContainerClient()
+        for i in range(5):
+            container.upload_blob(f"file-{i}.json", b'{}')
+        pages = list(container.list_blobs(results_per_page=2).by_page())
+        assert [len(list(page)) for page in pages] == [2, 2, 1]
+
+
+class TestLocalStorage:
+
+    def test_modified_file_is_reread(self, tmp_path):
+        path = tmp_path / 'events.json'
+        path.write_bytes(b'{"items": []}')
+        storage = LocalStorage(str(tmp_path))
+        etag = storage.read('events.json').etag
+
+        path.write_bytes(b'{"items": [1]}')
+        os.utime(path, ns=(1, 1))
+        assert storage.read('events.json', etag).content == b'{"items": [1]}'
+
+
+class TestHTTPStorage:
+    """Comportement propre à l'origine HTTP"""
+
+    def test_server_error_is_not_a_missing_file(self, origin):
+        storage = HTTPStorage(f"http://127.0.0.1:{origin.server_port}")
+        assert storage.read('unavailable.json') is None
+        assert storage.read('missing.json') is NOT_FOUND
@@ -0,0 +1,227 @@
+"""
+Tests du flux de mises à jour en Server-Sent Events (/api/updates)
+"""
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+import pytest
+
+from app.services.changes import VERSION_HASH_RANGE
+from app.services.content_service import ContentService
+from app.services.storage import MemoryStorage
+from app.services.updates import (
+    HEARTBEAT, RETRY, StreamSlots, UpdateBroadcaster, event_id, parse_event_id
+)
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def parse(event: bytes) -> dict:
+    fields = {}
+    for line in event.decode('utf-8').strip().split('\n'):
+        name, _, value = line.partition(': ')
+        fields[name] = value
+    return fields
+
+
+class TestUpdateBroadcaster:
+
+    def test_publish_wakes_waiting_connections(self):
+        broadcaster = UpdateBroadcaster()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(broadcaster.wait(0, 5)))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        assert broadcaster.publish('events', 1) is True
+        for thread in threads:
+            thread.join()
+        assert results == [1] * 20
+
+    def test_same_version_is_not_republished(self):
+        broadcaster = UpdateBroadcaster()
+        broadcaster.publish('events', 1)
+        assert broadcaster.publish('events', 1) is False
+        assert broadcaster.wait(1, 0.01) == 1
+
+    def test_event_id_round_trip(self):
+        versions = {'events': 1709251200000, 'news': 3}
+        assert parse_event_id(event_id(versions)) == versions
+        assert parse_event_id('events=abc') is None
+        assert parse_event_id('') is None
+
+
+class TestUpdateStream:
+
+    @pytest.fixture
+    def storage(self):
+        storage = MemoryStorage()
+        for filename in ('events.json', 'news.json', 'faq.json'):
+            storage.put(filename, '{"items": [{"id": 1, "title": "v1"}]}', START)
+        return storage
+
+    @pytest.fixture
+    def service(self, storage):
+        service = ContentService({'CACHE_TTL': 3600, 'SSE_POLL_INTERVAL': 3600}, storage=storage)
+        service.warm_up()
+        return service
+
+    def test_hello_heartbeat_then_delta(self, service, storage):
+        stream = service.update_stream(heartbeat=0.01)
+        assert next(stream) == RETRY
+        hello = parse(next(stream))
+        assert hello['event'] == 'hello'
+        versions = json.loads(hello['data'])['versions']
+        assert set(versions) == {'events', 'news', 'faq'}
+        assert next(stream) == HEARTBEAT
+
+        storage.put('events.json', '{"items": [{"id": 1, "title": "v2"}]}', START + timedelta(seconds=1))
+        service.refresh('events.json')
+        service.check_updates()
+
+        update = parse(next(stream))
+        data = json.loads(update['data'])
+        assert update['event'] == 'update'
+        assert data['collection'] == 'events'
+        assert data['updated'] == [{"id": 1, "title": "v2"}]
+        version = parse_event_id(update['id'])['events']
+        assert version // VERSION_HASH_RANGE == versions['events'] // VERSION_HASH_RANGE + 1
+        stream.close()
+
+    def test_resume_sends_missed_changes(self, service, storage):
+        stream = service.update_stream(heartbeat=0.01)
+        next(stream)
+        known = parse_event_id(parse(next(stream))['id'])
+        stream.close()
+
+        storage.put('news.json', '{"items": []}', START + timedelta(seconds=1))
+        service.refresh('news.json')
+        service.check_updates()
+
+        resumed = service.update_stream(dict(known), heartbeat=0.01)
+        assert next(resumed) == RETRY
+        data = json.loads(parse(next(resumed))['data'])
+        assert data['collection'] == 'news' and data['removed'] == [1]
+        assert next(resumed) == HEARTBEAT
+        resumed.close()
+
+    def test_stream_ends_after_max_duration(self, service):
+        events = list(service.update_stream(heartbeat=0.01, max_duration=0.05))
+        assert events[0] == RETRY and events[-1] == HEARTBEAT
+
+
+class TestUpdatesEndpoint:
+
+    def test_event_stream(self, app, client):
+        app.config.update(SSE_HEARTBEAT_INTERVAL=0.01, SSE_MAX_DURATION=0.05)
+        try:
+            response = client.get('/api/updates')
+            body = response.get_data()
+        finally:
+            app.config.update(SSE_HEARTBEAT_INTERVAL=15, SSE_MAX_DURATION=1800)
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['X-Accel-Buffering'] == 'no'
+        assert b'event: hello' in body
+
+    def test_streams_over_the_limit_are_rejected(self, app, client, monkeypatch):
+        service = app.extensions['content_service']
+        monkeypatch.setattr(service, 'update_slots', StreamSlots(1))
+        app.config.update(SSE_HEARTBEAT_INTERVAL=0.01, SSE_MAX_DURATION=0.05)
+        try:
+            assert service.update_slots.acquire()
+            response = client.get('/api/updates')
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '10'
+
+            service.update_slots.release()
+            response = client.get('/api/updates')
+            assert response.status_code == 200
+            response.get_data()
+            response.close()
+        finally:
+            app.config.update(SSE_HEARTBEAT_INTERVAL=15, SSE_MAX_DURATION=1800)
+        assert service.update_slots.open == 0
+
+
+class PooledWSGIServer(WSGIServer):
+    """Serveur WSGI à nombre fixe de threads, comme un worker gunicorn gthread"""
+
+    def __init__(self, address, threads):
+        super().__init__(address, QuietHandler)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve, request, client_address)
+
+    def _serve(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestStreamLimit:
+    """Flux SSE plus nombreux que les threads du worker"""
+
+    THREADS = 4
+
+    @pytest.fixture
+    def server(self, app, monkeypatch):
+        service = app.extensions['content_service']
+        monkeypatch.setattr(service, 'update_slots', StreamSlots(self.THREADS // 2))
+        app.config.update(SSE_HEARTBEAT_INTERVAL=0.05, SSE_MAX_DURATION=10)
+        server = PooledWSGIServer(('127.0.0.1', 0), self.THREADS)
+        server.set_app(app)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+        server.pool.shutdown(wait=False)
+        app.config.update(SSE_HEARTBEAT_INTERVAL=15, SSE_MAX_DURATION=1800)
+
+    def test_readiness_answers_while_streams_are_open(self, server, app):
+        port = server.server_address[1]
+        connections, statuses = [], []
+        for _ in range(self.THREADS + 2):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api/updates')
+            response = connection.getresponse()
+            statuses.append(response.status)
+            if response.status == 200:
+                assert response.fp.readline() == RETRY.split(b'\n')[0] + b'\n'
+                connections.append(connection)
+            else:
+                assert response.getheader('Retry-After') == '10'
+                response.read()
+                connection.close()
+
+        assert statuses.count(200) == self.THREADS // 2
+        assert statuses.count(503) == self.THREADS // 2 + 2
+
+        probe = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+        probe.request('GET', '/readyz')
+        assert probe.getresponse().status in (200, 503)
+        probe.close()
+
+        # Clients déconnectés : les flux sont libérés au heartbeat suivant
+        for connection in connections:
+            connection.close()
+        slots = app.extensions['content_service'].update_slots
+        deadline = time.monotonic() + 5
+        while slots.open and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert slots.open == 0
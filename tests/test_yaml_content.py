@@ -0,0 +1,101 @@
+"""
+Tests du chargement YAML (loader C, dates ISO) et du cache disque des
+résultats de parsing
+"""
+import pytest
+import yaml
+
+from app.services import content_service as content_module
+from app.services.content_service import ContentService
+from app.services.storage import MemoryStorage
+from app.services.yaml_content import ParsedArtifactCache, load_yaml
+
+DOCUMENT = """
+items:
+  - id: 1
+    title: Conférence
+    date: 2026-03-15
+    starts: 2026-03-15 10:00:00
+  - id: 2
+    title: Atelier
+"""
+
+
+class TestLoadYaml:
+
+    def test_dates_are_iso_strings(self):
+        data = load_yaml(DOCUMENT)
+        assert data['items'][0]['date'] == '2026-03-15'
+        assert data['items'][0]['starts'] == '2026-03-15T10:00:00'
+
+    def test_accepts_bytes(self):
+        assert load_yaml(DOCUMENT.encode('utf-8'))['items'][0]['title'] == 'Conférence'
+
+    def test_unsafe_tags_are_rejected(self):
+        with pytest.raises(yaml.YAMLError):
+            load_yaml("!!python/object/apply:os.system ['true']")
+
+
+class TestParsedArtifactCache:
+
+    def test_round_trip(self, tmp_path):
+        cache = ParsedArtifactCache(str(tmp_path))
+        key = cache.key_for(DOCUMENT.encode('utf-8'))
+        assert cache.get(key) is None
+        cache.put(key, load_yaml(DOCUMENT))
+        assert cache.get(key) == load_yaml(DOCUMENT)
+
+    def test_corrupted_artifact_is_ignored(self, tmp_path):
+        cache = ParsedArtifactCache(str(tmp_path))
+        cache.put('abc', {"items": []})
+        (tmp_path / f"abc.{cache.VERSION}.marshal").write_bytes(b'\x00garbage')
+        assert cache.get('abc') is None
+
+    def test_tampered_artifact_is_not_unmarshalled(self, tmp_path, monkeypatch):
+        """Vérifie qu'un artefact dont le HMAC ne correspond pas n'est pas passé à marshal"""
+        from app.services import yaml_content
+        cache = ParsedArtifactCache(str(tmp_path), secret=b'pod-secret')
+        cache.put('abc', {"items": []})
+        path = tmp_path / f"abc.{cache.VERSION}.marshal"
+        forged = ParsedArtifactCache(str(tmp_path / 'other'), secret=b'other-secret')
+        payload = yaml_content.marshal.dumps({"items": ["forged"]})
+        path.write_bytes(forged._digest(payload) + payload)
+
+        def fail(payload):
+            raise AssertionError("unauthenticated payload unmarshalled")
+
+        monkeypatch.setattr(yaml_content.marshal, 'loads', fail)
+        assert cache.get('abc') is None
+
+    def test_oldest_artifacts_are_pruned(self, tmp_path):
+        cache = ParsedArtifactCache(str(tmp_path), max_files=2)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, {"key": key})
+        assert len(list(tmp_path.glob('*.marshal'))) == 2
+
+
+class TestYamlContent:
+    """Fichiers YAML servis par le ContentService"""
+
+    @pytest.fixture
+    def make_service(self, tmp_path):
+        def make():
+            storage = MemoryStorage({'events.yaml': DOCUMENT})
+            return ContentService({'EVENTS_FILE': 'events.yaml', 'YAML_CACHE_DIR': str(tmp_path)},
+                                  storage=storage)
+        return make
+
+    def test_yaml_is_served_as_json(self, make_service):
+        snapshot = make_service().get_snapshot('events.yaml')
+        assert snapshot.data['items'][0]['date'] == '2026-03-15'
+        assert b'"date":"2026-03-15"' in snapshot.body
+
+    def test_unchanged_content_is_not_parsed_again(self, make_service, monkeypatch):
+        """Vérifie qu'un redémarrage relit le résultat mémorisé sans parser"""
+        expected = make_service().get_snapshot('events.yaml').body
+
+        def fail(content):
+            raise AssertionError("YAML parsed again")
+
+        monkeypatch.setattr(content_module, 'load_yaml', fail)
+        assert make_service().get_snapshot('events.yaml').body == expected